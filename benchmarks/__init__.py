@@ -0,0 +1,75 @@
+"""
+benchmarks for the hot paths of the pyepics Channel Access client
+
+Run all benchmarks, starting the test IOC from tests/Setup/st.cmd:
+
+   python -m benchmarks -o results.json
+
+and compare with an earlier run, exiting with status 1 on regressions:
+
+   python -m benchmarks -o new.json --compare results.json
+
+See benchmarks/README.rst for details.
+"""
+import time
+
+# name -> (function, unit, higher_is_better)
+BENCHMARKS = {}
+
+def benchmark(unit, higher_is_better=True):
+    """decorator registering a benchmark function.
+
+    The function is called with a `Config` and returns a dictionary with
+    the measured 'value' (in `unit`) and any extra information.  The
+    benchmark name is the function name, without a leading 'bench_'.
+    """
+    def register(fcn):
+        name = fcn.__name__
+        if name.startswith('bench_'):
+            name = name[len('bench_'):]
+        BENCHMARKS[name] = (fcn, unit, higher_is_better)
+        return fcn
+    return register
+
+class Config:
+    """settings for a benchmark run
+
+    Parameters
+    ----------
+    duration : float
+        time (in seconds) for each timed loop [2]
+    nchannels : int
+        number of channels for the connection benchmarks [2000]
+    """
+    def __init__(self, duration=2.0, nchannels=2000):
+        self.duration = duration
+        self.nchannels = nchannels
+
+def rate_loop(fcn, duration):
+    """call fcn() repeatedly for about `duration` seconds, returning
+    (number of calls, elapsed time)"""
+    ncalls = 0
+    t0 = time.perf_counter()
+    tend = t0 + duration
+    while True:
+        for i in range(10):
+            fcn()
+        ncalls += 10
+        now = time.perf_counter()
+        if now > tend:
+            return ncalls, now - t0
+
+def percentiles(values, points=(50, 90, 99)):
+    "dictionary of percentiles of a list of values"
+    values = sorted(values)
+    out = {}
+    for p in points:
+        idx = min(len(values)-1, int(round(p*(len(values)-1)/100.0)))
+        out['p%d' % p] = values[idx]
+    return out
+
+def load_all():
+    "import all benchmark modules, registering their benchmarks"
+    from . import (bench_connect, bench_get, bench_put, bench_monitor,
+                   bench_memory)
+    return BENCHMARKS
@@ -0,0 +1,118 @@
+#!/usr/bin/env python
+"""
+run the pyepics benchmarks:
+
+   python -m benchmarks [options] [benchmark names]
+
+"""
+import os
+import sys
+import json
+import time
+import platform
+from argparse import ArgumentParser
+
+from . import Config, load_all
+from .ioc import TestIOC, ca_environ, SERVER_PORT, NCHANNELS
+
+def compare(results, baseline, threshold):
+    """compare results with a baseline, printing a table and returning
+    the names of benchmarks that are worse by more than threshold"""
+    regressions = []
+    print("\n%-26s %14s %14s %9s" % ('benchmark', 'baseline', 'current',
+                                     'change'))
+    for name, res in results.items():
+        base = baseline.get(name)
+        if base is None or not base.get('value') or res.get('value') is None:
+            continue
+        change = res['value']/base['value'] - 1.0
+        worse = -change if res['higher_is_better'] else change
+        flag = ''
+        if worse > threshold:
+            flag = '  <-- regression'
+            regressions.append(name)
+        print("%-26s %14.4g %14.4g %+8.1f%%%s" % (name, base['value'],
+                                                  res['value'], 100*change,
+                                                  flag))
+    return regressions
+
+def main(args=None):
+    parser = ArgumentParser(prog='python -m benchmarks',
+                            description='benchmarks for pyepics')
+    parser.add_argument('names', nargs='*',
+                        help='benchmarks to run [all]')
+    parser.add_argument('-o', '--output', default=None,
+                        help='file to write JSON results to')
+    parser.add_argument('-c', '--compare', default=None,
+                        help='JSON results file to compare with')
+    parser.add_argument('-t', '--threshold', type=float, default=0.25,
+                        help='fractional change counted as a regression [0.25]')
+    parser.add_argument('-d', '--duration', type=float, default=2.0,
+                        help='time (in seconds) for each timed loop [2]')
+    parser.add_argument('-n', '--nchannels', type=int, default=NCHANNELS,
+                        help='channels for connection benchmarks [%d]' % NCHANNELS)
+    parser.add_argument('--no-ioc', action='store_true',
+                        help='use an IOC that is already running')
+    parser.add_argument('-l', '--list', action='store_true',
+                        help='list benchmarks and exit')
+    opts = parser.parse_args(args)
+
+    benchmarks = load_all()
+    if opts.list:
+        for name, (fcn, unit, _) in benchmarks.items():
+            print("%-26s [%s] %s" % (name, unit, fcn.__doc__.split('\n')[0]))
+        return 0
+    names = opts.names or list(benchmarks.keys())
+    for name in names:
+        if name not in benchmarks:
+            parser.error("unknown benchmark '%s'" % name)
+
+    ioc = None
+    if not opts.no_ioc:
+        # must be set before libca is loaded
+        os.environ.update(ca_environ(SERVER_PORT))
+        ioc = TestIOC(nchannels=opts.nchannels).start()
+
+    from epics import __version__
+    config = Config(duration=opts.duration, nchannels=opts.nchannels)
+    results = {}
+    try:
+        for name in names:
+            fcn, unit, higher_is_better = benchmarks[name]
+            try:
+                res = fcn(config)
+            except Exception as exc:
+                res = {'value': None, 'error': repr(exc)}
+            res.update({'unit': unit, 'higher_is_better': higher_is_better})
+            results[name] = res
+            value = res['value']
+            if value is None:
+                print("%-26s  failed: %s" % (name, res['error']))
+            else:
+                print("%-26s %14.4g %s" % (name, value, unit))
+    finally:
+        if ioc is not None:
+            from epics import ca
+            ca.finalize_libca()
+            ioc.stop()
+
+    out = {'pyepics_version': __version__,
+           'python': platform.python_version(),
+           'platform': platform.platform(),
+           'time': time.strftime('%Y-%m-%d %H:%M:%S'),
+           'config': vars(config),
+           'results': results}
+    if opts.output is not None:
+        with open(opts.output, 'w') as fh:
+            json.dump(out, fh, indent=2)
+
+    status = 0
+    if opts.compare is not None:
+        with open(opts.compare, 'r') as fh:
+            baseline = json.load(fh)['results']
+        if compare(results, baseline, opts.threshold):
+            status = 1
+    return status
+
+if __name__ == '__main__':
+    sys.exit(main())
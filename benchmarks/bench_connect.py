@@ -0,0 +1,82 @@
+"""
+connection benchmarks: channels connected per second, and the cost of
+asking for the properties of a connected channel
+"""
+import time
+from epics import ca, PV, get_pvs
+from . import benchmark, rate_loop
+from .ioc import BENCH_PREFIX
+
+def bench_names(nchannels):
+    return ['%sao%d' % (BENCH_PREFIX, i) for i in range(nchannels)]
+
+@benchmark('channels/s')
+def bench_create_channels(config):
+    """connect config.nchannels new channels with ca.create_channels()"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels)
+    t0 = time.perf_counter()
+    result = ca.create_channels(names, timeout=30.0)
+    elapsed = time.perf_counter() - t0
+    nconn = len(result.connected)
+    return {'value': nconn/elapsed, 'connected': nconn,
+            'requested': len(names), 'elapsed': elapsed}
+
+@benchmark('channels/s')
+def bench_create_channel_each(config):
+    """connect new channels one at a time, with connect_channel()"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels//4)
+    t0 = time.perf_counter()
+    nconn = 0
+    for name in names:
+        chid = ca.create_channel(name)
+        nconn += int(ca.connect_channel(chid, timeout=5.0))
+    elapsed = time.perf_counter() - t0
+    return {'value': nconn/elapsed, 'connected': nconn,
+            'requested': len(names), 'elapsed': elapsed}
+
+@benchmark('PVs/s')
+def bench_connect_pvs(config):
+    """create and connect PV objects (with auto-monitor)"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels//4)
+    t0 = time.perf_counter()
+    pvs = [PV(name) for name in names]
+    nconn = sum(int(pv.wait_for_connection(timeout=10.0)) for pv in pvs)
+    elapsed = time.perf_counter() - t0
+    for pv in pvs:
+        pv.disconnect()
+    return {'value': nconn/elapsed, 'connected': nconn,
+            'requested': len(names), 'elapsed': elapsed}
+
+@benchmark('PVs/s')
+def bench_get_pvs(config):
+    """create and connect PV objects (with auto-monitor) with get_pvs()"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels//4)
+    t0 = time.perf_counter()
+    pvs, report = get_pvs(names, timeout=30.0)
+    elapsed = time.perf_counter() - t0
+    nconn = len(report.connected)
+    for pv in pvs.values():
+        pv.disconnect()
+    ca.clear_cache()
+    return {'value': nconn/elapsed, 'connected': nconn,
+            'requested': len(names), 'elapsed': elapsed}
+
+@benchmark('usec', higher_is_better=False)
+def bench_channel_info(config):
+    """time for ca.field_type(), element_count(), host_name(),
+    read_access() and write_access() of a connected channel, per call"""
+    chid = ca.create_channel(bench_names(1)[0], connect=True)
+    ca.replace_access_rights_event(chid)
+    ca.poll(evt=0.1)
+    def info():
+        ca.field_type(chid)
+        ca.element_count(chid)
+        ca.host_name(chid)
+        ca.read_access(chid)
+        ca.write_access(chid)
+    ncalls, elapsed = rate_loop(info, config.duration)
+    return {'value': 1.e6*elapsed/(5*ncalls), 'calls': 5*ncalls}
@@ -0,0 +1,99 @@
+"""
+get benchmarks: caget, ca.get (with and without the value cache, and of
+a range of array elements), PV.get from a thread and caget_many throughput
+"""
+import time
+import epics
+from epics import ca
+from . import benchmark, rate_loop
+from .bench_connect import bench_names
+
+SCALAR_PV = 'PyTest:ao4'
+WAVEFORM_PV = 'PyTest:double64k'
+
+@benchmark('gets/s')
+def bench_ca_get(config):
+    """ca.get() of a connected double channel"""
+    chid = ca.create_channel(SCALAR_PV, connect=True)
+    ncalls, elapsed = rate_loop(lambda: ca.get(chid), config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('gets/s')
+def bench_ca_get_value_cache(config):
+    """ca.get() of a connected double channel, with the value cache"""
+    chid = ca.create_channel(SCALAR_PV, connect=True)
+    ca.enable_value_cache(chid)
+    ca.get(chid)
+    ncalls, elapsed = rate_loop(lambda: ca.get(chid), config.duration)
+    ca.disable_value_cache(chid)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('gets/s')
+def bench_caget(config):
+    """epics.caget(use_monitor=False) of a double PV"""
+    epics.caget(SCALAR_PV)
+    ncalls, elapsed = rate_loop(lambda: epics.caget(SCALAR_PV,
+                                                    use_monitor=False),
+                                config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('gets/s')
+def bench_caget_monitor(config):
+    """epics.caget() of a double PV, using the monitored value"""
+    epics.caget(SCALAR_PV)
+    ncalls, elapsed = rate_loop(lambda: epics.caget(SCALAR_PV),
+                                config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('gets/s')
+def bench_pv_get_thread(config):
+    """PV.get() of a monitored double PV, from a thread other than the
+    one that created the PV"""
+    pv = epics.get_pv(SCALAR_PV)
+    pv.wait_for_connection()
+    pv.get()
+    out = {}
+    def run():
+        out['calls'], out['elapsed'] = rate_loop(pv.get, config.duration)
+    thread = ca.CAThread(target=run)
+    thread.start()
+    thread.join()
+    return {'value': out['calls']/out['elapsed'], 'calls': out['calls']}
+
+@benchmark('MB/s')
+def bench_caget_waveform(config):
+    """epics.caget(use_monitor=False) of a 65536 element double waveform"""
+    epics.caput(WAVEFORM_PV, list(range(65536)), wait=True)
+    value = epics.caget(WAVEFORM_PV, use_monitor=False)
+    ncalls, elapsed = rate_loop(lambda: epics.caget(WAVEFORM_PV,
+                                                    use_monitor=False),
+                                config.duration)
+    nbytes = value.nbytes*ncalls
+    return {'value': 1.e-6*nbytes/elapsed, 'calls': ncalls,
+            'gets_per_second': ncalls/elapsed}
+
+@benchmark('gets/s')
+def bench_ca_get_subarray(config):
+    """ca.get() of 4096 elements from the middle of a 65536 element double
+    waveform, selected by the IOC with ca.subarray_name()"""
+    epics.caput(WAVEFORM_PV, list(range(65536)), wait=True)
+    name = ca.subarray_name(WAVEFORM_PV, 32768, 32768+4096)
+    chid = ca.create_channel(name, connect=True)
+    ncalls, elapsed = rate_loop(lambda: ca.get(chid), config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls,
+            'count': ca.element_count(chid)}
+
+@benchmark('values/s')
+def bench_caget_many(config):
+    """epics.caget_many() of 500 double channels"""
+    names = bench_names(min(500, config.nchannels))
+    epics.caget_many(names)
+    ncalls, elapsed = 0, 0.
+    t0 = time.perf_counter()
+    while elapsed < config.duration:
+        values = epics.caget_many(names)
+        ncalls += 1
+        elapsed = time.perf_counter() - t0
+    nvals = len([v for v in values if v is not None])
+    return {'value': nvals*ncalls/elapsed, 'calls': ncalls,
+            'values': nvals}
@@ -0,0 +1,74 @@
+"""
+memory benchmarks: Python memory held per connected channel, per PV, and
+by the PV cache of caget()
+"""
+import gc
+import tracemalloc
+import epics
+from epics import ca, PV
+from epics import pv as pvmod
+from . import benchmark
+from .bench_connect import bench_names
+
+def traced_bytes(create, count):
+    """Python memory (traced with tracemalloc) held by the objects made
+    with create(), per object, after a garbage collection"""
+    gc.collect()
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    objs = create()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return objs, (current - base)/max(1, count)
+
+@benchmark('bytes/channel', higher_is_better=False)
+def bench_channel_memory(config):
+    """Python memory per channel connected with ca.create_channels(),
+    including its cache entry"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels)
+    result, nbytes = traced_bytes(
+        lambda: ca.create_channels(names, timeout=30.0), len(names))
+    nconn = len(result.connected)
+    ca.clear_cache()
+    return {'value': nbytes, 'connected': nconn, 'requested': len(names)}
+
+@benchmark('bytes/PV', higher_is_better=False)
+def bench_pv_memory(config):
+    """Python memory per connected, auto-monitored PV object, including
+    its channel"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels//4)
+    def create():
+        pvs = [PV(name) for name in names]
+        for pv in pvs:
+            pv.wait_for_connection(timeout=10.0)
+        ca.poll(evt=0.1)
+        return pvs
+    pvs, nbytes = traced_bytes(create, len(names))
+    nconn = sum(int(pv.connected) for pv in pvs)
+    for pv in pvs:
+        pv.disconnect()
+    return {'value': nbytes, 'connected': nconn, 'requested': len(names)}
+
+@benchmark('bytes', higher_is_better=False)
+def bench_pvcache_bounded_memory(config):
+    """Python memory held after epics.caget() of many different PVs, with
+    the PV cache limited to 50 PVs (pv.PVCACHE_MAXSIZE)"""
+    ca.clear_cache()
+    names = bench_names(config.nchannels//4)
+    maxsize = pvmod.PVCACHE_MAXSIZE
+    pvmod.PVCACHE_MAXSIZE = 50
+    try:
+        def create():
+            for name in names:
+                epics.caget(name)
+        _, nbytes = traced_bytes(create, 1)
+        stats = pvmod.pvcache_stats()
+        nchans = len(ca._cache[ca.current_context()])
+    finally:
+        pvmod.PVCACHE_MAXSIZE = maxsize
+    ca.clear_cache()
+    return {'value': nbytes, 'requested': len(names), 'size': stats['size'],
+            'evictions': stats['evictions'], 'channels': nchans}
@@ -0,0 +1,106 @@
+"""
+monitor benchmarks: events per second delivered to PV callbacks, and
+memory allocated per event
+
+A separate process puts values to the PV as fast as it can, so that the
+event rate is limited by the client and IOC rather than by the writer.
+The writer is started with 'spawn', as libca threads do not survive fork().
+"""
+import time
+import ctypes
+import tracemalloc
+import multiprocessing
+import numpy
+from epics import ca, dbr, PV
+from . import benchmark, rate_loop
+from .bench_get import SCALAR_PV, WAVEFORM_PV
+
+def _writer(pvname, duration, nelm):
+    "put changing values to a PV for `duration` seconds"
+    chid = ca.create_channel(pvname, connect=True)
+    data = numpy.arange(nelm, dtype=float)
+    t0 = time.time()
+    i = 0
+    while time.time() - t0 < duration:
+        i += 1
+        data[0] = i % 1000
+        # wait on every 20th put, so as not to flood the IOC
+        ca.put(chid, data[0] if nelm == 1 else data, wait=(i % 20 == 0))
+
+def count_events(pvname, duration, nelm=1, **pv_kws):
+    """count monitor events seen by a PV callback while a writer process
+    puts values.  Returns (PV, number of events, elapsed time)"""
+    nevents = [0]
+    def onChanges(**kws):
+        nevents[0] += 1
+
+    pv = PV(pvname, auto_monitor=True, callback=onChanges, **pv_kws)
+    pv.wait_for_connection()
+    time.sleep(0.25)
+    writer = multiprocessing.get_context('spawn').Process(
+        target=_writer, args=(pvname, duration, nelm))
+    writer.start()
+    time.sleep(0.25)
+    n0, t0 = nevents[0], time.perf_counter()
+    time.sleep(duration - 0.5)
+    n1, t1 = nevents[0], time.perf_counter()
+    writer.join()
+    return pv, n1-n0, t1-t0
+
+@benchmark('events/s')
+def bench_monitor_scalar(config):
+    """monitor events/s for a double PV"""
+    pv, nevents, elapsed = count_events(SCALAR_PV, config.duration + 1.0)
+    pv.disconnect()
+    return {'value': nevents/elapsed, 'events': nevents}
+
+@benchmark('events/s')
+def bench_monitor_waveform(config):
+    """monitor events/s for a 65536 element double waveform"""
+    pv, nevents, elapsed = count_events(WAVEFORM_PV, config.duration + 1.0,
+                                        nelm=65536)
+    pv.disconnect()
+    return {'value': nevents/elapsed, 'events': nevents,
+            'MB_per_second': 65536*8.e-6*nevents/elapsed}
+
+@benchmark('bytes/event', higher_is_better=False)
+def bench_monitor_allocations(config):
+    """Python memory (traced with tracemalloc) still allocated after
+    monitor events of a double PV, per event, to catch leaks and growing
+    caches.  The peak traced memory during the events is also given."""
+    tracemalloc.start()
+    base, _ = tracemalloc.get_traced_memory()
+    tracemalloc.reset_peak()
+    pv, nevents, elapsed = count_events(SCALAR_PV, config.duration + 1.0)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    pv.disconnect()
+    nevents = max(1, nevents)
+    return {'value': (current - base)/nevents, 'events': nevents,
+            'peak_kbytes': (peak - base)/1024.0}
+
+@benchmark('usec', higher_is_better=False)
+def bench_monitor_stats_overhead(config):
+    """time added to the CA monitor event handler by the channel counters
+    (ca.COLLECT_STATS), per event.  The handler is called directly with a
+    TIME_DOUBLE event for a connected channel, so no IOC events are needed."""
+    chid = ca.create_channel(SCALAR_PV, connect=True)
+    event = dbr.time_double(value=1.0)
+    args = dbr.event_handler_args(usr=lambda **kws: None, chid=chid.value,
+                                  type=dbr.TIME_DOUBLE, count=1,
+                                  raw_dbr=ctypes.addressof(event),
+                                  status=dbr.ECA_NORMAL)
+    handler = lambda: ca._onMonitorEvent(args)
+    collect = ca.COLLECT_STATS
+    rates = {}
+    try:
+        # alternate, taking the best of each, to reduce the effect of noise
+        for setting in (False, True)*5:
+            ca.COLLECT_STATS = setting
+            ncalls, elapsed = rate_loop(handler, config.duration/10.0)
+            rates.setdefault(setting, []).append(elapsed/ncalls)
+    finally:
+        ca.COLLECT_STATS = collect
+    off, on = 1.e6*min(rates[False]), 1.e6*min(rates[True])
+    return {'value': on - off, 'usec_per_event_without': off,
+            'usec_per_event_with': on}
@@ -0,0 +1,71 @@
+"""
+put benchmarks: latency of put(wait=True), rate of puts without wait (of
+scalars and waveforms), and caput_many(wait='all') throughput
+"""
+import time
+import epics
+import numpy
+from epics import ca, PV
+from . import benchmark, rate_loop, percentiles
+from .bench_connect import bench_names
+from .bench_get import SCALAR_PV, WAVEFORM_PV
+
+@benchmark('usec', higher_is_better=False)
+def bench_put_wait_latency(config):
+    """median latency of ca.put(wait=True) to a double channel"""
+    chid = ca.create_channel(SCALAR_PV, connect=True)
+    times = []
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < config.duration:
+        t1 = time.perf_counter()
+        ca.put(chid, 0.5 + len(times) % 10, wait=True)
+        times.append(1.e6*(time.perf_counter() - t1))
+    out = percentiles(times)
+    out.update({'value': out['p50'], 'calls': len(times)})
+    return out
+
+@benchmark('usec', higher_is_better=False)
+def bench_pv_put_wait_latency(config):
+    """median latency of PV.put(wait=True) to a double PV"""
+    pv = PV(SCALAR_PV)
+    pv.wait_for_connection()
+    times = []
+    t0 = time.perf_counter()
+    while time.perf_counter() - t0 < config.duration:
+        t1 = time.perf_counter()
+        pv.put(0.5 + len(times) % 10, wait=True)
+        times.append(1.e6*(time.perf_counter() - t1))
+    pv.disconnect()
+    out = percentiles(times)
+    out.update({'value': out['p50'], 'calls': len(times)})
+    return out
+
+@benchmark('puts/s')
+def bench_ca_put(config):
+    """ca.put() to a double channel, without waiting"""
+    chid = ca.create_channel(SCALAR_PV, connect=True)
+    ncalls, elapsed = rate_loop(lambda: ca.put(chid, 1.5), config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('puts/s')
+def bench_ca_put_waveform(config):
+    """ca.put() of a numpy array to a 65536 element double channel"""
+    chid = ca.create_channel(WAVEFORM_PV, connect=True)
+    value = numpy.linspace(0, 1, ca.element_count(chid))
+    ncalls, elapsed = rate_loop(lambda: ca.put(chid, value), config.duration)
+    return {'value': ncalls/elapsed, 'calls': ncalls}
+
+@benchmark('puts/s')
+def bench_caput_many_wait(config):
+    """epics.caput_many(wait='all') to 1000 double channels"""
+    names = bench_names(min(1000, config.nchannels))
+    epics.caput_many(names, [0.0]*len(names), wait='all')
+    ncalls, elapsed = 0, 0.
+    t0 = time.perf_counter()
+    while elapsed < config.duration:
+        status = epics.caput_many(names, [1.0 + ncalls % 10]*len(names),
+                                  wait='all')
+        ncalls += 1
+        elapsed = time.perf_counter() - t0
+    nputs = status.count(1)
+    return {'value': nputs*ncalls/elapsed, 'calls': ncalls, 'puts': nputs}
@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+start the pyepics test IOC for benchmarks
+
+The records of tests/Setup/st.cmd are loaded, along with a generated
+database of NCHANNELS 'ao' records (PyBench:ao0 ...) used for the
+connection benchmarks.  The IOC runs on its own CA server port, so that
+it does not interfere with any test IOC that is already running.
+
+softIoc is used if found (on PATH or in $EPICS_BASE), otherwise the
+softIoc of the epicscorelibs package, if installed.
+"""
+import os
+import re
+import sys
+import time
+import shutil
+import tempfile
+import importlib.util
+import subprocess
+
+SETUP_DIR = os.path.join(os.path.dirname(os.path.dirname(
+    os.path.abspath(__file__))), 'tests', 'Setup')
+
+BENCH_PREFIX = 'PyBench:'
+NCHANNELS = 2000
+SERVER_PORT = 5090
+
+def find_softioc():
+    "return the command to run softIoc, or None if not found"
+    exe = shutil.which('softIoc')
+    if exe is None and 'EPICS_BASE' in os.environ:
+        arch = os.environ.get('EPICS_HOST_ARCH', 'linux-x86_64')
+        exe = os.path.join(os.environ['EPICS_BASE'], 'bin', arch, 'softIoc')
+        if not os.path.exists(exe):
+            exe = None
+    if exe is not None:
+        return [exe]
+    # do not import epicscorelibs here: loading its libCom alongside
+    # the libca used by pyepics breaks the client
+    if importlib.util.find_spec('epicscorelibs') is None:
+        return None
+    return [sys.executable, '-m', 'epicscorelibs.ioc']
+
+def bench_db(nchannels=NCHANNELS):
+    "text of a database with nchannels ao records"
+    rec = 'record(ao, "$(P)ao%d") {\n  field(VAL, "%d")\n}\n'
+    return ''.join(rec % (i, i) for i in range(nchannels))
+
+def ca_environ(port=SERVER_PORT):
+    "CA environment variables for a client or server on localhost:port"
+    return {'EPICS_CA_ADDR_LIST': 'localhost',
+            'EPICS_CA_AUTO_ADDR_LIST': 'NO',
+            'EPICS_CA_SERVER_PORT': str(port),
+            'EPICS_CAS_SERVER_PORT': str(port),
+            'EPICS_CA_MAX_ARRAY_BYTES': '20100300'}
+
+class TestIOC:
+    """
+    context manager running the test IOC in a subprocess
+
+    >>> with TestIOC() as ioc:
+    ...     run_benchmarks()
+    """
+    def __init__(self, nchannels=NCHANNELS, port=SERVER_PORT):
+        self.nchannels = nchannels
+        self.port = port
+        self.proc = None
+        self.tmpdir = None
+
+    def command(self, softioc, dbfile):
+        "command to run softIoc, with the records loaded by st.cmd"
+        with open(os.path.join(SETUP_DIR, 'st.cmd'), 'r') as fh:
+            stcmd = fh.read()
+        if softioc[-1] != 'epicscorelibs.ioc':
+            stcmd = stcmd.replace('iocInit', 'dbLoadRecords("%s", "P=%s")\n'
+                                  'iocInit' % (dbfile, BENCH_PREFIX))
+            startup = os.path.join(self.tmpdir, 'st.cmd')
+            with open(startup, 'w') as fh:
+                fh.write(stcmd)
+            return softioc + [startup]
+        # this softIoc takes database files and macros, not a startup script
+        cmd = list(softioc)
+        loads = re.findall(r'dbLoadRecords\("([^"]+)",\s*"([^"]*)"\)', stcmd)
+        for dbname, macros in loads + [(dbfile, 'P=%s' % BENCH_PREFIX)]:
+            cmd.extend(['-m', macros, '-d', dbname])
+        return cmd
+
+    def start(self):
+        softioc = find_softioc()
+        if softioc is None:
+            raise RuntimeError('cannot find softIoc: set EPICS_BASE, or '
+                               'install epicscorelibs')
+        self.tmpdir = tempfile.mkdtemp(prefix='pyepics_bench')
+        dbfile = os.path.join(self.tmpdir, 'bench.db')
+        with open(dbfile, 'w') as fh:
+            fh.write(bench_db(self.nchannels))
+
+        env = dict(os.environ)
+        env.update(ca_environ(self.port))
+        self.proc = subprocess.Popen(self.command(softioc, dbfile),
+                                     cwd=SETUP_DIR, env=env,
+                                     stdin=subprocess.PIPE,
+                                     stdout=subprocess.DEVNULL,
+                                     stderr=subprocess.DEVNULL)
+        time.sleep(2.0)
+        if self.proc.poll() is not None:
+            raise RuntimeError('softIoc exited with status %d' %
+                               self.proc.returncode)
+        return self
+
+    def stop(self):
+        if self.proc is not None:
+            self.proc.terminate()
+            try:
+                self.proc.wait(5)
+            except subprocess.TimeoutExpired:
+                self.proc.kill()
+            self.proc = None
+        if self.tmpdir is not None:
+            shutil.rmtree(self.tmpdir, ignore_errors=True)
+            self.tmpdir = None
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
@@ -26,6 +26,7 @@ Device = device.Device
 poll = ca.poll
 
 get_pv = pv.get_pv
+get_pvs = pv.get_pvs
 
 CAProcess = multiproc.CAProcess
 CAPool = multiproc.CAPool
@@ -324,18 +325,13 @@ def caget_many(pvlist, as_string=False, as_numpy=True, count=None,
     this does not cache PV objects.
 
     """
-    chids, connected, out = [], [], []
-    for name in pvlist:
-        chids.append(ca.create_channel(name, auto_cb=False, connect=False))
-
-    all_connected = False
+    out = []
     if conn_timeout is not None:
         connection_timeout = conn_timeout
-    expire_time = time.time() + connection_timeout
-    while (not all_connected and (time.time() < expire_time)):
-        connected = [dbr.CS_CONN==ca.state(chid) for chid in chids]
-        all_connected = all(connected)
-        poll()
+    channels = ca.create_channels(pvlist, timeout=connection_timeout)
+    chids = [channels.chids.get(name, None) for name in pvlist]
+    connected = [chid is not None and dbr.CS_CONN==ca.state(chid)
+                 for chid in chids]
 
     for (chid, conn) in zip(chids, connected):
         if conn:
@@ -372,13 +368,14 @@ def caput_many(pvlist, values, wait=False, connection_timeout=5.0,
 
     Returns
     -------
-     a list of ints or `None`, with values of 1 if the put was successful,
-     or a negative number if the put failed (say, the timeout was exceeded),
-     or `None` if the connection failed.
+     a list of ints, with values of 1 if the put was successful, or -1 if
+     the connection or the put failed (say, the timeout was exceeded).
 
     Notes
     -----
-    1. This does not maintain the PV objects.
+    1. This does not create PV objects: it uses :func:`ca.create_channels`
+       and :func:`ca.put_many`.  Use :func:`ca.put_many` directly for the
+       time each put took to complete.
     2. With `wait='each'`, *each* put operation will block until it is
        complete or until the put_timeout duration expires.
        With `wait='all'`, this method will block until *all* put
@@ -389,24 +386,16 @@ def caput_many(pvlist, values, wait=False, connection_timeout=5.0,
     """
     if len(pvlist) != len(values):
         raise ValueError("List of PV names must be equal to list of values.")
-    kwargs = {'auto_monitor': False, 'timeout': connection_timeout}
-    pvs = [get_pv(name, **kwargs) for name in pvlist]
-
-    wait_all = wait=='all'
-    put_kws = {'wait': (wait=='each'), 'timeout': put_timeout,
-               'use_complete': wait_all}
-    put_ret = []
-    for pvo, val in zip(pvs, values):
-        put_ret.append(pvo.put(val, **put_kws))
-    out = None
-    if wait_all:
-        start_time = time.time()
-        while not all(((pv.connected and pv.put_complete) for pv in pvs)):
-            ca.poll()
-            elapsed_time = time.time() - start_time
-            if elapsed_time > put_timeout:
-                break
-        out = [1 if (pv.connected and pv.put_complete) else -1 for pv in pvs]
+    channels = ca.create_channels(pvlist, timeout=connection_timeout)
+    chids = [channels.chids.get(name, None) for name in pvlist]
+
+    if wait == 'each':
+        out = []
+        for chid, val in zip(chids, values):
+            result = ca.put_many([chid], [val], wait=True, timeout=put_timeout)
+            out.extend(result.status)
     else:
-        out = [val if val == 1 else -1 for val in put_ret]
+        result = ca.put_many(chids, values, wait=(wait == 'all'),
+                             timeout=put_timeout)
+        out = result.status
     return out
@@ -0,0 +1,296 @@
+#!/usr/bin/env python
+"""
+asyncio interface to Channel Access
+
+Provides AsyncPV, with awaitable get() and put() and an asynchronous
+iterator of monitor events, built on the ca module.  Results from the
+CA callbacks are handed to the event loop with call_soon_threadsafe(),
+so that many requests can be in flight at once without a thread each:
+
+   import asyncio
+   from epics import aio
+
+   async def main():
+       pv = aio.AsyncPV('XXX:m1.VAL')
+       print(await pv.get())
+       await pv.put(2.0, wait=True)
+       async for event in pv.monitor():
+           print(event['pvname'], event['value'])
+
+   asyncio.run(main())
+
+"""
+import asyncio
+import functools
+import weakref
+
+from . import ca
+
+__all__ = ['AsyncPV', 'get_pv', 'caget', 'caput']
+
+
+def _call_soon(loop, fcn, *args):
+    """schedule fcn(*args) in the event loop from a CA callback,
+    ignoring loops that have been closed"""
+    try:
+        loop.call_soon_threadsafe(fcn, *args)
+    except RuntimeError:
+        pass
+
+def _set_done(future, result=None):
+    "set the result of a future, unless it was cancelled or timed out"
+    if not future.done():
+        future.set_result(result)
+
+def _put_latest(queue, item):
+    "put an item to a queue, dropping the oldest item if the queue is full"
+    if queue.full():
+        queue.get_nowait()
+    queue.put_nowait(item)
+
+
+class AsyncPV:
+    """Epics Process Variable for use with asyncio
+
+    An AsyncPV must be created and used from a coroutine running in the
+    event loop (or be given the `loop` to use), in a thread that can use
+    the initial CA context.
+
+    >>> pv = AsyncPV('XXX:m1.VAL')
+    >>> value = await pv.get()
+    >>> await pv.put(2.0, wait=True)
+
+    Parameters
+    ----------
+    pvname : str
+        name of Epics Process Variable
+    form : str
+        which epics *data type* to use: the 'native', 'time', or the 'ctrl'
+        (control) variant ['time']
+    loop : asyncio event loop or ``None``
+        event loop to deliver results to [running loop]
+    """
+    def __init__(self, pvname, form='time', loop=None):
+        self.pvname = pvname.strip()
+        self.form = form.lower()
+        if loop is None:
+            loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._conn_event = asyncio.Event()
+        self.connected = False
+
+        if ca.current_context() is None:
+            ca.use_initial_context()
+        self.context = ca.current_context()
+        self.chid = ca.create_channel(self.pvname,
+                                      callback=self.__on_connect)
+
+    def __on_connect(self, pvname=None, chid=None, conn=True, **kws):
+        "connection callback, run from CA"
+        _call_soon(self._loop, self.__set_connected, conn)
+
+    def __set_connected(self, conn):
+        self.connected = conn
+        if conn:
+            self._conn_event.set()
+        else:
+            self._conn_event.clear()
+
+    def __repr__(self):
+        status = 'connected' if self.connected else 'disconnected'
+        return "<AsyncPV '%s', %s>" % (self.pvname, status)
+
+    async def wait_for_connection(self, timeout=5.0):
+        """wait for the PV to connect, returning whether it is connected
+
+        Parameters
+        ----------
+        timeout : float
+            maximum time to wait (in seconds) for connection [5]
+        """
+        if not self.connected:
+            try:
+                await asyncio.wait_for(self._conn_event.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        return self.connected
+
+    def _ftype(self, form=None):
+        "field type to use for a request of a given form"
+        if form is None:
+            form = self.form
+        return ca.promote_type(self.chid, use_time=(form == 'time'),
+                               use_ctrl=(form == 'ctrl'))
+
+    async def get_with_metadata(self, count=None, as_string=False,
+                                as_numpy=True, timeout=5.0, form=None):
+        """get the value and metadata of the PV, as a dictionary.
+
+        Parameters
+        ----------
+        count : int or ``None``
+            maximum number of elements to get [None: all elements]
+        as_string : bool
+            whether to return the string representation of the value [False]
+        as_numpy : bool
+            whether to return array data as numpy arrays [True]
+        timeout : float
+            maximum time to wait (in seconds) for connection and data [5]
+        form : str or ``None``
+            'native', 'time', or 'ctrl' [None: the form of the PV]
+
+        Returns
+        -------
+        dict with 'value' and metadata, or ``None`` on timeout.
+
+        Notes
+        -----
+        Concurrent gets of the same PV and form share a single CA request,
+        unless the pending request is for fewer elements than asked for.
+        """
+        if not await self.wait_for_connection(timeout=timeout):
+            return None
+        ftype = self._ftype(form)
+        nelem = ca.element_count(self.chid)
+        if count is None:
+            req_count, count = 0, nelem
+        else:
+            req_count = count = min(count, nelem)
+
+        entry = ca.get_cache(self.pvname)
+        loop = self._loop
+        expire = loop.time() + timeout
+        while True:
+            done = loop.create_future()
+            request = ca._request_get(entry, self.chid, ftype, req_count,
+                                      callback=functools.partial(
+                                          _call_soon, loop, _set_done, done))
+            ca.flush_io()
+            try:
+                await asyncio.wait_for(done, expire - loop.time())
+            except asyncio.TimeoutError:
+                return None
+            # a shared request for fewer elements: ask again once it is done
+            if request.count == 0 or 0 < req_count <= request.count:
+                break
+        return ca._unpack_get_result(self.chid, request.result, ftype=ftype,
+                                     count=count, as_string=as_string,
+                                     as_numpy=as_numpy)
+
+    async def get(self, count=None, as_string=False, as_numpy=True,
+                  timeout=5.0):
+        """get the value of the PV, or ``None`` on timeout.
+        See :meth:`get_with_metadata` for the arguments."""
+        md = await self.get_with_metadata(count=count, as_string=as_string,
+                                          as_numpy=as_numpy, timeout=timeout,
+                                          form='native')
+        return None if md is None else md['value']
+
+    async def put(self, value, wait=False, timeout=30.0):
+        """put a value to the PV
+
+        Parameters
+        ----------
+        value : object
+            value to put
+        wait : bool
+            whether to wait for processing to complete [False]
+        timeout : float
+            maximum time to wait (in seconds) for connection and, with
+            `wait=True`, for processing to complete [30]
+
+        Returns
+        -------
+        ``None`` if the PV did not connect.  Otherwise, the return value
+        of :func:`ca.put` for `wait=False`, and for `wait=True` 1 once
+        processing has completed, or -1 if the timeout expired first.
+        """
+        if not await self.wait_for_connection(timeout=timeout):
+            return None
+        if not wait:
+            return ca.put(self.chid, value)
+
+        loop = self._loop
+        done = loop.create_future()
+        ca.put(self.chid, value,
+               callback=lambda **kws: _call_soon(loop, _set_done, done))
+        try:
+            await asyncio.wait_for(done, timeout)
+        except asyncio.TimeoutError:
+            return -1
+        return 1
+
+    async def monitor(self, maxsize=0, mask=None, form=None, timeout=5.0):
+        """asynchronous iterator of monitor events for the PV
+
+        >>> async for event in pv.monitor():
+        ...     print(event['value'], event['timestamp'])
+
+        Each event is a dictionary with 'value', 'pvname', and the metadata
+        sent by CA ('timestamp', 'severity', etc, depending on `form`).
+
+        Parameters
+        ----------
+        maxsize : int
+            maximum number of events waiting to be read.  When full, the
+            oldest event is dropped.  [0: no limit]
+        mask : int or ``None``
+            subscription event mask [None: the ca default]
+        form : str or ``None``
+            'native', 'time', or 'ctrl' [None: the form of the PV]
+        timeout : float
+            maximum time to wait (in seconds) for connection [5]
+
+        Raises
+        ------
+        ChannelAccessException
+            if the PV does not connect within `timeout`.
+
+        Notes
+        -----
+        The subscription is cleared when the iterator is closed.  Since
+        leaving an `async for` loop with `break` does not close it right
+        away, use `contextlib.aclosing(pv.monitor())` to control that.
+        """
+        loop = self._loop
+        queue = asyncio.Queue(maxsize)
+
+        def on_change(**kws):
+            _call_soon(loop, _put_latest, queue, kws)
+
+        if not await self.wait_for_connection(timeout=timeout):
+            fmt = "monitor() timed out waiting '%s' to connect (%d seconds)"
+            raise ca.ChannelAccessException(fmt % (self.pvname, timeout))
+        _, _, evid = ca.create_subscription(self.chid, ftype=self._ftype(form),
+                                            mask=mask, callback=on_change)
+        try:
+            while True:
+                yield await queue.get()
+        finally:
+            ca.clear_subscription(evid)
+
+
+_PVcache_ = weakref.WeakKeyDictionary()
+
+def get_pv(pvname, form='time'):
+    """get an AsyncPV for the running event loop, creating it if needed."""
+    loop = asyncio.get_running_loop()
+    pvs = _PVcache_.setdefault(loop, {})
+    pvid = (pvname, form)
+    if pvid not in pvs:
+        pvs[pvid] = AsyncPV(pvname, form=form, loop=loop)
+    return pvs[pvid]
+
+async def caget(pvname, as_string=False, count=None, as_numpy=True,
+                timeout=5.0):
+    """get the value of a PV, or ``None`` on a failure to connect or
+    timeout.  To get many PVs concurrently, use `asyncio.gather`:
+
+    >>> values = await asyncio.gather(*[caget(name) for name in names])
+    """
+    return await get_pv(pvname).get(count=count, as_string=as_string,
+                                    as_numpy=as_numpy, timeout=timeout)
+
+async def caput(pvname, value, wait=False, timeout=60.0):
+    """put a value to a PV.  See :meth:`AsyncPV.put` for return values."""
+    return await get_pv(pvname).put(value, wait=wait, timeout=timeout)
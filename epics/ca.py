@@ -19,11 +19,14 @@ from ctypes.util import find_library
 
 import atexit
 import functools
+import itertools
 import os
+import struct
 import sys
 import threading
 import time
 import warnings
+from bisect import bisect_left
 from copy import deepcopy
 from collections import defaultdict
 from math import log10
@@ -65,6 +68,15 @@ PREEMPTIVE_CALLBACK = True
 
 AUTO_CLEANUP = True
 
+## LIBCA_BACKEND, if set, is used in place of the CA library: an object
+# with the ca_*() functions of libca and the dbr_value_offset array,
+# such as epics.fakeca.FakeCA.  It must be set before libca is initialized.
+LIBCA_BACKEND = None
+
+## COLLECT_STATS sets whether counters of events, data received, and
+# callback and get/put times are kept for each channel: see stats()
+COLLECT_STATS = True
+
 # set this to control whether messages from CA
 # (about caRepeater or lost connections) are disabled at startup
 WITH_CA_MESSAGES = False
@@ -87,6 +99,12 @@ DEFAULT_CONNECTION_TIMEOUT = 2.0
 _cache = defaultdict(dict)
 _chid_cache = {}
 
+# Cache items by integer handle, given to ca_create_channel as the user
+# argument of the channel, so that connection events arriving before
+# _chid_cache is updated can still find their cache item:
+_handle_cache = {}
+_handle_ids = itertools.count(1)
+
 # Puts with completion in progress:
 _put_completes = []
 
@@ -105,6 +123,147 @@ Empty = _GetPending  # back-compat
 GET_PENDING = _GetPending()
 
 
+class _GetRequest:
+    """
+    The state of the latest get request for a channel and field type, as
+    held in `_CacheItem.get_results`.  `result` is ``None`` (no request),
+    GET_PENDING (awaiting callback), the received data, or an exception.
+    `event` is set by the get callback when a pending request completes,
+    after which any functions in `callbacks` are called with no arguments.
+    `start` is the time (from time.perf_counter()) of a pending request,
+    and `count` the element count asked for (0 for all elements).
+    """
+    __slots__ = ('result', 'event', 'callbacks', 'start', 'count')
+
+    def __init__(self, result=None, count=0):
+        self.result = result
+        self.event = None
+        self.callbacks = None
+        self.start = None
+        self.count = count
+        if result is GET_PENDING:
+            self.event = threading.Event()
+            self.start = time.perf_counter()
+
+
+class DurationHistogram:
+    """
+    Counts of durations (in seconds) in logarithmic bins, with their total
+    and maximum, for callback times and get/put latencies.
+
+    `BINS` holds the upper edges of the bins: the last bin counts all
+    longer durations.  Percentiles are given as the upper edge of the bin
+    holding them, so they are upper bounds.  `counts` is ``None`` until
+    the first duration is added.
+    """
+    BINS = (1.e-5, 3.e-5, 1.e-4, 3.e-4, 1.e-3, 3.e-3,
+            1.e-2, 3.e-2, 0.1, 0.3, 1.0, 3.0)
+    __slots__ = ('counts', 'total', 'max')
+
+    def __init__(self):
+        self.counts = None
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, duration):
+        "add a duration"
+        counts = self.counts
+        if counts is None:
+            counts = self.counts = [0]*(len(self.BINS) + 1)
+        counts[bisect_left(self.BINS, duration)] += 1
+        self.total += duration
+        if duration > self.max:
+            self.max = duration
+
+    def merge(self, other):
+        "add the counts of another histogram"
+        if other.counts is None:
+            return
+        if self.counts is None:
+            self.counts = [0]*(len(self.BINS) + 1)
+        for i, count in enumerate(other.counts):
+            self.counts[i] += count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+
+    @property
+    def count(self):
+        "number of durations"
+        if self.counts is None:
+            return 0
+        return sum(self.counts)
+
+    def percentile(self, pct):
+        "upper bound for the pct (0 to 100) percentile, or None if empty"
+        count = self.count
+        if count == 0:
+            return None
+        threshold, seen = pct*count/100.0, 0
+        for i, nbin in enumerate(self.counts):
+            seen += nbin
+            if nbin > 0 and seen >= threshold:
+                return self.BINS[i] if i < len(self.BINS) else self.max
+        return self.max
+
+    def as_dict(self):
+        "summary as a dictionary"
+        count = self.count
+        return {'count': count,
+                'mean': self.total/count if count > 0 else None,
+                'max': self.max,
+                'p50': self.percentile(50),
+                'p99': self.percentile(99),
+                'bins': list(zip(self.BINS + (None,),
+                                 self.counts or [0]*(len(self.BINS) + 1)))}
+
+
+class _ChannelStats:
+    """
+    Instrumentation counters for a channel, held in `_CacheItem.stats`.
+    Times of events are from time.perf_counter().
+    """
+    __slots__ = ('events', 'bytes', 'last_event', 'callback_time', 'gets',
+                 'get_latency', 'puts', 'put_latency', 'connects',
+                 'disconnects')
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        "reset all counters"
+        self.events = 0
+        self.bytes = 0
+        self.last_event = None
+        self.callback_time = DurationHistogram()
+        self.gets = 0
+        self.get_latency = DurationHistogram()
+        self.puts = 0
+        self.put_latency = DurationHistogram()
+        self.connects = 0
+        self.disconnects = 0
+
+    def as_dict(self, now=None):
+        "counters as a dictionary"
+        if now is None:
+            now = time.perf_counter()
+        age = None
+        if self.last_event is not None:
+            age = now - self.last_event
+        return {'events': self.events,
+                'bytes': self.bytes,
+                'last_event_age': age,
+                'callback_time': self.callback_time.as_dict(),
+                'gets': self.gets,
+                'get_latency': self.get_latency.as_dict(),
+                'puts': self.puts,
+                'put_latency': self.put_latency.as_dict(),
+                'reconnects': max(0, self.connects - 1),
+                'disconnects': self.disconnects}
+
+# the (empty) counters reported for channels without any counters yet
+_NO_STATS = _ChannelStats()
+
+
 class _SentinelWithLock:
     """
     Used in create_channel, this sentinel ensures that two threads in the same
@@ -166,31 +325,97 @@ class _CacheItem:
     failures : int
         Number of failed connection attempts
     get_results : dict
-        Keyed on the requested field type -> requested value
+        Keyed on the requested field type -> _GetRequest
     callbacks : list
         One or more user functions to be called on change of connection status
     access_event_callbacks : list
         One or more user functions to be called on change of access rights
+    stats : _ChannelStats or None
+        Counters of events, data received, callback times and get/put
+        latencies (see :func:`stats`), created by :meth:`counters` when
+        first needed while :data:`COLLECT_STATS` is ``True``
+
+    handle : int
+        The key of this item in `_handle_cache`, which is the user argument
+        of the channel (see `ca_puser`)
+    put_desc : _PutDescriptor or None
+        Type, element count and buffer for puts, created by the first
+        put and dropped on each change of connection status
+    ftype : int or None
+        The field type, set when the channel connects
+    count : int or None
+        The element count, set when the channel connects
+    host : str or None
+        The host name, set when first asked for after connecting
+    access : int or None
+        The access rights (bit 0 for read, bit 1 for write), set by access
+        rights events
+    value_cache : _ValueCache or None
+        The latest value, kept by a subscription (see
+        :func:`enable_value_cache`)
+    pvcache_owned : bool
+        Whether the channel was created for the PV cache of :mod:`epics.pv`
+        and not asked for since, so that the cache may clear it
+
+    `ftype`, `count`, `host` and `access` are ``None`` while the channel is
+    not connected, or when not known, and libca is asked instead.
+
+    `get_results` and `access_event_callback` are created when first used.
     '''
+    __slots__ = ('_chid', 'chid_int', 'handle', 'context', 'lock', 'conn',
+                 'pvname', 'ts', 'failures', '_get_results', 'callbacks',
+                 '_access_event_callback', 'stats', 'put_desc', 'ftype',
+                 'count', 'host', 'access', 'value_cache', 'pvcache_owned')
 
-    def __init__(self, chid, pvname, callbacks=None, ts=0):
+    def __init__(self, chid, pvname, callbacks=None, ts=0, context=None):
         self._chid = None
-        self.context = current_context()
+        self.chid_int = None
+        self.handle = None
+        if context is None:
+            context = current_context()
+        self.context = context
         self.lock = threading.RLock()
         self.conn = False
         self.pvname = pvname
         self.ts = ts
         self.failures = 0
 
-        self.get_results = defaultdict(lambda: [None])
+        self._get_results = None
 
         if callbacks is None:
             callbacks = []
 
         self.callbacks = callbacks
-        self.access_event_callback = []
+        self._access_event_callback = None
+        self.stats = None
+        self.put_desc = None
+        self.ftype = None
+        self.count = None
+        self.host = None
+        self.access = None
+        self.value_cache = None
+        self.pvcache_owned = False
         self.chid = chid
 
+    def counters(self):
+        "the _ChannelStats of the channel, created when first needed"
+        stats = self.stats
+        if stats is None:
+            stats = self.stats = _ChannelStats()
+        return stats
+
+    @property
+    def get_results(self):
+        if self._get_results is None:
+            self._get_results = defaultdict(_GetRequest)
+        return self._get_results
+
+    @property
+    def access_event_callback(self):
+        if self._access_event_callback is None:
+            self._access_event_callback = []
+        return self._access_event_callback
+
     @property
     def chid(self):
         return self._chid
@@ -201,6 +426,8 @@ class _CacheItem:
             chid = dbr.chid_t(chid)
 
         self._chid = chid
+        # the integer channel id is kept, as it is needed for each event
+        self.chid_int = _chid_to_int(chid)
 
     def __repr__(self):
         return (
@@ -210,7 +437,7 @@ class _CacheItem:
                       'connected' if self.conn else 'disconnected',
                       self.failures,
                       len(self.callbacks),
-                      len(self.access_event_callback),
+                      len(self._access_event_callback or ()),
                       self.chid_int,
                       )
         )
@@ -219,11 +446,6 @@ class _CacheItem:
         # back-compat
         return getattr(self, key)
 
-    @property
-    def chid_int(self):
-        'The channel id, as an integer'
-        return _chid_to_int(self.chid)
-
     def run_access_event_callbacks(self, ra, wa):
         '''
         Run all access event callbacks
@@ -235,7 +457,7 @@ class _CacheItem:
         wa : bool
             Write-access
         '''
-        for callback in list(self.access_event_callback):
+        for callback in list(self._access_event_callback or ()):
             if callable(callback):
                 callback(ra, wa)
 
@@ -255,6 +477,13 @@ class _CacheItem:
             self.conn = conn
             self.ts = timestamp
             self.failures = 0
+            # the channel type and count may change on reconnection
+            self.put_desc = None
+            if COLLECT_STATS:
+                if conn:
+                    self.counters().connects += 1
+                else:
+                    self.counters().disconnects += 1
 
         chid_int = self.chid_int
         for callback in list(self.callbacks):
@@ -267,6 +496,132 @@ class _CacheItem:
                 callback(pvname=self.pvname, chid=chid_int, conn=self.conn)
 
 
+class MonitorRingBuffer:
+    '''
+    A fixed-slot ring of NumPy arrays for numerical monitor events.
+
+    Each event payload is copied once from the libca buffer into the next
+    slot of the ring, and the subscription callback receives a read-only
+    view of that slot (as `value`) and the sequence number of the slot (as
+    `slot_seq`), instead of a newly allocated array for every event.
+
+    Slots are reused: the data behind a view is overwritten `nslots`
+    events later.  Consumers that hold on to a view should use
+    :meth:`is_valid` with the sequence number to check whether the data
+    is still intact, or copy the view.  Enlarging the slots (for a larger
+    event, or a new data type) makes all earlier slots invalid.
+
+    Events with a single element are not written to the ring: their value
+    is sent as a scalar, as without a ring.
+
+    Parameters
+    ----------
+    nslots : int
+        number of slots in the ring
+    count : int or ``None``
+        number of elements in each slot.  If ``None``, this is set from
+        the first event.  Slots are enlarged if a larger event arrives.
+    dtype : numpy dtype or ``None``
+        data type of each slot.  If ``None``, this is set from the native
+        type of the first event.
+    out : numpy.ndarray or ``None``
+        caller-supplied array to use for the slots, instead of allocating
+        them: a 1-D array is a single slot, and the rows of a 2-D array
+        are the slots.  `nslots`, `count` and `dtype` are then taken from
+        `out`, events with more elements are truncated to `count`, and
+        data is converted to the dtype of `out` if needed.
+    '''
+
+    def __init__(self, nslots=4, count=None, dtype=None, out=None):
+        if not HAS_NUMPY:
+            raise ChannelAccessException('MonitorRingBuffer requires numpy')
+        self.nslots = max(1, int(nslots))
+        self.count = count
+        self.dtype = None
+        self.seq = -1
+        self._first_seq = 0
+        self._slots = None
+        self._fixed = out is not None
+        if self._fixed:
+            if out.ndim == 1:
+                out = out.reshape((1, len(out)))
+            if (out.ndim != 2 or not out.flags.c_contiguous
+                    or not out.flags.writeable):
+                raise ValueError('out must be a writeable, C-contiguous '
+                                 '1-D or 2-D array')
+            self._slots = out
+            self.nslots, self.count = out.shape
+            self.dtype = out.dtype
+        self._views = [None]*self.nslots
+        if count is not None and dtype is not None and not self._fixed:
+            self._allocate(count, dtype)
+
+    def _allocate(self, count, dtype):
+        "(re)allocate the slots, invalidating the data of earlier events"
+        self._slots = numpy.zeros((self.nslots, count), dtype=dtype)
+        self._views = [None]*self.nslots
+        self._first_seq = self.seq + 1
+        self.count = count
+        self.dtype = self._slots.dtype
+
+    def write(self, data, count, ntype):
+        '''
+        Copy native data into the next slot
+
+        Parameters
+        ----------
+        data : ctypes.Array
+            native data as returned by libca
+        count : int
+            number of elements in `data`
+        ntype : int
+            native DBR type of `data`
+
+        Returns
+        -------
+        (view, seq) : the read-only view of the slot and its sequence number
+        '''
+        dtype = dbr.NP_Map[ntype]
+        if self._fixed:
+            count = min(count, self.count)
+        elif (self._slots is None or count > self.count or
+                self.dtype != dtype):
+            self._allocate(max(count, self.count or 0), dtype)
+
+        seq = self.seq + 1
+        index = seq % self.nslots
+        slot = self._slots[index]
+        if self.dtype == dtype:
+            ctypes.memmove(slot.ctypes.data, data, count*self.dtype.itemsize)
+        else:
+            slot[:count] = numpy.ctypeslib.as_array(data)[:count]
+
+        view = self._views[index]
+        if view is None or len(view) != count:
+            view = slot[:count]
+            view.flags.writeable = False
+            self._views[index] = view
+        self.seq = seq
+        return view, seq
+
+    def is_valid(self, seq):
+        "return whether the slot with sequence number `seq` is still intact"
+        return (self._first_seq <= seq <= self.seq and
+                (self.seq - seq) < self.nslots)
+
+    def get(self, seq):
+        '''return the read-only view for sequence number `seq`, or ``None``
+        if that slot has already been reused'''
+        if not self.is_valid(seq):
+            return None
+        return self._views[seq % self.nslots]
+
+    def __repr__(self):
+        return '<{} nslots={} count={} dtype={} seq={}>'.format(
+            self.__class__.__name__, self.nslots, self.count, self.dtype,
+            self.seq)
+
+
 def find_lib(inp_lib_name='ca'):
     """
     find location of ca dynamic library
@@ -345,7 +700,8 @@ def initialize_libca():
 
     This loads the shared object library (DLL) to establish Channel Access
     Connection. The value of :data:`PREEMPTIVE_CALLBACK` sets the pre-emptive
-    callback model.
+    callback model.  If :data:`LIBCA_BACKEND` is set, it is used instead of
+    the shared library (see :mod:`epics.fakeca`).
 
    This **must** be called prior to any actual use of the CA library, but
     will be called automatically by the the :func:`withCA` decorator, so
@@ -368,42 +724,50 @@ def initialize_libca():
 
     global libca, initial_context
 
-    if os.name == 'nt':
-        load_dll = ctypes.windll.LoadLibrary
+    if LIBCA_BACKEND is not None:
+        libca = LIBCA_BACKEND
     else:
-        load_dll = ctypes.cdll.LoadLibrary
-    try:
-        # force loading the chosen version of libCom
         if os.name == 'nt':
-            load_dll(find_libCom())
-        libca = load_dll(find_libca())
-    except Exception as exc:
-        raise ChannelAccessException('loading Epics CA DLL failed: ' + str(exc))
+            load_dll = ctypes.windll.LoadLibrary
+        else:
+            load_dll = ctypes.cdll.LoadLibrary
+        try:
+            # force loading the chosen version of libCom
+            if os.name == 'nt':
+                load_dll(find_libCom())
+            libca = load_dll(find_libca())
+        except Exception as exc:
+            raise ChannelAccessException('loading Epics CA DLL failed: ' + str(exc))
 
     ca_context = {False:0, True:1}[PREEMPTIVE_CALLBACK]
     ret = libca.ca_context_create(ca_context)
     if ret != dbr.ECA_NORMAL:
         raise ChannelAccessException('cannot create Epics CA Context')
+    _forget_context()
 
-    # set argtypes and non-default return types
-    # for several libca functions here
-    libca.ca_pend_event.argtypes  = [ctypes.c_double]
-    libca.ca_pend_io.argtypes     = [ctypes.c_double]
-    libca.ca_client_status.argtypes = [ctypes.c_void_p, ctypes.c_long]
-    libca.ca_sg_block.argtypes    = [ctypes.c_ulong, ctypes.c_double]
-
-    libca.ca_current_context.restype = ctypes.c_void_p
-    libca.ca_version.restype   = ctypes.c_char_p
-    libca.ca_host_name.restype = ctypes.c_char_p
-    libca.ca_name.restype      = ctypes.c_char_p
-    # libca.ca_name.argstypes    = [dbr.chid_t]
-    # libca.ca_state.argstypes   = [dbr.chid_t]
-    libca.ca_message.restype   = ctypes.c_char_p
-    libca.ca_attach_context.argtypes = [ctypes.c_void_p]
-
-    # save value offests used for unpacking
-    # TIME and CTRL data as an array in dbr module
-    dbr.value_offset = (39*ctypes.c_short).in_dll(libca,'dbr_value_offset')
+    if LIBCA_BACKEND is not None:
+        dbr.value_offset = libca.dbr_value_offset
+    else:
+        # set argtypes and non-default return types
+        # for several libca functions here
+        libca.ca_pend_event.argtypes  = [ctypes.c_double]
+        libca.ca_pend_io.argtypes     = [ctypes.c_double]
+        libca.ca_client_status.argtypes = [ctypes.c_void_p, ctypes.c_long]
+        libca.ca_sg_block.argtypes    = [ctypes.c_ulong, ctypes.c_double]
+
+        libca.ca_current_context.restype = ctypes.c_void_p
+        libca.ca_version.restype   = ctypes.c_char_p
+        libca.ca_host_name.restype = ctypes.c_char_p
+        libca.ca_name.restype      = ctypes.c_char_p
+        libca.ca_puser.restype     = ctypes.c_void_p
+        # libca.ca_name.argstypes    = [dbr.chid_t]
+        # libca.ca_state.argstypes   = [dbr.chid_t]
+        libca.ca_message.restype   = ctypes.c_char_p
+        libca.ca_attach_context.argtypes = [ctypes.c_void_p]
+
+        # save value offests used for unpacking
+        # TIME and CTRL data as an array in dbr module
+        dbr.value_offset = (39*ctypes.c_short).in_dll(libca,'dbr_value_offset')
 
     initial_context = current_context()
 
@@ -440,6 +804,7 @@ def finalize_libca(maxtime=10.0):
                 pass
 
         _chid_cache.clear()
+        _handle_cache.clear()
         _cache.clear()
 
         flush_count = 0
@@ -462,16 +827,7 @@ def get_cache(pvname):
 
 def _get_cache_by_chid(chid):
     'return _CacheItem for a given channel id'
-    try:
-        return _chid_cache[chid]
-    except KeyError:
-        # It's possible that the channel id cache is not yet ready; check the
-        # context cache before giving up. This branch should not happen often.
-        context = current_context()
-        if context is not None:
-            pvname = bytes2str(libca.ca_name(dbr.chid_t(chid)))
-            return _cache[context][pvname]
-        raise
+    return _chid_cache[chid]
 
 
 def show_cache(print_out=True):
@@ -497,6 +853,180 @@ def show_cache(print_out=True):
         return out
 
 
+def _channel_stats(chid):
+    "_ChannelStats for a channel, or None if not in the cache"
+    entry = _chid_cache.get(_chid_to_int(chid), None)
+    return None if entry is None else entry.counters()
+
+def channel_stats(chid):
+    """Return the instrumentation counters for a channel as a dictionary,
+    or ``None`` if the channel is not known.
+
+    The keys are `events` and `bytes` (monitor events and data received),
+    `last_event_age` (seconds since the latest monitor event), `gets` and
+    `puts` (completed get requests and puts), `reconnects`, `disconnects`,
+    and summaries of `callback_time` (time spent in monitor callbacks,
+    including all :class:`pv.PV` processing), `get_latency` and
+    `put_latency` (time to complete puts with wait or callback).  The
+    summaries are dictionaries with `count`, `mean`, `max`, `p50` and `p99`
+    (in seconds) and `bins` (see :class:`DurationHistogram`).
+    """
+    entry = _chid_cache.get(_chid_to_int(chid), None)
+    if entry is None:
+        return None
+    return (entry.stats or _NO_STATS).as_dict()
+
+def _cache_entries():
+    "all (context, pvname, _CacheItem) in the cache"
+    for context, context_cache in list(_cache.items()):
+        for pvname, entry in list(context_cache.items()):
+            if isinstance(entry, _CacheItem):
+                yield context, pvname, entry
+
+def stats(per_channel=True):
+    """Return a snapshot of the instrumentation counters for all channels.
+
+    Parameters
+    ----------
+    per_channel : bool
+        whether to include the counters for each channel (default ``True``)
+
+    Returns
+    -------
+    stats : dict
+        with keys `time`, `channels`, `connected`, and the totals for all
+        channels of `events`, `bytes`, `gets`, `puts`, `reconnects`, and
+        `disconnects`, and summaries of `callback_time`, `get_latency`
+        and `put_latency`.  With `per_channel`, `pvs` holds the counters
+        of each channel, as from :func:`channel_stats`, by PV name.
+
+    Notes
+    -----
+    1. Counters are kept while :data:`COLLECT_STATS` is ``True`` (the
+    default).  A channel's counters are created with its first counted
+    event, so that channels cost no memory for them when
+    :data:`COLLECT_STATS` is ``False``.
+
+    2. Counters are updated without locking from the CA callback threads,
+    and so are approximate if several threads update the same channel.
+    """
+    now = time.perf_counter()
+    out = {'time': time.time(), 'channels': 0, 'connected': 0, 'events': 0,
+           'bytes': 0, 'gets': 0, 'puts': 0, 'reconnects': 0,
+           'disconnects': 0}
+    hists = {'callback_time': DurationHistogram(),
+             'get_latency': DurationHistogram(),
+             'put_latency': DurationHistogram()}
+    pvs = {}
+    for context, pvname, entry in _cache_entries():
+        chan = entry.stats or _NO_STATS
+        out['channels'] += 1
+        out['connected'] += int(entry.conn)
+        out['events'] += chan.events
+        out['bytes'] += chan.bytes
+        out['gets'] += chan.gets
+        out['puts'] += chan.puts
+        out['reconnects'] += max(0, chan.connects - 1)
+        out['disconnects'] += chan.disconnects
+        for key, hist in hists.items():
+            hist.merge(getattr(chan, key))
+        if per_channel:
+            if pvname in pvs:
+                pvname = '%s (context %s)' % (pvname, context)
+            pvs[pvname] = chan.as_dict(now=now)
+    for key, hist in hists.items():
+        out[key] = hist.as_dict()
+    if per_channel:
+        out['pvs'] = pvs
+    return out
+
+def reset_stats():
+    "reset the instrumentation counters of all channels"
+    for context, pvname, entry in _cache_entries():
+        if entry.stats is not None:
+            entry.stats.reset()
+
+def show_stats(print_out=True, per_channel=True):
+    """print out a summary of :func:`stats`, with a line for each
+    channel, sorted by number of events.  Use the *print_out=False* option
+    to be returned the listing instead of having it printed out.
+    """
+    def usec(hist, key):
+        val = hist[key]
+        return '%10.1f' % (1.e6*val) if val is not None else ' '*9 + '-'
+
+    snap = stats(per_channel=per_channel)
+    out = ['# %d channels (%d connected): %d events, %.3f MB, %d gets, '
+           '%d puts, %d reconnects' % (snap['channels'], snap['connected'],
+                                       snap['events'], 1.e-6*snap['bytes'],
+                                       snap['gets'], snap['puts'],
+                                       snap['reconnects'])]
+    out.append('#  %-28s %8s %9s %8s %10s %10s %10s %10s %4s' % (
+        'PVName', 'events', 'MB', 'age(s)', 'cb_us', 'cb_p99_us',
+        'get_us', 'put_us', 'rcon'))
+    rows = [('(all)', dict(snap, last_event_age=None))]
+    if per_channel:
+        rows += sorted(snap['pvs'].items(), key=lambda x: -x[1]['events'])
+    for pvname, chan in rows:
+        age = chan['last_event_age']
+        out.append('   %-28s %8d %9.3f %8s %s %s %s %s %4d' % (
+            pvname, chan['events'], 1.e-6*chan['bytes'],
+            '%8.2f' % age if age is not None else '-',
+            usec(chan['callback_time'], 'mean'),
+            usec(chan['callback_time'], 'p99'),
+            usec(chan['get_latency'], 'mean'),
+            usec(chan['put_latency'], 'mean'), chan['reconnects']))
+    out = strjoin('\n', out)
+    if print_out:
+        write(out)
+    else:
+        return out
+
+class _StatsDump(threading.Thread):
+    "thread writing show_stats() output periodically"
+    def __init__(self, interval, writer, per_channel):
+        threading.Thread.__init__(self, name='pyepics-stats-dump')
+        self.daemon = True
+        self.interval = interval
+        self.writer = writer
+        self.per_channel = per_channel
+        self.stopped = threading.Event()
+
+    def run(self):
+        while not self.stopped.wait(self.interval):
+            self.writer(show_stats(print_out=False,
+                                   per_channel=self.per_channel))
+
+_stats_dump = None
+
+def start_stats_dump(interval=60.0, writer=None, per_channel=True):
+    """start writing the output of :func:`show_stats` every `interval`
+    seconds from a background thread, replacing any periodic dump already
+    running.
+
+    Parameters
+    ----------
+    interval : float
+        time (in seconds) between dumps
+    writer : callable or ``None``
+        function called with the text of each dump, such as the `info`
+        method of a logger.  The default writes to standard output.
+    per_channel : bool
+        whether to include a line for each channel
+    """
+    global _stats_dump
+    stop_stats_dump()
+    _stats_dump = _StatsDump(interval, writer or write, per_channel)
+    _stats_dump.start()
+
+def stop_stats_dump():
+    "stop the periodic dump started by :func:`start_stats_dump`"
+    global _stats_dump
+    if _stats_dump is not None:
+        _stats_dump.stopped.set()
+        _stats_dump = None
+
+
 _clear_cache_callbacks: Dict[int, Callable[[], None]] = {}
 
 
@@ -536,6 +1066,7 @@ def clear_cache():
     # Clear global state variables
     _cache.clear()
     _chid_cache.clear()
+    _handle_cache.clear()
 
     # The old context is copied directly from the old process
     # in systems with proper fork() implementations
@@ -613,9 +1144,9 @@ def withCHID(fcn):
 
         if len(args)>0:
             chid = args[0]
-            args = list(args)
             if isinstance(chid, int):
-                args[0] = chid = dbr.chid_t(args[0])
+                args = list(args)
+                args[0] = chid = dbr.chid_t(chid)
             if not isinstance(chid, dbr.chid_t):
                 msg = "%s: not a valid chid %s %s args %s kwargs %s!" % (
                     (fcn.__name__, chid, type(chid), args, kwds))
@@ -641,8 +1172,8 @@ def withConnectedCHID(fcn):
 
         if len(args)>0:
             chid = args[0]
-            args = list(args)
             if isinstance(chid, int):
+                args = list(args)
                 args[0] = chid = dbr.chid_t(chid)
             if not isinstance(chid, dbr.chid_t):
                 raise ChannelAccessException("%s: not a valid chid!" % \
@@ -671,8 +1202,8 @@ def withMaybeConnectedCHID(fcn):
 
         if len(args)>0:
             chid = args[0]
-            args = list(args)
             if isinstance(chid, int):
+                args = list(args)
                 args[0] = chid = dbr.chid_t(chid)
             if not isinstance(chid, dbr.chid_t):
                 raise ChannelAccessException("%s: not a valid chid!" % \
@@ -720,13 +1251,17 @@ def withSEVCHK(fcn):
         return PySEVCHK( fcn.__name__, status)
     return wrapper
 
+## sizes of native types, for counting bytes received
+_ELEMENT_SIZES = dict((ftype, ctypes.sizeof(dbr.Map[ftype]))
+                      for ftype in (dbr.STRING, dbr.INT, dbr.FLOAT, dbr.ENUM,
+                                    dbr.CHAR, dbr.LONG, dbr.DOUBLE))
+
 ##
 ## Event Handler for monitor event callbacks
 def _onMonitorEvent(args):
     """Event Handler for monitor events: not intended for use"""
-    try:
-        entry = _get_cache_by_chid(args.chid)
-    except KeyError:
+    entry = _chid_cache.get(args.chid)
+    if entry is None:
         # In case the chid is no longer in our cache, exit now.
         return
 
@@ -743,30 +1278,69 @@ def _onMonitorEvent(args):
         # Cannot process the input becaue casting failed.
         return
 
+    ntype = dbr.native_type(args.type)
+    stats = entry.counters() if COLLECT_STATS else None
+    if stats is not None:
+        stats.events += 1
+        stats.bytes += (dbr.value_offset[args.type] +
+                        args.count*_ELEMENT_SIZES[ntype])
+        stats.last_event = time.perf_counter()
+
     kwds = {'ftype':args.type, 'count':args.count,
             'chid': args.chid, 'pvname': entry.pvname}
 
     # add kwds arguments for CTRL and TIME variants
     # this is in a try/except clause to avoid problems
     # caused by uninitialized waveform arrays
-    try:
-        kwds.update(**_unpack_metadata(ftype=args.type, dbr_value=value[0]))
-    except IndexError:
-        pass
-    value = _unpack(args.chid, value, count=args.count, ftype=args.type)
-    if callable(args.usr):
-        args.usr(value=value, **kwds)
+    decode = _METADATA_DECODERS.get(args.type)
+    if decode is not None:
+        try:
+            kwds.update(decode(value[0]))
+        except (IndexError, struct.error):
+            pass
+
+    callback, buffer = args.usr, None
+    if isinstance(callback, tuple):
+        callback, buffer = callback
+
+    # single values are unpacked as usual, so that they stay scalars
+    if buffer is not None and args.count > 1 and ntype in dbr.NP_Map:
+        value, kwds['slot_seq'] = buffer.write(value[1], args.count, ntype)
+    else:
+        value = _unpack(args.chid, value, count=args.count, ftype=args.type)
+    if callable(callback):
+        if stats is None:
+            callback(value=value, **kwds)
+            return
+        start = time.perf_counter()
+        try:
+            callback(value=value, **kwds)
+        finally:
+            stats.callback_time.add(time.perf_counter() - start)
 
 ## connection event handler:
 def _onConnectionEvent(args):
     "Connection notification - run user callbacks"
-    try:
-        entry = _get_cache_by_chid(args.chid)
-    except KeyError:
-        return
+    entry = _chid_cache.get(args.chid)
+    if entry is None:
+        # the first connection event may come before ca_create_channel has
+        # returned: use the handle given as the user argument of the channel
+        entry = _handle_cache.get(libca.ca_puser(dbr.chid_t(args.chid)))
+        if entry is None:
+            return
 
-    entry.run_connection_callbacks(conn=(args.op == dbr.OP_CONN_UP),
-                                   timestamp=time.time())
+    # cache the channel properties that are fixed while connected
+    conn = (args.op == dbr.OP_CONN_UP)
+    if conn:
+        chid = dbr.chid_t(args.chid)
+        entry.ftype = libca.ca_field_type(chid)
+        entry.count = libca.ca_element_count(chid)
+    else:
+        entry.ftype = entry.count = entry.access = None
+        if entry.value_cache is not None:
+            entry.value_cache.latest = None
+    entry.host = None
+    entry.run_connection_callbacks(conn=conn, timestamp=time.time())
 
 
 ## get event handler:
@@ -776,9 +1350,8 @@ def _onGetEvent(args, **kws):
     # print("GET EVENT: chid, user ", args.chid, args.usr)
     # print("GET EVENT: type, count ", args.type, args.count)
     # print("GET EVENT: status ",  args.status, dbr.ECA_NORMAL)
-    try:
-        entry = _get_cache_by_chid(args.chid)
-    except KeyError:
+    entry = _chid_cache.get(args.chid)
+    if entry is None:
         return
 
     ftype = args.usr
@@ -798,7 +1371,19 @@ def _onGetEvent(args, **kws):
             )
 
     with entry.lock:
-        entry.get_results[ftype][0] = result
+        request = entry.get_results[ftype]
+        request.result = result
+        callbacks = request.callbacks
+        if COLLECT_STATS and request.start is not None:
+            stats = entry.counters()
+            stats.gets += 1
+            stats.get_latency.add(time.perf_counter() - request.start)
+        request.start = None
+    if request.event is not None:
+        request.event.set()
+    if callbacks:
+        for fcn in callbacks:
+            fcn()
 
 
 ## put event handler:
@@ -809,12 +1394,23 @@ def _onPutEvent(args, **kwds):
         fcn()
 
 
+def _onValueCacheEvent(args):
+    'Monitor event of a value cache - keep the data, without unpacking it'
+    cache = args.usr
+    if args.status != dbr.ECA_NORMAL:
+        cache.latest = None
+        return
+    result = dbr.cast_args(args)
+    if result[1] is not None:
+        cache.latest = (deepcopy(result), time.monotonic())
+
+
 def _onAccessRightsEvent(args):
     'Access rights callback'
-    try:
-        entry = _chid_cache[_chid_to_int(args.chid)]
-    except KeyError:
+    entry = _chid_cache.get(args.chid)
+    if entry is None:
         return
+    entry.access = args.access
     read = bool(args.access & 1)
     write = bool((args.access >> 1) & 1)
     entry.run_access_event_callbacks(read, write)
@@ -825,6 +1421,7 @@ _CB_CONNECT = dbr.make_callback(_onConnectionEvent, dbr.connection_args)
 _CB_PUTWAIT = dbr.make_callback(_onPutEvent,        dbr.event_handler_args)
 _CB_GET     = dbr.make_callback(_onGetEvent,        dbr.event_handler_args)
 _CB_EVENT   = dbr.make_callback(_onMonitorEvent,    dbr.event_handler_args)
+_CB_VALUE   = dbr.make_callback(_onValueCacheEvent, dbr.event_handler_args)
 _CB_ACCESS  = dbr.make_callback(_onAccessRightsEvent,
                                 dbr.access_rights_handler_args)
 
@@ -833,12 +1430,29 @@ _CB_ACCESS  = dbr.make_callback(_onAccessRightsEvent,
 ###
 
 # contexts
+#
+# The context attached to each thread is remembered here as it is set by
+# the functions below or found by current_context(), so that libca need
+# not be asked each time.  Only contexts are remembered, never None: libca
+# creates a context for a thread without one when it is first used (by
+# ca_create_channel, for example), so a thread without a context asks libca
+# again each time.  A thread that is pinned to a context has its context in
+# `pinned` as well.  Contexts attached by calling libca directly are not
+# seen here.
+_thread_context = threading.local()
+
+def _forget_context():
+    "forget the context remembered for the calling thread"
+    _thread_context.__dict__.pop('context', None)
+    _thread_context.__dict__.pop('pinned', None)
+
 @withCA
 @withSEVCHK
 def context_create(ctx=None):
     "create a context. if argument is None, use PREEMPTIVE_CALLBACK"
     if ctx is None:
         ctx = {False:0, True:1}[PREEMPTIVE_CALLBACK]
+    _forget_context()
     return libca.ca_context_create(ctx)
 
 
@@ -866,6 +1480,7 @@ def context_destroy():
     "destroy current context"
     ctx = current_context()
     ret = libca.ca_context_destroy()
+    _forget_context()
     ctx_cache = _cache.pop(ctx, None)
     if ctx_cache is not None:
         ctx_cache.clear()
@@ -879,7 +1494,13 @@ def destroy_context():
 # @withSEVCHK
 def attach_context(context):
     "attach to the supplied context"
-    return libca.ca_attach_context(context)
+    ret = libca.ca_attach_context(context)
+    if ret == dbr.ECA_NORMAL:
+        if isinstance(context, int):
+            _thread_context.context = context
+        else:
+            _thread_context.__dict__.pop('context', None)
+    return ret
 
 @withCA
 @withSEVCHK
@@ -894,14 +1515,63 @@ def use_initial_context():
     global initial_context
     ret = dbr.ECA_NORMAL
     if initial_context != current_context():
-        ret = libca.ca_attach_context(initial_context)
+        ret = attach_context(initial_context)
     return ret
 
 @withCA
 def detach_context():
     "detach context"
+    _forget_context()
     return libca.ca_detach_context()
 
+@withCA
+def pin_context(context=None):
+    """attach the calling thread to a context and keep it there.
+
+    Parameters
+    ----------
+    context : int or None
+        context to use, as returned by :func:`current_context`.  The
+        default, None, uses the context created when libca is initialized.
+
+    Returns
+    -------
+    context : int
+        the context the thread is pinned to
+
+    Notes
+    -----
+    1. PV methods called in a pinned thread do not switch contexts: they
+       raise a RuntimeError for a PV of another context instead of
+       detaching from and re-attaching to contexts around each call.
+    2. The pin is undone by :func:`unpin_context`, :func:`detach_context`
+       and :func:`destroy_context`.
+    """
+    if context is None:
+        context = initial_context
+    if context is None:
+        raise ChannelAccessException('no context to pin the thread to')
+    current = current_context()
+    if current != context:
+        if current is not None:
+            detach_context()
+        ret = attach_context(context)
+        if ret != dbr.ECA_NORMAL:
+            raise ChannelAccessException(
+                'cannot attach to context: %s' % message(ret))
+    _thread_context.pinned = context
+    return context
+
+def unpin_context():
+    """undo :func:`pin_context` for the calling thread, which stays
+    attached to its context."""
+    _thread_context.__dict__.pop('pinned', None)
+
+def pinned_context():
+    """return the context the calling thread is pinned to with
+    :func:`pin_context`, or None"""
+    return _thread_context.__dict__.get('pinned', None)
+
 @withCA
 def replace_printf_handler(writer=None):
     """replace the normal printf() output handler with
@@ -971,9 +1641,15 @@ def enable_ca_messages(writer='stderr'):
 @withCA
 def current_context():
     "return the current context"
+    try:
+        return _thread_context.context
+    except AttributeError:
+        pass
     ctx = libca.ca_current_context()
     if isinstance(ctx, ctypes.c_long):
         ctx = ctx.value
+    if ctx is not None:
+        _thread_context.context = ctx
     return ctx
 
 @withCA
@@ -1080,13 +1756,22 @@ def create_channel(pvname, connect=False, auto_cb=True, callback=None):
     will be called immediately.
 
 
+    """
+    entry = _create_cache_entry(current_context(), pvname, callback=callback)
+    if connect:
+        connect_channel(entry.chid)
+    return entry.chid
+
+
+def _create_cache_entry(context, pvname, callback=None):
+    """create a channel for a pvname in a context, returning its _CacheItem.
+    This does the work for :func:`create_channel` and :func:`create_channels`
     """
     # Note that _CB_CONNECT (defined above) is a global variable, holding
     # a reference to _onConnectionEvent:  This is really the connection
     # callback that is run -- the callack here is stored in the _cache
     # and called by _onConnectionEvent.
-
-    context_cache = _cache[current_context()]
+    context_cache = _cache[context]
 
     # {}.setdefault is an atomic operation, so we are guaranteed to never
     # create the same channel twice here:
@@ -1097,31 +1782,243 @@ def create_channel(pvname, connect=False, auto_cb=True, callback=None):
         is_new_channel = isinstance(entry, _SentinelWithLock)
         if is_new_channel:
             callbacks = [callback] if callable(callback) else None
-            entry = _CacheItem(chid=None, pvname=pvname, callbacks=callbacks)
+            entry = _CacheItem(chid=None, pvname=pvname, callbacks=callbacks,
+                               context=context)
             context_cache[pvname] = entry
 
             chid = dbr.chid_t()
+            entry.handle = next(_handle_ids)
+            _handle_cache[entry.handle] = entry
             with entry.lock:
                 ret = libca.ca_create_channel(
-                    ctypes.c_char_p(str2bytes(pvname)), _CB_CONNECT, 0, 0,
-                    ctypes.byref(chid)
+                    ctypes.c_char_p(str2bytes(pvname)), _CB_CONNECT,
+                    ctypes.c_void_p(entry.handle), 0, ctypes.byref(chid)
                 )
-                PySEVCHK('create_channel', ret)
+                try:
+                    PySEVCHK('create_channel', ret)
+                except CASeverityException:
+                    # forget the failed channel, so that a late connection
+                    # callback cannot find it through its handle
+                    _handle_cache.pop(entry.handle, None)
+                    context_cache.pop(pvname, None)
+                    raise
 
                 entry.chid = chid
                 _chid_cache[chid.value] = entry
 
+    if not is_new_channel:
+        # another user of the channel: the PV cache must not clear it
+        entry.pvcache_owned = False
     if (not is_new_channel and callable(callback) and
             callback not in entry.callbacks):
         entry.callbacks.append(callback)
         if entry.chid is not None and entry.conn:
             # Run the connection callback if already connected:
-            callback(chid=_chid_to_int(entry.chid), pvname=pvname,
-                     conn=entry.conn)
+            callback(chid=entry.chid_int, pvname=pvname, conn=entry.conn)
+    return entry
 
-    if connect:
-        connect_channel(entry.chid)
-    return entry.chid
+
+class _ConnectionCountdown:
+    """connection callback for :func:`create_channels`: counts down
+    the channels still waiting for their first connection, and sets
+    `done` when none are left."""
+    def __init__(self, pvnames):
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.start_time = time.time()
+        self.connect_times = {}
+        self.remaining = len(pvnames)
+        if self.remaining == 0:
+            self.done.set()
+
+    def __call__(self, pvname=None, chid=None, conn=True):
+        if not conn:
+            return
+        with self.lock:
+            if pvname in self.connect_times:
+                return
+            self.connect_times[pvname] = time.time() - self.start_time
+            self.remaining -= 1
+            if self.remaining <= 0:
+                self.done.set()
+
+
+class CreateChannelsResult:
+    """Result of :func:`create_channels`
+
+    Attributes
+    ----------
+    chids : dict
+        channel IDs, keyed by PV name, for all channels created
+    connected : list
+        names of PVs that connected
+    timed_out : list
+        names of PVs whose channels were created but did not connect
+    failed : dict
+        error messages, keyed by PV name, for channels that could
+        not be created
+    connect_times : dict
+        time (in seconds) taken for each connected PV to connect
+    elapsed : float
+        total time (in seconds) spent in :func:`create_channels`
+    """
+    def __init__(self):
+        self.chids = {}
+        self.connected = []
+        self.timed_out = []
+        self.failed = {}
+        self.connect_times = {}
+        self.elapsed = 0.0
+
+    @property
+    def stats(self):
+        "dictionary of connection statistics"
+        times = sorted(self.connect_times.values())
+        out = {'requested': (len(self.connected) + len(self.timed_out) +
+                             len(self.failed)),
+               'connected': len(self.connected),
+               'timed_out': len(self.timed_out),
+               'failed': len(self.failed),
+               'elapsed': self.elapsed,
+               'rate': len(self.connected)/max(self.elapsed, 1.e-9)}
+        if len(times) > 0:
+            out.update({'min_time': times[0],
+                        'median_time': times[len(times)//2],
+                        'max_time': times[-1]})
+        return out
+
+    def __repr__(self):
+        return ('<{} connected={} timed_out={} failed={} elapsed={:.3f}>'
+                ''.format(self.__class__.__name__, len(self.connected),
+                          len(self.timed_out), len(self.failed),
+                          self.elapsed))
+
+
+def _wait_for_event(event, timeout):
+    """wait for a threading.Event that is set from a CA callback, returning
+    whether it was set.  With preemptive callbacks, this blocks without
+    polling.  Otherwise, CA is polled until the event is set or the timeout
+    has passed."""
+    if PREEMPTIVE_CALLBACK:
+        flush_io()
+        return event.wait(timeout)
+    expire_time = time.time() + timeout
+    while not event.is_set() and time.time() < expire_time:
+        poll()
+    return event.is_set()
+
+
+def subarray_name(pvname, start=0, stop=None, step=None):
+    """return the name of a channel for the elements `start:stop:step` of
+    an array PV, using the array channel filter of IOCs from EPICS base
+    3.15 on, so that only these elements are sent by the IOC.
+
+    Parameters
+    ----------
+    pvname : string
+        name of the array PV
+    start : int
+        index of the first element (default 0).  Negative values count
+        from the end of the array, as for Python slices.
+    stop : int or ``None``
+        index after the last element, as for Python slices.  ``None``
+        (the default) selects up to the end of the array.
+    step : int or ``None``
+        step between elements, positive.  ``None`` selects every element.
+
+    Returns
+    -------
+    name : string
+        the channel name, for example ``'XX:image1:ArrayData.[1024:2047]'``
+        for `start=1024, stop=2048`.
+
+    Notes
+    -----
+    The number of elements of the channel is the number selected, which
+    is also sent by the IOC when the array has fewer elements than its
+    maximum.  For a 2-D image stored by rows, the rows `r0` to `r1-1` are
+    selected with `start=r0*width, stop=r1*width`.
+    """
+    start = int(start or 0)
+    if stop is not None:
+        stop = int(stop)
+        if stop == 0 or (start >= 0 and 0 <= stop <= start):
+            raise ValueError('empty element range for %s' % pvname)
+    if step is not None and int(step) < 1:
+        raise ValueError('step must be a positive integer')
+    last = '' if stop is None else str(stop - 1)
+    if step is None or int(step) == 1:
+        elements = '[%d:%s]' % (start, last)
+    else:
+        elements = '[%d:%d:%s]' % (start, int(step), last)
+    if '.' not in pvname:
+        pvname = pvname + '.'
+    return pvname + elements
+
+@withCA
+def create_channels(pvnames, timeout=None, callback=None):
+    """ create Channels for a list of pvnames, and wait for them to connect
+
+    Creating all channels together and waiting on their connection
+    callbacks is much faster than using :func:`create_channel` and
+    :func:`connect_channel` for each name in turn, as is needed when
+    connecting to thousands of PVs.
+
+    Parameters
+    ----------
+    pvnames :  list of strings
+        the names of the PVs for which channels should be created.
+    timeout : float or ``None``
+        maximum time to wait for *all* channels to connect. If ``None``,
+        the value of :data:`DEFAULT_CONNECTION_TIMEOUT` is used, and if 0,
+        this returns without waiting.
+    callback : callable or ``None``
+        user-defined Python function to be called when the connection
+        state of any of these channels changes, as for :func:`create_channel`.
+
+    Returns
+    -------
+    result : CreateChannelsResult
+        holds `chids` (dict of channel IDs), lists of `connected` and
+        `timed_out` PV names, `failed` (dict of error messages), and
+        timing information in `connect_times`, `elapsed`, and `stats`.
+    """
+    if timeout is None:
+        timeout = DEFAULT_CONNECTION_TIMEOUT
+    result = CreateChannelsResult()
+    context = current_context()
+    pvnames = list(dict.fromkeys(pvnames))
+    countdown = _ConnectionCountdown(pvnames)
+
+    entries = {}
+    for pvname in pvnames:
+        try:
+            entry = _create_cache_entry(context, pvname, callback=countdown)
+        except CASeverityException as exc:
+            result.failed[pvname] = str(exc)
+            countdown(pvname=pvname, conn=True)
+            continue
+        entries[pvname] = entry
+        if callable(callback):
+            _create_cache_entry(context, pvname, callback=callback)
+
+    if timeout > 0:
+        _wait_for_event(countdown.done, timeout)
+    else:
+        flush_io()
+
+    for pvname, entry in entries.items():
+        with entry.lock:
+            if countdown in entry.callbacks:
+                entry.callbacks.remove(countdown)
+        result.chids[pvname] = entry.chid
+        if pvname in countdown.connect_times:
+            result.connected.append(pvname)
+            result.connect_times[pvname] = countdown.connect_times[pvname]
+        else:
+            result.timed_out.append(pvname)
+    result.elapsed = time.time() - countdown.start_time
+    return result
 
 @withCHID
 def connect_channel(chid, timeout=None, verbose=False):
@@ -1216,32 +2113,53 @@ def name(chid):
     "return PV name for channel name"
     return bytes2str(libca.ca_name(chid))
 
+# host_name(), element_count(), field_type(), read_access() and
+# write_access() use the values kept in the cache entry of a connected
+# channel by the connection and access rights callbacks, and only call
+# libca when these are not known.
 @withCHID
 def host_name(chid):
     "return host name and port serving Channel"
-    return bytes2str(libca.ca_host_name(chid))
+    entry = _chid_cache.get(chid.value, None)
+    if entry is None or entry.ftype is None:
+        return bytes2str(libca.ca_host_name(chid))
+    host = entry.host
+    if host is None:
+        host = entry.host = bytes2str(libca.ca_host_name(chid))
+    return host
 
 @withCHID
 def element_count(chid):
     """return number of elements in Channel's data.
     1 for most Channels, > 1 for waveform Channels"""
-
-    return libca.ca_element_count(chid)
+    entry = _chid_cache.get(chid.value, None)
+    if entry is None or entry.count is None:
+        return libca.ca_element_count(chid)
+    return entry.count
 
 @withCHID
 def read_access(chid):
     "return *read access* for a Channel: 1 for ``True``, 0 for ``False``."
-    return libca.ca_read_access(chid)
+    entry = _chid_cache.get(chid.value, None)
+    if entry is None or entry.access is None:
+        return libca.ca_read_access(chid)
+    return entry.access & 1
 
 @withCHID
 def write_access(chid):
     "return *write access* for a channel: 1 for ``True``, 0 for ``False``."
-    return libca.ca_write_access(chid)
+    entry = _chid_cache.get(chid.value, None)
+    if entry is None or entry.access is None:
+        return libca.ca_write_access(chid)
+    return (entry.access >> 1) & 1
 
 @withCHID
 def field_type(chid):
     "return the integer DBR field type."
-    return libca.ca_field_type(chid)
+    entry = _chid_cache.get(chid.value, None)
+    if entry is None or entry.ftype is None:
+        return libca.ca_field_type(chid)
+    return entry.ftype
 
 @withCHID
 def clear_channel(chid):
@@ -1249,6 +2167,7 @@ def clear_channel(chid):
     ret = libca.ca_clear_channel(chid)
     entry = _chid_cache.pop(chid.value, None)
     if entry is not None:
+        _handle_cache.pop(entry.handle, None)
         context_cache = _cache[entry.context]
         context_cache.pop(entry.pvname, None)
         with entry.lock:
@@ -1380,6 +2299,66 @@ def _unpack(chid, data, count=None, ftype=None, as_numpy=True):
     return unpack(data, count, ntype, use_numpy, elem_count)
 
 
+# Metadata decoders, built once per DBR type from dbr.Map.  Each decoder
+# unpacks all the metadata of an event with a single struct.Struct, instead
+# of looking up the ctypes fields one attribute at a time.
+_TIME_HEADER = struct.Struct('=hhII')   # status, severity, secs, nsec
+_CTRL_FIELDS = (('status', 'severity', 'precision', 'units', 'no_str', 'strs')
+                + dbr.ctrl_limits)
+
+def _decode_time_metadata(dbr_value):
+    "decode status, severity and timestamp of a DBR_TIME_* structure"
+    status, severity, secs, nsec = _TIME_HEADER.unpack_from(dbr_value)
+    posixseconds = secs + dbr.EPICS2UNIX_EPOCH
+    return {'status': status, 'severity': severity,
+            'timestamp': posixseconds + 1.e-6*int(1.e-3*nsec),
+            'posixseconds': posixseconds, 'nanoseconds': nsec}
+
+def _make_ctrl_decoder(ftype):
+    """return a function decoding the metadata of a DBR_CTRL_* structure:
+    status, severity, units, precision, limits and enum strings, as present
+    in the structure for ftype."""
+    dbr_type = dbr.Map[ftype]
+    fmt, names, pos = ['='], [], 0
+    for name, ctype in dbr_type._fields_:
+        if name not in _CTRL_FIELDS:
+            continue
+        field = getattr(dbr_type, name)
+        if field.offset > pos:
+            fmt.append('%dx' % (field.offset - pos))
+        if issubclass(ctype, ctypes.Array):
+            fmt.append('%ds' % field.size)
+        else:
+            fmt.append(ctype._type_)
+        names.append(name)
+        pos = field.offset + field.size
+    unpacker = struct.Struct(''.join(fmt))
+    if unpacker.size != pos:
+        raise ValueError('cannot decode metadata for DBR type %d' % ftype)
+    names = tuple(names)
+    strsize = dbr.MAX_ENUM_STRING_SIZE
+
+    def decode(dbr_value):
+        md = dict(zip(names, unpacker.unpack_from(dbr_value)))
+        if 'units' in md:
+            md['units'] = bytes2str(md['units'].split(b'\0', 1)[0])
+        strs = md.pop('strs', None)
+        nstrs = min(md.pop('no_str', 0), dbr.MAX_ENUMS)
+        if strs is not None and nstrs > 0:
+            md['enum_strs'] = tuple(
+                bytes2str(strs[i*strsize:(i+1)*strsize].split(b'\0', 1)[0])
+                for i in range(nstrs))
+        return md
+    return decode
+
+_METADATA_DECODERS = {}
+for _ftype in dbr.Map:
+    if _ftype >= dbr.CTRL_STRING:
+        _METADATA_DECODERS[_ftype] = _make_ctrl_decoder(_ftype)
+    elif _ftype >= dbr.TIME_STRING:
+        _METADATA_DECODERS[_ftype] = _decode_time_metadata
+del _ftype
+
 def _unpack_metadata(ftype, dbr_value):
     '''Unpack DBR metadata into a dictionary
 
@@ -1401,27 +2380,16 @@ def _unpack_metadata(ftype, dbr_value):
            'upper_disp_limit', 'lower_disp_limit', 'upper_alarm_limit',
            'upper_warning_limit', 'lower_warning_limit','lower_alarm_limit',
            'upper_ctrl_limit', 'lower_ctrl_limit'}
+
+    Notes
+    -----
+    TIME types only decode status, severity and timestamp: the CTRL fields
+    are decoded only for CTRL types.
     '''
-    md = {}
-    if ftype >= dbr.CTRL_STRING:
-        for attr in dbr.ctrl_limits + ('precision', 'units', 'status',
-                                       'severity'):
-            if hasattr(dbr_value, attr):
-                md[attr] = getattr(dbr_value, attr)
-                if attr == 'units':
-                    md[attr] = bytes2str(getattr(dbr_value, attr, None))
-
-        if hasattr(dbr_value, 'strs') and getattr(dbr_value, 'no_str', 0) > 0:
-            md['enum_strs'] = tuple(bytes2str(dbr_value.strs[i].value)
-                                    for i in range(dbr_value.no_str))
-    elif ftype >= dbr.TIME_STRING:
-        md['status'] = dbr_value.status
-        md['severity'] = dbr_value.severity
-        md['timestamp'] = dbr.make_unixtime(dbr_value.stamp)
-        md['posixseconds'] = dbr_value.stamp.secs + dbr.EPICS2UNIX_EPOCH
-        md['nanoseconds'] = dbr_value.stamp.nsec
-
-    return md
+    decode = _METADATA_DECODERS.get(ftype)
+    if decode is None or dbr_value is None:
+        return {}
+    return decode(dbr_value)
 
 
 @withMaybeConnectedCHID
@@ -1480,16 +2448,13 @@ def get_with_metadata(chid, ftype=None, count=None, wait=True, timeout=None,
     if not entry:
         return
 
-    # implementation note: cached value of
-    #   None        implies no value, no expected callback
-    #   GET_PENDING implies no value yet, callback expected.
-    with entry.lock:
-        last_get, = entry.get_results[ftype]
-        if last_get is not GET_PENDING:
-            entry.get_results[ftype] = [GET_PENDING]
-            ret = libca.ca_array_get_callback(
-                ftype, count, chid, _CB_GET, ctypes.py_object(ftype))
-            PySEVCHK('get', ret)
+    if wait and entry.value_cache is not None:
+        result = entry.value_cache.lookup(ftype)
+        if result is not None:
+            return _unpack_get_result(chid, result, ftype=ftype, count=count,
+                                      as_string=as_string, as_numpy=as_numpy)
+
+    _request_get(entry, chid, ftype, count)
 
     if wait:
         return get_complete_with_metadata(chid, count=count, ftype=ftype,
@@ -1565,6 +2530,31 @@ def get(chid, ftype=None, count=None, wait=True, timeout=None,
     return (info['value'] if info is not None else None)
 
 
+def _request_get(entry, chid, ftype, count, callback=None):
+    """send a get request for a channel and field type, unless one is
+    already pending, and return the pending `_GetRequest`.
+
+    If given, `callback` is called with no arguments from the get
+    callback when the request completes.  It is registered while
+    holding the cache entry lock, so it cannot miss the completion.
+    """
+    # implementation note: cached value of
+    #   None        implies no value, no expected callback
+    #   GET_PENDING implies no value yet, callback expected.
+    with entry.lock:
+        request = entry.get_results[ftype]
+        if request.result is not GET_PENDING:
+            request = _GetRequest(GET_PENDING, count=count)
+            entry.get_results[ftype] = request
+            ret = libca.ca_array_get_callback(
+                ftype, count, chid, _CB_GET, ctypes.py_object(ftype))
+            PySEVCHK('get', ret)
+        if callback is not None:
+            if request.callbacks is None:
+                request.callbacks = []
+            request.callbacks.append(callback)
+    return request
+
 @withMaybeConnectedCHID
 def get_complete_with_metadata(chid, ftype=None, count=None, timeout=None,
                                as_string=False, as_numpy=True):
@@ -1609,28 +2599,29 @@ def get_complete_with_metadata(chid, ftype=None, count=None, timeout=None,
     if not entry:
         return
 
-    get_result = entry.get_results[ftype]
+    request = entry.get_results[ftype]
 
-    if get_result[0] is None:
+    if request.result is None:
         warnings.warn('get_complete without initial get() call')
         return None
 
-    t0 = time.time()
     if timeout is None:
         timeout = 1.0 + log10(max(1, count))
 
-    while get_result[0] is GET_PENDING:
-        poll()
-
-        if time.time()-t0 > timeout:
-            msg = "ca.get('%s') timed out after %.2f seconds."
-            warnings.warn(msg % (name(chid), timeout))
-            return None
-
-    full_value, = get_result
+    # wait for _onGetEvent to set the result and signal the request event
+    if (request.result is GET_PENDING and
+            not _wait_for_event(request.event, timeout)):
+        msg = "ca.get('%s') timed out after %.2f seconds."
+        warnings.warn(msg % (name(chid), timeout))
+        return None
 
-    # print(f"Get Complete> Unpack {count=}, {ftype}", _cache['value'])
+    return _unpack_get_result(chid, request.result, ftype=ftype, count=count,
+                              as_string=as_string, as_numpy=as_numpy)
 
+def _unpack_get_result(chid, full_value, ftype, count, as_string=False,
+                       as_numpy=True):
+    """convert the data stored by _onGetEvent to a metadata dictionary
+    with the value, raising the stored exception for a failed get."""
     if isinstance(full_value, Exception):
         get_failure_reason = full_value
         raise get_failure_reason
@@ -1718,46 +2709,96 @@ def _as_string(val, chid, count, ftype):
         pass
     return val
 
-@withConnectedCHID
-def put(chid, value, wait=False, timeout=30, callback=None,
-        callback_data=None, ftype=None):
-    """sets the Channel to a value, with options to either wait
-    (block) for the processing to complete, or to execute a
-    supplied callback function when the process has completed.
-
+class _PutDescriptor:
+    """what :func:`put` needs to know about a channel, kept in its cache
+    entry: the PV name, field type, element count, and for scalars of
+    numeric types, a buffer reused for each put.
 
-    Parameters
-    ----------
-    chid :  ctypes.c_long
-        Channel ID
-    wait : bool
-        whether to wait for processing to complete (or time-out)
-        before returning.
-    timeout : float
-        maximum time to wait for processing to complete before returning anyway.
-    callback : ``None`` or callable
-        user-supplied function to run when processing has completed.
-    callback_data :  object
-        extra data to pass on to a user-supplied callback function.
-    ftype : ``None`` or int (valid dbr type)
-        force field type to be a non-native form (None will use native form)
-
-    Returns
-    -------
-    status : int
-         1  for success, -1 on time-out
+    `store` puts a value in the buffer and holds `lock` until `release`
+    is called after the buffer has been passed to libca.  A thread that
+    cannot take the lock, or a value that cannot be stored directly, falls
+    back to :func:`_put_data`."""
+    __slots__ = ('pvname', 'ftype', 'count', 'buffer', 'lock')
 
-    Notes
-    -----
-    1. Specifying a callback will override setting `wait=True`.
-
-    2. A put-callback function will be called with keyword arguments
-        pvname=pvname, data=callback_data
+    def __init__(self, chid, pvname=None):
+        if pvname is None:
+            pvname = name(chid)
+        self.pvname = pvname
+        self.ftype = field_type(chid)
+        self.count = element_count(chid)
+        self.buffer = None
+        if self.count == 1 and self.ftype in dbr.NP_Map:
+            self.buffer = (1*dbr.Map[self.ftype])()
+        self.lock = threading.Lock()
 
+    def store(self, value):
+        """store a scalar value in the buffer, returning the buffer, or
+        ``None`` if the value cannot be stored directly"""
+        if (self.buffer is None or isinstance(value, (str, bytes)) or
+                not self.lock.acquire(False)):
+            return None
+        try:
+            self.buffer[0] = value
+        except Exception:
+            self.lock.release()
+            return None
+        return self.buffer
+
+    def release(self, data):
+        "release the buffer, if `data` is the buffer returned by `store`"
+        if data is self.buffer:
+            self.lock.release()
+
+
+def _put_descriptor(chid):
+    "return the _PutDescriptor for a channel, creating it if needed"
+    entry = _chid_cache.get(_chid_to_int(chid), None)
+    if entry is None:
+        return _PutDescriptor(chid)
+    desc = entry.put_desc
+    if desc is None:
+        desc = _PutDescriptor(chid, pvname=entry.pvname)
+        entry.put_desc = desc
+    return desc
+
+def _as_put_array(value, ftype, count):
+    """return a ctypes array of type `ftype` that shares the memory of a
+    numpy array or other buffer-protocol object `value`, holding at most
+    `count` elements, or ``None`` if `value` cannot be used this way.
+
+    The values are only copied if they need to be cast to the numpy dtype
+    of `ftype` or made contiguous.  As with scalar puts, values of another
+    type are converted to it, so that floats put to an integer Channel are
+    truncated.  The returned array keeps a reference to the memory it uses.
     """
-    if ftype is None:
-        ftype = field_type(chid)
-    count = nativecount = element_count(chid)
+    dtype = dbr.NP_Map.get(ftype, None)
+    if dtype is None or isinstance(value, (str, bytes)):
+        return None
+    if not isinstance(value, numpy.ndarray):
+        try:
+            value = numpy.asarray(memoryview(value))
+        except (TypeError, ValueError):
+            return None
+    value = value.reshape(-1)[:count]
+    if len(value) == 0:
+        return None
+    if value.dtype != dtype:
+        value = value.astype(dtype, casting='unsafe')
+    else:
+        value = numpy.ascontiguousarray(value)
+    data = (len(value)*dbr.Map[ftype]).from_address(value.ctypes.data)
+    data._buffer = value
+    return data
+
+def _put_data(value, ftype, nativecount):
+    """convert a value to put to a Channel of type `ftype` with `nativecount`
+    elements to a ctypes array, returning the element count to put and the
+    array"""
+    count = nativecount
+    if (HAS_NUMPY and count > 1 and isinstance(value, (numpy.ndarray, memoryview))
+            and value.ndim > 1):
+        # put the elements of multi-dimensional arrays in C order
+        value = numpy.asarray(value).reshape(-1)
     if count > 1:
         # check that data for array PVS is a list, array, or string
         try:
@@ -1776,6 +2817,12 @@ def put(chid, value, wait=False, timeout=30, callback=None,
         count += 1
         count = min(count, nativecount)
 
+    # numpy arrays (and other buffers) are put without copying
+    if HAS_NUMPY and nativecount > 1:
+        data = _as_put_array(value, ftype, count)
+        if data is not None:
+            return len(data), data
+
     # if needed convert to basic string/bytes git stform
     if isinstance(value, str):
         value = bytes(value, IOENCODING)
@@ -1817,26 +2864,98 @@ def put(chid, value, wait=False, timeout=30, callback=None,
             ndata, nuser = len(data), len(value)
             if nuser > ndata:
                 value = value[:ndata]
-            data[:nuser] = list(value)
+            try:
+                data[:nuser] = list(value)
+            except TypeError:
+                data[:nuser] = [type(data[0])(val) for val in value]
 
-        except (ValueError, IndexError):
+        except (ValueError, IndexError, TypeError):
             errmsg = "cannot put array data to PV of type '%s'"
             raise ChannelAccessException(errmsg % (repr(value)))
+    return count, data
+
+@withConnectedCHID
+def put(chid, value, wait=False, timeout=30, callback=None,
+        callback_data=None, ftype=None):
+    """sets the Channel to a value, with options to either wait
+    (block) for the processing to complete, or to execute a
+    supplied callback function when the process has completed.
+
+
+    Parameters
+    ----------
+    chid :  ctypes.c_long
+        Channel ID
+    wait : bool
+        whether to wait for processing to complete (or time-out)
+        before returning.
+    timeout : float
+        maximum time to wait for processing to complete before returning anyway.
+    callback : ``None`` or callable
+        user-supplied function to run when processing has completed.
+    callback_data :  object
+        extra data to pass on to a user-supplied callback function.
+    ftype : ``None`` or int (valid dbr type)
+        force field type to be a non-native form (None will use native form)
+
+    Returns
+    -------
+    status : int
+         1  for success, -1 on time-out
+
+    Notes
+    -----
+    1. Specifying a callback will override setting `wait=True`.
+
+    2. A put-callback function will be called with keyword arguments
+        pvname=pvname, data=callback_data
+
+    3. For array Channels, numpy arrays and other objects supporting the
+       buffer protocol (such as memoryviews) are put without copying their
+       data when their dtype matches the Channel type, and are cast to it
+       otherwise (truncating floats put to an integer Channel, as for
+       lists and scalars).
+
+    """
+    desc, data = None, None
+    if ftype is None:
+        desc = _put_descriptor(chid)
+        ftype = desc.ftype
+        data = desc.store(value)
+    if data is not None:
+        count = 1
+    else:
+        nativecount = element_count(chid) if desc is None else desc.count
+        count, data = _put_data(value, ftype, nativecount)
+
+    stats = None
+    if COLLECT_STATS:
+        stats = _channel_stats(chid)
 
     # simple put, without wait or callback
     if not (wait or callable(callback)):
-        ret = libca.ca_array_put(ftype, count, chid, data)
+        try:
+            ret = libca.ca_array_put(ftype, count, chid, data)
+        finally:
+            if desc is not None:
+                desc.release(data)
         PySEVCHK('put', ret)
+        if stats is not None:
+            stats.puts += 1
         poll()
         return ret
 
     # wait with callback (or put_complete)
-    pvname = name(chid)
+    pvname = name(chid) if desc is None else desc.pvname
     start_time = time.time()
-    completed = {'status': False}
+    start_perf = time.perf_counter()
+    completed = threading.Event()
 
     def put_completed():
-        completed['status'] = True
+        if stats is not None:
+            stats.puts += 1
+            stats.put_latency.add(time.perf_counter() - start_perf)
+        completed.set()
         _put_completes.remove(put_completed)
         if not callable(callback):
             return
@@ -1850,20 +2969,201 @@ def put(chid, value, wait=False, timeout=30, callback=None,
 
     _put_completes.append(put_completed)
 
-    ret = libca.ca_array_put_callback(ftype, count, chid, data, _CB_PUTWAIT,
-                                      ctypes.py_object(put_completed))
+    try:
+        ret = libca.ca_array_put_callback(ftype, count, chid, data,
+                                          _CB_PUTWAIT,
+                                          ctypes.py_object(put_completed))
+    finally:
+        if desc is not None:
+            desc.release(data)
 
     PySEVCHK('put', ret)
-    poll(evt=1.e-4, iot=0.05)
     if wait:
-        while not (completed['status'] or
-                   (time.time()-start_time) > timeout):
-            poll()
-        if not completed['status']:
+        # wait for _onPutEvent to run put_completed()
+        timeout = max(0, timeout - (time.time()-start_time))
+        if not _wait_for_event(completed, timeout):
             ret = -ret
+    else:
+        poll(evt=1.e-4, iot=0.05)
     return ret
 
 
+class _PutCountdown:
+    """put-callback completions for :func:`put_many`: records the time
+    taken for each put to complete, and sets `done` when none are left.
+
+    The count starts at 1, for the caller still issuing puts, so that
+    `done` cannot be set before all puts are issued.  The countdown is
+    kept in `_put_completes` until it is done, so that the completions
+    passed to libca stay alive."""
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.done = threading.Event()
+        self.start_perf = time.perf_counter()
+        self.latency = {}
+        self.completions = []
+        self.remaining = 1
+        _put_completes.append(self)
+
+    def add(self, index):
+        "return the completion for put number `index`"
+        with self.lock:
+            self.remaining += 1
+        completion = _PutCompletion(self, index)
+        self.completions.append(completion)
+        return completion
+
+    def complete(self, index=None):
+        "count down a completed put, or one that was not sent if index=None"
+        with self.lock:
+            if index is not None:
+                self.latency[index] = time.perf_counter() - self.start_perf
+            self.remaining -= 1
+            if self.remaining > 0:
+                return
+            self.done.set()
+        _put_completes.remove(self)
+
+
+class _PutCompletion:
+    "put callback for one of the puts of a :func:`put_many`"
+    __slots__ = ('countdown', 'index')
+
+    def __init__(self, countdown, index):
+        self.countdown = countdown
+        self.index = index
+
+    def __call__(self):
+        self.countdown.complete(self.index)
+
+
+class PutManyResult:
+    """Result of :func:`put_many`
+
+    Attributes
+    ----------
+    status : list
+        for each channel, 1 if the put was sent (and, when waiting,
+        completed), or -1 if the channel was not connected, the put
+        failed, or it did not complete in time.
+    latency : list
+        for each channel, the time (in seconds) for the put to complete,
+        or ``None`` when not waiting or if the put did not complete.
+    elapsed : float
+        total time (in seconds) spent in :func:`put_many`
+    """
+    def __init__(self, nchannels):
+        self.status = [-1]*nchannels
+        self.latency = [None]*nchannels
+        self.elapsed = 0.0
+
+    @property
+    def completed(self):
+        "number of puts that succeeded"
+        return self.status.count(1)
+
+    def __repr__(self):
+        return ('<{} completed={} failed={} elapsed={:.3f}>'
+                ''.format(self.__class__.__name__, self.completed,
+                          len(self.status) - self.completed, self.elapsed))
+
+
+@withCA
+def put_many(chids, values, wait=True, timeout=30.0):
+    """put values to many Channels at once, optionally waiting for all
+    of the puts to complete.
+
+    All values are converted before any put is sent, then a put (with a
+    put-callback when waiting) is issued for every connected channel, and
+    the requests are flushed together.  This is much faster than calling
+    :func:`put` with `wait=True` for each channel in turn, as when
+    restoring thousands of setpoints.
+
+    Parameters
+    ----------
+    chids : list of ctypes.c_long or ``None``
+        Channel IDs.  Channels that are ``None`` or not connected are
+        skipped.
+    values : list
+        values to put, in the same order as `chids`
+    wait : bool
+        whether to wait for all puts to complete (or time out).
+    timeout : float
+        maximum time to wait for all puts to complete.
+
+    Returns
+    -------
+    result : PutManyResult
+        holds the `status` and `latency` of each put, and `elapsed`.
+
+    Notes
+    -----
+    1. Strings put to ENUM channels are sent as DBR_STRING, to be converted
+       to enum values by the server.
+
+    2. A value that cannot be converted to the type of its channel raises a
+       ChannelAccessException, and then no put is sent at all.
+    """
+    start_time = time.time()
+    chids, values = list(chids), list(values)
+    if len(chids) != len(values):
+        raise ValueError("List of channels must be equal to list of values.")
+    result = PutManyResult(len(chids))
+
+    requests = []
+    for index, (chid, value) in enumerate(zip(chids, values)):
+        entry = None
+        if chid is not None:
+            entry = _chid_cache.get(_chid_to_int(chid), None)
+        if entry is None or not entry.conn:
+            continue
+        desc = _put_descriptor(chid)
+        ftype = desc.ftype
+        if ftype == dbr.ENUM and isinstance(value, (str, bytes)):
+            # the server converts enum strings to enum values
+            ftype = dbr.STRING
+        count, data = _put_data(value, ftype, desc.count)
+        requests.append((index, entry, ftype, count, data))
+
+    countdown = _PutCountdown()
+    for index, entry, ftype, count, data in requests:
+        if wait:
+            completion = ctypes.py_object(countdown.add(index))
+            ret = libca.ca_array_put_callback(ftype, count, entry.chid, data,
+                                              _CB_PUTWAIT, completion)
+            if ret != dbr.ECA_NORMAL:
+                countdown.complete()
+                continue
+        else:
+            ret = libca.ca_array_put(ftype, count, entry.chid, data)
+            if ret != dbr.ECA_NORMAL:
+                continue
+            if COLLECT_STATS:
+                entry.counters().puts += 1
+        result.status[index] = 1
+    # all puts are issued
+    countdown.complete()
+
+    if not wait:
+        flush_io()
+    else:
+        timeout = max(0, timeout - (time.time() - start_time))
+        _wait_for_event(countdown.done, timeout)
+        with countdown.lock:
+            latency = dict(countdown.latency)
+        for index, entry, _, _, _ in requests:
+            if index in latency:
+                result.latency[index] = latency[index]
+                if COLLECT_STATS:
+                    stats = entry.counters()
+                    stats.puts += 1
+                    stats.put_latency.add(latency[index])
+            else:
+                result.status[index] = -1
+    result.elapsed = time.time() - start_time
+    return result
+
+
 @withMaybeConnectedCHID
 def get_ctrlvars(chid, timeout=5.0, warn=True):
     """return the CTRL fields for a Channel.
@@ -1932,7 +3232,8 @@ DEFAULT_SUBSCRIPTION_MASK = dbr.DBE_VALUE|dbr.DBE_ALARM
 
 @withCHID
 def create_subscription(chid, use_time=False, use_ctrl=False, ftype=None,
-                        mask=None, callback=None, count=0, timeout=None):
+                        mask=None, callback=None, count=0, timeout=None,
+                        buffer=None, flush=True):
     """create a *subscription to changes*. Sets up a user-supplied
     callback function to be called on any changes to the channel.
 
@@ -1959,6 +3260,19 @@ def create_subscription(chid, use_time=False, use_ctrl=False, ftype=None,
     timeout : ``None`` or int
         connection timeout used for unconnected channels.
 
+    buffer : ``None``, int, numpy.ndarray, or :class:`MonitorRingBuffer`
+        if not ``None``, numerical data for each event is copied into a
+        slot of this ring buffer (an int gives the number of slots for a
+        new ring, and an array is used for the slots, as the `out` of a
+        new ring), and the callback is sent a read-only view of that slot
+        as `value` and the slot sequence number as `slot_seq`.
+
+    flush : bool
+        whether to poll CA before and after creating the subscription
+        (default ``True``).  With ``False``, the request is only sent
+        with the next :func:`poll` or :func:`flush_io`, so that many
+        subscriptions can be sent together.
+
     Returns
     -------
     (callback_ref, user_arg_ref, event_id)
@@ -1976,6 +3290,11 @@ def create_subscription(chid, use_time=False, use_ctrl=False, ftype=None,
 
     If the channel is not connected, the ftype must be specified for a
     successful subscription.
+
+    With a `buffer`, views sent to the callback are only valid until the
+    slot is reused, `nslots` events later.  Copy the data if it needs to
+    be kept longer, or check :meth:`MonitorRingBuffer.is_valid`.  Events
+    with a single element are sent as scalars, without `slot_seq`.
     """
 
     mask = mask or DEFAULT_SUBSCRIPTION_MASK
@@ -1990,14 +3309,22 @@ def create_subscription(chid, use_time=False, use_ctrl=False, ftype=None,
         ftype = field_type(chid)
 
     ftype = promote_fieldtype(ftype, use_time=use_time, use_ctrl=use_ctrl)
+    if buffer is not None:
+        if isinstance(buffer, int):
+            buffer = MonitorRingBuffer(nslots=buffer)
+        elif HAS_NUMPY and isinstance(buffer, numpy.ndarray):
+            buffer = MonitorRingBuffer(out=buffer)
+        callback = (callback, buffer)
     uarg  = ctypes.py_object(callback)
     evid  = ctypes.c_void_p()
-    poll()
+    if flush:
+        poll()
     ret = libca.ca_create_subscription(ftype, count, chid, mask,
                                        _CB_EVENT, uarg, ctypes.byref(evid))
     PySEVCHK('create_subscription', ret)
 
-    poll()
+    if flush:
+        poll()
     return (_CB_EVENT, uarg, evid)
 
 @withCA
@@ -2006,6 +3333,91 @@ def clear_subscription(event_id):
     "cancel subscription given its *event_id*"
     return libca.ca_clear_subscription(event_id)
 
+
+class _ValueCache:
+    """latest value of a channel for :func:`get`, kept by a subscription
+    (see :func:`enable_value_cache`).
+
+    `latest` holds the raw data of the last monitor event, as stored by a
+    get callback, and the (monotonic) time it was received, or ``None``
+    when not known, as while the channel is disconnected."""
+    __slots__ = ('ftype', 'ntype', 'max_age', 'latest', 'uarg', 'event_id')
+
+    def __init__(self, ftype, max_age=None):
+        self.ftype = ftype
+        self.ntype = dbr.native_type(ftype)
+        self.max_age = max_age
+        self.latest = None
+        self.uarg = ctypes.py_object(self)
+        self.event_id = ctypes.c_void_p()
+
+    def lookup(self, ftype):
+        """return the cached data for a get of type `ftype`, or ``None``
+        if there is none, or if it is older than `max_age`"""
+        latest = self.latest
+        if latest is None or (ftype != self.ftype and ftype != self.ntype):
+            return None
+        result, received = latest
+        if (self.max_age is not None and
+                time.monotonic() - received > self.max_age):
+            return None
+        return result
+
+
+@withConnectedCHID
+def enable_value_cache(chid, max_age=None, timeout=None):
+    """keep the latest value of a channel, so that :func:`get` can return it
+    without asking the server for it.
+
+    This adds a subscription (for DBR_TIME data) to the channel, whose
+    events only store the data received.  While the cached value is known,
+    :func:`get` and :func:`get_with_metadata` for the native or DBR_TIME
+    type of the channel, with `wait=True`, return it without a network round
+    trip.  Otherwise, as when the channel has disconnected or the value is
+    older than `max_age`, they ask the server for the value as usual.
+
+    Parameters
+    ----------
+    chid :  ctypes.c_long
+        Channel ID
+    max_age : float or ``None``
+        maximum time (in seconds) since the last monitor event for the
+        cached value to be used.  If ``None``, the cached value is always
+        used, as the subscription keeps it up to date.
+    timeout : float or ``None``
+        maximum time to wait for the channel to connect.
+
+    Notes
+    -----
+    1. The cached value is the value sent with the monitor events, which
+       depends on the subscription mask (:data:`DEFAULT_SUBSCRIPTION_MASK`)
+       and the deadband of the record: as for :class:`PV` objects with
+       `auto_monitor`, it may differ slightly from the value a get would
+       return.
+
+    2. Calling this again for the same channel changes `max_age`.
+    """
+    entry = _chid_cache[chid.value]
+    cache = entry.value_cache
+    if cache is not None:
+        cache.max_age = max_age
+        return
+    cache = _ValueCache(promote_type(chid, use_time=True), max_age=max_age)
+    ret = libca.ca_create_subscription(cache.ftype, 0, chid,
+                                       DEFAULT_SUBSCRIPTION_MASK, _CB_VALUE,
+                                       cache.uarg, ctypes.byref(cache.event_id))
+    PySEVCHK('create_subscription', ret)
+    entry.value_cache = cache
+    flush_io()
+
+@withCHID
+def disable_value_cache(chid):
+    "stop keeping the latest value of a channel (see :func:`enable_value_cache`)"
+    entry = _chid_cache[chid.value]
+    cache, entry.value_cache = entry.value_cache, None
+    if cache is not None:
+        clear_subscription(cache.event_id)
+
 @withCA
 @withSEVCHK
 def sg_block(gid, timeout=10.0):
@@ -2090,6 +3502,14 @@ def sg_put(gid, chid, value):
 
     ftype = field_type(chid)
     count = element_count(chid)
+    if HAS_NUMPY and count > 1:
+        # numpy arrays (and other buffers) are put without copying
+        data = _as_put_array(value, ftype, count)
+        if data is not None:
+            ret = libca.ca_sg_array_put(gid, ftype, len(data), chid, data)
+            PySEVCHK('sg_put', ret)
+            return ret
+
     data  = (count*dbr.Map[ftype])()
 
     if ftype == dbr.STRING:
@@ -2124,7 +3544,10 @@ def sg_put(gid, chid, value):
             nuser = len(value)
             if nuser > ndata:
                 value = value[:ndata]
-            data[:len(value)] = list(value)
+            try:
+                data[:len(value)] = list(value)
+            except TypeError:
+                data[:len(value)] = [type(data[0])(val) for val in value]
         except:
             errmsg = "Cannot put array data to PV of type '%s'"
             raise ChannelAccessException(errmsg % (repr(value)))
@@ -2134,6 +3557,284 @@ def sg_put(gid, chid, value):
     # poll()
     return ret
 
+
+class SyncGroupReader:
+    """Read the values of a list of PVs together, in one synchronous group.
+
+    The channels are connected once, with :func:`create_channels`, and a
+    buffer is allocated once for each channel.  Each call to :meth:`read`
+    then issues a get for every connected channel in a single synchronous
+    group, blocks until all of them have completed, and decodes the values
+    from the buffers.  This is a cheap way to take repeated snapshots of a
+    fixed list of PVs, such as hundreds of scalars read at a fixed rate.
+
+    Parameters
+    ----------
+    pvnames : list of strings
+        names of the PVs to read
+    use_time : bool
+        whether to also read the alarm status, severity and timestamp
+        of each PV, into :attr:`metadata`.
+    timeout : float
+        maximum time to wait for the channels to connect.
+    as_numpy : bool
+        whether to return array values as numpy arrays.
+
+    Attributes
+    ----------
+    pvnames : list
+        names of the PVs read
+    chids : dict
+        channel IDs, keyed by PV name
+    metadata : dict
+        with `use_time`, dictionaries of status, severity and timestamp
+        from the last read, keyed by PV name
+
+    Examples
+    --------
+
+    >>> reader = epics.ca.SyncGroupReader(['XX:m1.VAL', 'XX:m2.VAL'])
+    >>> values = reader.read()
+    >>> values['XX:m1.VAL']
+    1.0
+    >>> reader.close()
+
+    Notes
+    -----
+    The buffer of a channel is allocated again only when the channel
+    reconnects.  Channels that are not connected are skipped and read
+    as ``None``.
+    """
+    def __init__(self, pvnames, use_time=False, timeout=5.0, as_numpy=True):
+        self.pvnames = list(dict.fromkeys(pvnames))
+        self.use_time = use_time
+        self.as_numpy = as_numpy
+        self.metadata = {}
+        self.chids = create_channels(self.pvnames, timeout=timeout).chids
+        self.gid = sg_create()
+        self._entries = {pvname: get_cache(pvname)
+                         for pvname in self.chids}
+        self._buffers = {}
+
+    def _buffer(self, pvname):
+        """return (connection time, chid, ftype, count, data, values) for the
+        buffer of a connected channel, allocating it if needed"""
+        entry = self._entries[pvname]
+        buff = self._buffers.get(pvname, None)
+        if buff is not None and buff[0] == entry.ts:
+            return buff
+        chid = self.chids[pvname]
+        ftype = promote_type(chid, use_time=self.use_time)
+        ntype = dbr.native_type(ftype)
+        count = element_count(chid)
+        offset = dbr.value_offset[ftype] if ftype != ntype else 0
+        size = max(ctypes.sizeof(dbr.Map[ftype]),
+                   offset + count*ctypes.sizeof(dbr.Map[ntype]))
+        data = ctypes.create_string_buffer(size)
+        values = (count*dbr.Map[ntype]).from_buffer(data, offset)
+        buff = (entry.ts, chid, ftype, count, data, values)
+        self._buffers[pvname] = buff
+        return buff
+
+    def _issue(self, timeout):
+        "issue the gets for all connected channels and block on the group"
+        pending = []
+        for pvname in self.pvnames:
+            entry = self._entries.get(pvname, None)
+            if entry is None or not entry.conn:
+                continue
+            _, chid, ftype, count, data, values = buff = self._buffer(pvname)
+            ret = libca.ca_sg_array_get(self.gid, ftype, count, chid, data)
+            if ret != dbr.ECA_NORMAL:
+                libca.ca_sg_reset(self.gid)
+                PySEVCHK('sg_get', ret)
+            pending.append((pvname, buff))
+        ret = libca.ca_sg_block(self.gid, timeout)
+        if ret != dbr.ECA_NORMAL:
+            libca.ca_sg_reset(self.gid)
+            PySEVCHK('sg_block', ret)
+        return pending
+
+    @withCA
+    def read(self, timeout=10.0):
+        """read all PVs in one synchronous group.
+
+        Parameters
+        ----------
+        timeout : float
+            maximum time to wait for all gets to complete.
+
+        Returns
+        -------
+        values : dict
+            values keyed by PV name, with ``None`` for PVs that are not
+            connected.
+        """
+        out = dict.fromkeys(self.pvnames)
+        for pvname, buff in self._issue(timeout):
+            _, chid, ftype, count, data, values = buff
+            ntype = dbr.native_type(ftype)
+            if count == 1 and ntype != dbr.STRING:
+                out[pvname] = values[0]
+            else:
+                out[pvname] = _unpack(chid, (None, values), count=count,
+                                      ftype=ntype, as_numpy=self.as_numpy)
+                if isinstance(out[pvname], ctypes.Array):
+                    out[pvname] = list(out[pvname])
+            if self.use_time:
+                self.metadata[pvname] = _METADATA_DECODERS[ftype](data)
+        return out
+
+    @withCA
+    def read_record(self, timeout=10.0):
+        """read all PVs in one synchronous group, as a numpy record.
+
+        The record has one field per PV, named by the PV name, with the
+        native numpy type of the channel (and its shape for arrays).
+        Values of PVs that are not connected are NaN for floating point
+        fields and 0 for other types.  Requires numpy.
+
+        Parameters
+        ----------
+        timeout : float
+            maximum time to wait for all gets to complete.
+
+        Returns
+        -------
+        record : numpy.record
+        """
+        if not HAS_NUMPY:
+            raise ChannelAccessException('read_record() requires numpy')
+        values = self.read(timeout=timeout)
+        fields = []
+        for pvname in self.pvnames:
+            buff = self._buffers.get(pvname, None)
+            if buff is None:
+                dtype, count = numpy.float64, 1
+            else:
+                ntype, count = dbr.native_type(buff[2]), buff[3]
+                dtype = dbr.NP_Map.get(ntype, 'U40')
+            fields.append((pvname, dtype, (count,)) if count > 1
+                          else (pvname, dtype))
+        out = numpy.zeros(1, dtype=fields)
+        for pvname, val in values.items():
+            if val is None:
+                if out.dtype[pvname].kind == 'f':
+                    out[pvname] = numpy.nan
+            else:
+                out[pvname] = val
+        return out[0]
+
+    @withCA
+    def close(self):
+        "delete the synchronous group"
+        if self.gid is not None:
+            sg_delete(self.gid)
+            self.gid = None
+        self._buffers = {}
+
+
+class SyncGroupWriter:
+    """Write values to a list of PVs together, in one synchronous group.
+
+    The channels are connected once, with :func:`create_channels`, and a
+    buffer of the native type is allocated once for each channel.  Each
+    call to :meth:`write` fills the buffers, issues a put for each of them
+    in a single synchronous group, and blocks until all have completed.
+
+    Parameters
+    ----------
+    pvnames : list of strings
+        names of the PVs to write
+    timeout : float
+        maximum time to wait for the channels to connect.
+
+    Examples
+    --------
+
+    >>> writer = epics.ca.SyncGroupWriter(['XX:m1.VAL', 'XX:m2.VAL'])
+    >>> writer.write([1.0, 2.0])
+    {'XX:m1.VAL': 1, 'XX:m2.VAL': 1}
+    >>> writer.close()
+    """
+    def __init__(self, pvnames, timeout=5.0):
+        self.pvnames = list(dict.fromkeys(pvnames))
+        self.chids = create_channels(self.pvnames, timeout=timeout).chids
+        self.gid = sg_create()
+        self._entries = {pvname: get_cache(pvname)
+                         for pvname in self.chids}
+        self._buffers = {}
+
+    def _buffer(self, pvname):
+        """return (connection time, chid, ftype, count, data) for the buffer
+        of a connected channel, allocating it if needed"""
+        entry = self._entries[pvname]
+        buff = self._buffers.get(pvname, None)
+        if buff is not None and buff[0] == entry.ts:
+            return buff
+        chid = self.chids[pvname]
+        ftype = field_type(chid)
+        count = element_count(chid)
+        buff = (entry.ts, chid, ftype, count, (count*dbr.Map[ftype])())
+        self._buffers[pvname] = buff
+        return buff
+
+    @withCA
+    def write(self, values, timeout=10.0):
+        """write values to the PVs in one synchronous group.
+
+        Parameters
+        ----------
+        values : dict or sequence
+            values keyed by PV name, or a sequence of values in the order
+            of `pvnames`.  PVs not given in a dict are not written.
+        timeout : float
+            maximum time to wait for all puts to complete.
+
+        Returns
+        -------
+        status : dict
+            1 for PVs written, -1 for PVs that are not connected or for
+            which the put failed, keyed by PV name.
+        """
+        if not isinstance(values, dict):
+            values = dict(zip(self.pvnames, values))
+        out = {}
+        # convert all values before issuing any put, so that a value that
+        # cannot be converted leaves nothing pending in the group
+        puts = []
+        for pvname, value in values.items():
+            entry = self._entries.get(pvname, None)
+            if entry is None or not entry.conn:
+                out[pvname] = -1
+                continue
+            _, chid, ftype, count, data = self._buffer(pvname)
+            if count == 1 and ftype not in (dbr.STRING, dbr.CHAR):
+                try:
+                    data[0] = value
+                except TypeError:
+                    count, data = _put_data(value, ftype, count)
+            else:
+                count, data = _put_data(value, ftype, count)
+            puts.append((pvname, chid, ftype, count, data))
+        for pvname, chid, ftype, count, data in puts:
+            ret = libca.ca_sg_array_put(self.gid, ftype, count, chid, data)
+            out[pvname] = 1 if ret == dbr.ECA_NORMAL else -1
+        ret = libca.ca_sg_block(self.gid, timeout)
+        if ret != dbr.ECA_NORMAL:
+            libca.ca_sg_reset(self.gid)
+            PySEVCHK('sg_block', ret)
+        return out
+
+    @withCA
+    def close(self):
+        "delete the synchronous group"
+        if self.gid is not None:
+            sg_delete(self.gid)
+            self.gid = None
+        self._buffers = {}
+
+
 class CAThread(threading.Thread):
     """
     Sub-class of threading.Thread to ensure that the
@@ -15,7 +15,7 @@ from .transform import Transform
 
 from .ad_base import AD_Camera
 from .ad_fileplugin import AD_FilePlugin
-from .ad_image import AD_ImagePlugin
+from .ad_image import AD_ImagePlugin, AD_ImageReader
 from .ad_overlay import AD_OverlayPlugin
 from .ad_perkinelmer import AD_PerkinElmer
 
@@ -1,4 +1,11 @@
-from .. import Device
+import asyncio
+import threading
+import time
+from collections import deque
+from functools import reduce
+from operator import mul
+
+from .. import Device, PV, ca
 
 class AD_ImagePlugin(Device):
     """
@@ -29,3 +36,294 @@ class AD_ImagePlugin(Device):
         if  self._pvs[rbv_attr].get(as_string=True) != value:
             self._pvs[attr].put(value, wait=wait)
 
+    def reader(self, nframes=4, match_timestamps=True):
+        """return an AD_ImageReader streaming the frames of this plugin"""
+        return AD_ImageReader(self._prefix, nframes=nframes,
+                              match_timestamps=match_timestamps)
+
+
+class ImageFrame:
+    """
+    A frame read by AD_ImageReader
+
+    Attributes
+    ----------
+    unique_id : int
+        UniqueId of the frame
+    timestamp : float
+        timestamp of the ArrayData event
+    data : numpy.ndarray
+        read-only view of the image, shaped (ArraySize2, ArraySize1,
+        ArraySize0) for the NDimensions used, in the frame pool of the
+        reader.  It is overwritten `nframes` frames later.
+    color_mode : int
+        ColorMode of the plugin
+    dropped : int
+        number of frames missing before this one, from the UniqueIds
+    """
+    __slots__ = ('unique_id', 'timestamp', 'data', 'color_mode', 'dropped',
+                 '_ring', '_seq')
+
+    def __init__(self, unique_id, timestamp, data, color_mode, dropped,
+                 ring, seq):
+        self.unique_id = unique_id
+        self.timestamp = timestamp
+        self.data = data
+        self.color_mode = color_mode
+        self.dropped = dropped
+        self._ring = ring
+        self._seq = seq
+
+    def is_valid(self):
+        "return whether the data of the frame is still intact in the pool"
+        return self._ring.is_valid(self._seq)
+
+    def __repr__(self):
+        return '<ImageFrame unique_id=%s shape=%s dropped=%d>' % (
+            self.unique_id, self.data.shape, self.dropped)
+
+
+class AD_ImageReader:
+    """
+    Streaming reader of the frames of an areaDetector image plugin
+
+    ArrayData is monitored into a pool of `nframes` preallocated frames
+    (a ca.MonitorRingBuffer), and each frame is given as a read-only view
+    of its slot in the pool, reshaped with the image dimensions.  The
+    dimensions are monitored, and only recomputed when they change.
+    Frames are matched with their UniqueId_RBV by the timestamps of the
+    two events, which the plugin posts with the timestamp of the NDArray,
+    so that frames dropped by the IOC (or by CA) are counted.
+
+    >>> reader = AD_ImageReader('13SIM1:image1:', nframes=8)
+    >>> for frame in reader.frames(timeout=5.0):
+    ...     process(frame.unique_id, frame.data)
+
+    or, with asyncio:
+
+    >>> async for frame in reader.aframes():
+    ...     process(frame.unique_id, frame.data)
+
+    Parameters
+    ----------
+    prefix : str
+        PV prefix of the image plugin, as for AD_ImagePlugin
+    nframes : int
+        number of frames in the pool.  At most `nframes`-1 frames wait to
+        be read: older frames are overwritten, and counted in `stats` as
+        `overwritten`.
+    match_timestamps : bool
+        whether to pair ArrayData and UniqueId_RBV events by their
+        timestamps [True], or only by the order in which they arrive.
+
+    Notes
+    -----
+    1. The data of a frame is overwritten `nframes` frames later.  Copy it
+    to keep it longer, or check ImageFrame.is_valid().
+
+    2. ArrayData and UniqueId_RBV are separate monitors, and either may
+    lose events under load.  An ArrayData or UniqueId_RBV event without an
+    event of the same timestamp from the other PV is dropped, and counted
+    in `stats` as `unmatched`.  This needs both records to take their
+    timestamps from the NDArrays (TSE=-2).  Otherwise, use
+    `match_timestamps=False` to pair the events by the order in which they
+    arrive, which cannot detect lost events.
+    """
+    _dims = ('NDimensions_RBV', 'ArraySize0_RBV', 'ArraySize1_RBV',
+             'ArraySize2_RBV', 'ColorMode_RBV')
+
+    def __init__(self, prefix, nframes=4, match_timestamps=True):
+        self.prefix = prefix
+        self.nframes = max(2, int(nframes))
+        self.match_timestamps = match_timestamps
+        self.ring = ca.MonitorRingBuffer(nslots=self.nframes)
+        self.stats = {'frames': 0, 'dropped': 0, 'overwritten': 0,
+                      'unmatched': 0}
+        self._lock = threading.Lock()
+        self._cond = threading.Condition(self._lock)
+        self._queue = deque()
+        self._listeners = []
+        self._pending_data = None
+        self._pending_id = None
+        self._last_id = None
+        self._last_timestamp = None
+        self._shape = None
+        self._dims_changed = True
+        self._closed = False
+        self._pvs = {}
+        for attr in self._dims:
+            self._pvs[attr] = PV(prefix + attr, auto_monitor=True,
+                                 callback=self._on_dims)
+        self._pvs['UniqueId_RBV'] = PV(prefix + 'UniqueId_RBV',
+                                       auto_monitor=True,
+                                       callback=self._on_unique_id)
+        self._pvs['ArrayData'] = PV(prefix + 'ArrayData', auto_monitor=True,
+                                    buffer=self.ring, callback=self._on_data)
+
+    def wait_for_connection(self, timeout=5.0):
+        "wait for all PVs to connect, returning whether they did"
+        return all(pv.wait_for_connection(timeout=timeout)
+                   for pv in self._pvs.values())
+
+    def _on_dims(self, **kws):
+        self._dims_changed = True
+
+    # ArrayData is sent by the IOC before the UniqueId of the frame, but
+    # either can arrive first: a frame is complete when both have arrived
+    # with the same timestamp.  Events repeating the timestamp of the last
+    # frame are ignored, and events repeating that of a pending event
+    # replace it without being counted as unmatched (both happen when the
+    # PVs first connect).
+    def _on_data(self, value=None, slot_seq=None, timestamp=None, **kws):
+        if slot_seq is None:
+            return
+        with self._lock:
+            if self._repeated(timestamp):
+                return
+            if (self._pending_data is not None
+                    and not self._repeated(timestamp, self._pending_data[2])):
+                self.stats['unmatched'] += 1
+            self._pending_data = (slot_seq, len(value), timestamp)
+            self._add_frame()
+
+    def _on_unique_id(self, value=None, timestamp=None, **kws):
+        with self._lock:
+            if self._repeated(timestamp):
+                return
+            if (self._pending_id is not None
+                    and not self._repeated(timestamp, self._pending_id[1])):
+                self.stats['unmatched'] += 1
+            self._pending_id = (value, timestamp)
+            self._add_frame()
+
+    def _repeated(self, timestamp, other=None):
+        """whether an event repeats one of the timestamp `other`, or of the
+        last frame, with the lock held"""
+        if other is None:
+            other = self._last_timestamp
+        return (self.match_timestamps and timestamp is not None
+                and timestamp == other)
+
+    def _add_frame(self):
+        "queue a complete frame, with the lock held"
+        if self._pending_data is None or self._pending_id is None:
+            return
+        unique_id, id_timestamp = self._pending_id
+        seq, count, timestamp = self._pending_data
+        if (self.match_timestamps and timestamp is not None
+                and id_timestamp is not None and timestamp != id_timestamp):
+            # the older event lost its partner: drop it, and wait for the
+            # partner of the newer one
+            if timestamp < id_timestamp:
+                self._pending_data = None
+            else:
+                self._pending_id = None
+            self.stats['unmatched'] += 1
+            return
+        self._pending_data = self._pending_id = None
+        self._last_timestamp = timestamp
+        dropped = 0
+        if self._last_id is not None and unique_id > self._last_id:
+            dropped = unique_id - self._last_id - 1
+        self._last_id = unique_id
+        self.stats['frames'] += 1
+        self.stats['dropped'] += dropped
+        item = (seq, count, timestamp, unique_id, dropped)
+        self._queue.append(item)
+        while len(self._queue) >= self.nframes:
+            self._queue.popleft()
+            self.stats['overwritten'] += 1
+        self._cond.notify_all()
+        for loop, queue in self._listeners:
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                pass
+
+    def _frame_shape(self, count):
+        "shape of the frame data, updated from the dimension PVs if needed"
+        if self._dims_changed or self._shape is None:
+            self._dims_changed = False
+            ndims, size0, size1, size2, _ = [self._pvs[attr].get()
+                                             for attr in self._dims]
+            sizes = [s for s in (size0, size1, size2) if s is not None]
+            ndims = min(ndims or len(sizes), len(sizes))
+            self._shape = tuple(reversed(sizes[:ndims]))
+        if reduce(mul, self._shape, 1) != count:
+            return (count,)
+        return self._shape
+
+    def _make_frame(self, item):
+        "build an ImageFrame from a queued item, or None if overwritten"
+        seq, count, timestamp, unique_id, dropped = item
+        view = self.ring.get(seq)
+        if view is None:
+            self.stats['overwritten'] += 1
+            return None
+        data = view[:count].reshape(self._frame_shape(count))
+        return ImageFrame(unique_id, timestamp, data,
+                          self._pvs['ColorMode_RBV'].get(), dropped,
+                          self.ring, seq)
+
+    def read(self, timeout=None):
+        """return the next frame, waiting up to `timeout` seconds (forever
+        if None), or None if no frame arrived or the reader is closed"""
+        expire = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._cond:
+                while len(self._queue) == 0 and not self._closed:
+                    remaining = None
+                    if expire is not None:
+                        remaining = expire - time.monotonic()
+                        if remaining <= 0:
+                            return None
+                    self._cond.wait(remaining)
+                if self._closed:
+                    return None
+                item = self._queue.popleft()
+            frame = self._make_frame(item)
+            if frame is not None:
+                return frame
+
+    def frames(self, timeout=None):
+        """generator of frames, stopping when no frame arrives within
+        `timeout` seconds, or when the reader is closed"""
+        while True:
+            frame = self.read(timeout=timeout)
+            if frame is None:
+                return
+            yield frame
+
+    async def aframes(self):
+        """asynchronous iterator of frames, for use with asyncio.  Frames
+        queued before it starts are not included."""
+        loop = asyncio.get_running_loop()
+        queue = asyncio.Queue()
+        listener = (loop, queue)
+        with self._lock:
+            self._listeners.append(listener)
+        try:
+            while not self._closed:
+                item = await queue.get()
+                if item is None:
+                    return
+                frame = self._make_frame(item)
+                if frame is not None:
+                    yield frame
+        finally:
+            with self._lock:
+                if listener in self._listeners:
+                    self._listeners.remove(listener)
+
+    def close(self):
+        "stop reading frames and disconnect the PVs"
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            for loop, queue in self._listeners:
+                try:
+                    loop.call_soon_threadsafe(queue.put_nowait, None)
+                except RuntimeError:
+                    pass
+        for pv in self._pvs.values():
+            pv.disconnect()
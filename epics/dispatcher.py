@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+Provides CallbackDispatcher, a pool of threads to run PV callbacks
+
+By default, user callbacks for a PV run in the CA thread that received the
+monitor event, so that a slow callback delays the events for all other
+channels.  A PV created with a dispatcher hands its events to bounded
+per-PV queues, which are run by the dispatcher's worker threads:
+
+   from epics import PV
+   from epics.dispatcher import CallbackDispatcher
+
+   dispatcher = CallbackDispatcher(workers=4, maxsize=100)
+   pv = PV('XXX:m1.RBV', callback=onChanges, dispatcher=dispatcher)
+
+Events for one PV are always run in order, and never by two workers at
+the same time.
+"""
+import sys
+import threading
+from collections import deque
+
+__all__ = ['CallbackDispatcher']
+
+POLICIES = ('drop-oldest', 'coalesce', 'block')
+
+
+class _KeyQueue:
+    "queued events for one key (for PVs, the PV name)"
+    __slots__ = ('items', 'active')
+
+    def __init__(self):
+        self.items = deque()
+        self.active = False
+
+
+class CallbackDispatcher:
+    """
+    Runs callbacks from a pool of worker threads, with a bounded queue
+    for each key (for PVs, the PV name), preserving the order of
+    callbacks for each key.
+
+    Parameters
+    ----------
+    workers : int
+        number of worker threads [4]
+    maxsize : int
+        maximum number of queued events for each key [100]
+    policy : str
+        what to do when a new event arrives and the queue for its key is
+        full, one of
+
+        'drop-oldest'
+            drop the oldest queued event [default]
+        'coalesce'
+            replace the newest queued event with the new event, so that
+            the latest value is always delivered
+        'block'
+            wait until there is room in the queue.  Note that this blocks
+            the CA thread, and so delays all other channels.
+    name : str
+        name prefix for the worker threads ['pyepics-dispatcher']
+
+    Notes
+    -----
+    Worker threads are daemon threads, started at the first submit().
+    """
+    def __init__(self, workers=4, maxsize=100, policy='drop-oldest',
+                 name='pyepics-dispatcher'):
+        if policy not in POLICIES:
+            raise ValueError("policy must be one of %s" % repr(POLICIES))
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.nworkers = workers
+        self.maxsize = maxsize
+        self.policy = policy
+        self.name = name
+        self.counts = {'submitted': 0, 'delivered': 0, 'dropped': 0,
+                       'coalesced': 0, 'blocked': 0, 'max_depth': 0}
+        self._cond = threading.Condition()
+        self._queues = {}
+        self._ready = deque()
+        self._threads = []
+        self._running = True
+
+    def __repr__(self):
+        return "<CallbackDispatcher workers=%d, maxsize=%d, policy='%s'>" % (
+            self.nworkers, self.maxsize, self.policy)
+
+    def submit(self, key, fcn, *args, **kws):
+        """queue fcn(*args, **kws) to be run by a worker, after all events
+        already queued for `key`.  Returns whether the event was queued:
+        ``False`` if the dispatcher has been stopped.
+        """
+        with self._cond:
+            if not self._running:
+                return False
+            if not self._threads:
+                self._start()
+            queue = self._get_queue(key)
+            if len(queue.items) >= self.maxsize:
+                if self.policy == 'drop-oldest':
+                    queue.items.popleft()
+                    self.counts['dropped'] += 1
+                elif self.policy == 'coalesce':
+                    queue.items.pop()
+                    self.counts['coalesced'] += 1
+                else:
+                    self.counts['blocked'] += 1
+                    while len(queue.items) >= self.maxsize and self._running:
+                        self._cond.wait()
+                        # the queue is removed whenever it empties
+                        queue = self._get_queue(key)
+            queue.items.append((fcn, args, kws))
+            self.counts['submitted'] += 1
+            if len(queue.items) > self.counts['max_depth']:
+                self.counts['max_depth'] = len(queue.items)
+            if not queue.active:
+                queue.active = True
+                self._ready.append(key)
+                self._cond.notify_all()
+        return True
+
+    def _get_queue(self, key):
+        "queue for a key, created if needed: call with the lock held"
+        queue = self._queues.get(key)
+        if queue is None:
+            queue = self._queues[key] = _KeyQueue()
+        return queue
+
+    def _start(self):
+        for i in range(self.nworkers):
+            thread = threading.Thread(target=self._work, daemon=True,
+                                      name='%s-%d' % (self.name, i))
+            thread.start()
+            self._threads.append(thread)
+
+    def _work(self):
+        "worker thread: run one event at a time for ready keys"
+        cond = self._cond
+        while True:
+            with cond:
+                while self._running and not self._ready:
+                    cond.wait()
+                if not self._ready:
+                    return
+                key = self._ready.popleft()
+                queue = self._queues[key]
+                fcn, args, kws = queue.items.popleft()
+                # wake a submitter blocked on this queue
+                cond.notify_all()
+            try:
+                fcn(*args, **kws)
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+            with cond:
+                self.counts['delivered'] += 1
+                if queue.items:
+                    self._ready.append(key)
+                    cond.notify()
+                else:
+                    queue.active = False
+                    self._queues.pop(key, None)
+
+    def depths(self):
+        """return a dictionary of the number of queued events for each
+        key with queued events"""
+        with self._cond:
+            return {key: len(queue.items)
+                    for key, queue in self._queues.items() if queue.items}
+
+    def stats(self):
+        """return a dictionary of counts of events that were submitted,
+        delivered, dropped (policy 'drop-oldest'), coalesced (policy
+        'coalesce'), or blocked (policy 'block'), the largest queue
+        depth seen ('max_depth'), and the number of events now queued
+        ('queued')."""
+        with self._cond:
+            out = dict(self.counts)
+            out['queued'] = sum(len(q.items) for q in self._queues.values())
+        return out
+
+    def stop(self, wait=True, timeout=None):
+        """stop the dispatcher.  Events that are already queued are still
+        run.  With `wait=True`, wait for the worker threads to finish."""
+        with self._cond:
+            self._running = False
+            self._cond.notify_all()
+        if wait:
+            for thread in self._threads:
+                thread.join(timeout)
@@ -0,0 +1,1167 @@
+#!/usr/bin/env python
+"""
+Pure-Python stand-in for the Channel Access library, for testing and
+profiling without an IOC or network.
+
+:class:`FakeCA` implements the ``ca_*`` functions of libca used by
+:mod:`epics.ca`, serving scripted :class:`FakeChannel` objects from
+within the process.  Installed with :func:`install` before Channel Access
+is initialized, it is used by :mod:`epics.ca` in place of libca, so that
+``PV``, ``Device``, ``Motor`` and the monitor pipeline run unchanged:
+
+>>> from epics import fakeca, PV
+>>> server = fakeca.FakeCA()
+>>> server.add_channel('Fake:ao1', value=1.0, units='mm', precision=3)
+>>> server.add_channel('Fake:ramp', value=0.0, rate=1000)
+>>> fakeca.install(server)
+>>> pv = PV('Fake:ao1')
+>>> pv.get()
+1.0
+
+Callbacks are delivered from one thread per context with preemptive
+callbacks, and from ``ca_pend_event()`` (that is, :func:`epics.ca.poll`)
+otherwise, as with libca.  Channels can be updated at a fixed rate from a
+scheduler thread, or explicitly with :meth:`FakeChannel.set_value` and
+:meth:`FakeChannel.step`, for reproducible event sequences.
+"""
+import sys
+import time
+import heapq
+import ctypes
+import itertools
+import threading
+from collections import deque
+
+from . import dbr
+from .utils import str2bytes, bytes2str
+
+HAS_NUMPY = dbr.HAS_NUMPY
+if HAS_NUMPY:
+    import numpy
+
+# status codes not defined in dbr
+ECA_BADTYPE = 114
+ECA_DISCONN = 192
+ECA_IOINPROGRESS = 347
+ECA_NORDACCESS = 370
+ECA_NOWTACCESS = 378
+ECA_NOTTHREADED = 458
+
+# channel states, as returned by ca_state()
+CS_NEVER_CONN = 0
+CS_PREV_CONN = 1
+CS_CONN = dbr.CS_CONN
+CS_CLOSED = 3
+
+# field type of an unconnected channel
+TYPENOTCONN = -1
+
+VERSION = '4.13 (pyepics fakeca)'
+
+_MESSAGES = {dbr.ECA_NORMAL: 'Normal successful completion',
+             dbr.ECA_TIMEOUT: 'User specified timeout on IO operation expired',
+             dbr.ECA_IODONE: 'IO operations have completed',
+             dbr.ECA_ISATTACHED: 'Thread is already attached to a client context',
+             dbr.ECA_BADCHID: 'Invalid channel identifier',
+             ECA_BADTYPE: 'The data type specifed is invalid',
+             ECA_DISCONN: 'Virtual circuit disconnect',
+             ECA_IOINPROGRESS: 'IO operations are in progress',
+             ECA_NORDACCESS: 'Read access denied',
+             ECA_NOWTACCESS: 'Write access denied',
+             ECA_NOTTHREADED: 'Preemptive callback not enabled - additional '
+                              'threads may not join context'}
+
+_NUMERIC_TYPES = {'short': dbr.SHORT, 'int': dbr.INT, 'float': dbr.FLOAT,
+                  'enum': dbr.ENUM, 'char': dbr.CHAR, 'long': dbr.LONG,
+                  'double': dbr.DOUBLE, 'string': dbr.STRING}
+
+def _value_offsets():
+    """offsets of the value within the TIME and CTRL structures, as the
+    dbr_value_offset array exported by libca"""
+    offsets = (39*ctypes.c_short)()
+    for ftype, ctype in dbr.Map.items():
+        if ftype >= dbr.TIME_STRING:
+            offsets[ftype] = ctype.value.offset
+    return offsets
+
+def _int(arg):
+    "integer value of a ctypes or Python number"
+    return arg.value if hasattr(arg, 'value') else int(arg)
+
+def _deref(ptr):
+    "object pointed to by ctypes.byref() or ctypes.pointer()"
+    obj = getattr(ptr, '_obj', None)
+    return ptr.contents if obj is None else obj
+
+def _call(callback, args):
+    "run a ctypes callback with its argument structure"
+    if dbr.PY64_WINDOWS:
+        args = ctypes.pointer(args)
+    callback(args)
+
+def _guess_ftype(value, enum_strs=None):
+    "native field type for a value"
+    if enum_strs:
+        return dbr.ENUM
+    if HAS_NUMPY and isinstance(value, numpy.ndarray):
+        for ftype, dtype in dbr.NP_Map.items():
+            if value.dtype == dtype and ftype != dbr.ENUM:
+                return ftype
+        return dbr.DOUBLE
+    if isinstance(value, (list, tuple)):
+        value = value[0] if len(value) > 0 else 0.0
+    if isinstance(value, (str, bytes)):
+        return dbr.STRING
+    if isinstance(value, int):
+        return dbr.LONG
+    return dbr.DOUBLE
+
+def _elements(data, ftype, count):
+    "list of the first count elements of a ctypes array"
+    if ftype == dbr.STRING:
+        return [bytes2str(data[i].value) for i in range(count)]
+    return data[:count]
+
+def _convert(values, ftype, enum_strs=None, precision=None):
+    """Python values converted for a native field type: raises ValueError
+    for strings that cannot be converted"""
+    if ftype == dbr.STRING:
+        out = []
+        for val in values:
+            if isinstance(val, bytes):
+                val = bytes2str(val)
+            elif enum_strs and isinstance(val, int) and 0 <= val < len(enum_strs):
+                val = enum_strs[val]
+            elif isinstance(val, float) and precision is not None:
+                val = '%.*f' % (precision, val)
+            out.append(str(val))
+        return out
+    out = []
+    for val in values:
+        if isinstance(val, bytes):
+            val = bytes2str(val)
+        if isinstance(val, str):
+            if enum_strs and val in enum_strs:
+                val = enum_strs.index(val)
+            else:
+                val = float(val)
+        if ftype in (dbr.FLOAT, dbr.DOUBLE):
+            out.append(float(val))
+        else:
+            out.append(int(val))
+    return out
+
+def _fill(data, ftype, values, count):
+    "copy count values into a ctypes array of native field type"
+    if count < 1:
+        return
+    if (HAS_NUMPY and isinstance(values, numpy.ndarray) and
+            ftype != dbr.STRING):
+        arr = numpy.ascontiguousarray(values[:count], dtype=dbr.NP_Map[ftype])
+        ctypes.memmove(data, arr.ctypes.data, arr.nbytes)
+    elif ftype == dbr.STRING:
+        for i in range(count):
+            data[i].value = str2bytes(values[i])[:dbr.MAX_STRING_SIZE-1]
+    else:
+        data[:count] = values[:count]
+
+
+class FakeChannel(object):
+    """A scripted channel served by :class:`FakeCA`.
+
+    Parameters
+    ----------
+    name : str
+        channel name.
+    value : object
+        initial value: a number, string, sequence, or numpy array.
+    ftype : int or str, optional
+        native field type, such as ``dbr.DOUBLE`` or ``'double'``
+        (guessed from `value` by default).
+    count : int, optional
+        element count (length of `value` by default).
+    units : str
+        engineering units.
+    precision : int, optional
+        display precision, for DOUBLE and FLOAT channels.
+    enum_strs : list of str, optional
+        state names, for ENUM channels.
+    limits : dict, optional
+        control limits, keyed by the names in ``dbr.ctrl_limits``, such as
+        `upper_ctrl_limit`.
+    read_access, write_access : bool
+        access rights.
+    connected : bool
+        whether the channel is initially connected.
+    host : str
+        host name reported for the channel.
+    rate : float, optional
+        rate (Hz) at which to update the channel from the scheduler thread.
+    update : callable, optional
+        function of the update number returning the next value, used by
+        :meth:`step`.  By default, numerical values are incremented by 1.
+    on_put : callable, optional
+        function run as ``on_put(channel, value)`` after a value is put by a
+        client.  It can return a time (in seconds) to delay completion of a
+        put with callback, or ``None``.
+    """
+    def __init__(self, name, value=0.0, ftype=None, count=None, units='',
+                 precision=None, enum_strs=None, limits=None,
+                 read_access=True, write_access=True, connected=True,
+                 host='fakeioc:5064', rate=None, update=None, on_put=None):
+        if isinstance(ftype, str):
+            ftype = _NUMERIC_TYPES[ftype.lower()]
+        if ftype is None:
+            ftype = _guess_ftype(value, enum_strs)
+        if isinstance(value, str) and ftype == dbr.CHAR:
+            value = [ord(c) for c in value] + [0]
+        if count is None:
+            count = 1
+            if not isinstance(value, (str, bytes, int, float)):
+                count = max(1, len(value))
+        self.name = name
+        self.ftype = ftype
+        self.count = count
+        self.units = units
+        self.precision = precision
+        self.enum_strs = list(enum_strs) if enum_strs else []
+        self.limits = dict(limits) if limits else {}
+        self.read_access = read_access
+        self.write_access = write_access
+        self.connected = connected
+        self.host = host
+        self.rate = rate
+        self.update = update
+        self.on_put = on_put
+        self.put_delay = 0.0
+        self.status = 0
+        self.severity = 0
+        self.timestamp = time.time()
+        self.nupdates = 0
+        self.nputs = 0
+        self.nord = 0
+        self.server = None
+        self.handles = []
+        self.lock = threading.RLock()
+        self._data = (count*dbr.Map[ftype])()
+        self._store(value)
+
+    def __repr__(self):
+        return "<FakeChannel '%s': %s, count=%d>" % (self.name,
+                                                     dbr.Name(self.ftype),
+                                                     self.count)
+
+    def _store(self, value):
+        "store a value"
+        if HAS_NUMPY and isinstance(value, numpy.ndarray):
+            values = value.ravel()
+        else:
+            if isinstance(value, str) and self.ftype == dbr.CHAR:
+                value = [ord(c) for c in value] + [0]
+            elif isinstance(value, (str, bytes)) or not hasattr(value, '__len__'):
+                value = [value]
+            values = _convert(value, self.ftype, self.enum_strs,
+                              self.precision)
+        nord = min(len(values), self.count)
+        _fill(self._data, self.ftype, values, nord)
+        self.nord = nord
+
+    @property
+    def value(self):
+        "current value: a scalar for count=1, otherwise a list"
+        with self.lock:
+            values = _elements(self._data, self.ftype, self.nord)
+        if self.count == 1:
+            return values[0] if len(values) > 0 else None
+        return values
+
+    def set_value(self, value, severity=None, status=None, timestamp=None):
+        """set the value, and optionally the alarm severity and status,
+        sending monitor events to clients"""
+        mask = dbr.DBE_VALUE | dbr.DBE_LOG
+        with self.lock:
+            self._store(value)
+            if severity is not None or status is not None:
+                mask |= self._set_alarm(severity, status)
+            self.timestamp = time.time() if timestamp is None else timestamp
+        if self.server is not None:
+            self.server.post_event(self, mask)
+
+    def set_alarm(self, severity=None, status=None):
+        "set the alarm severity and status, sending alarm events to clients"
+        with self.lock:
+            mask = self._set_alarm(severity, status)
+        if mask and self.server is not None:
+            self.server.post_event(self, mask)
+
+    def _set_alarm(self, severity, status):
+        "set the alarm state, returning DBE_ALARM if it changed"
+        old = (self.severity, self.status)
+        if severity is not None:
+            self.severity = severity
+        if status is not None:
+            self.status = status
+        return dbr.DBE_ALARM if old != (self.severity, self.status) else 0
+
+    def set_access(self, read_access=True, write_access=True):
+        "set access rights, sending access rights events to clients"
+        self.read_access = read_access
+        self.write_access = write_access
+        if self.server is not None:
+            self.server.post_access(self)
+
+    def connect(self):
+        "connect the channel (as when its IOC starts)"
+        self.connected = True
+        if self.server is not None:
+            self.server.post_connection(self)
+
+    def disconnect(self):
+        "disconnect the channel (as when its IOC stops)"
+        self.connected = False
+        if self.server is not None:
+            self.server.post_connection(self)
+
+    def step(self, n=1):
+        """update the value n times, with `update` or by adding 1 to
+        numerical values"""
+        for _ in range(n):
+            self.nupdates += 1
+            if self.update is not None:
+                value = self.update(self.nupdates)
+            elif self.ftype == dbr.STRING:
+                value = str(self.nupdates)
+            else:
+                value = self.value
+                if self.count == 1:
+                    value = value + 1
+                elif HAS_NUMPY:
+                    value = numpy.asarray(value) + 1
+                else:
+                    value = [v + 1 for v in value]
+            self.set_value(value)
+
+    def put(self, ftype, count, data):
+        """store data put by a client, returning the value of `on_put`"""
+        with self.lock:
+            if ftype == self.ftype:
+                nord = min(count, self.count)
+                ctypes.memmove(self._data, data,
+                               nord*ctypes.sizeof(dbr.Map[ftype]))
+                self.nord = nord
+            else:
+                self._store(_elements(data, ftype, min(count, len(data))))
+            self.timestamp = time.time()
+            self.nputs += 1
+        if self.server is not None:
+            self.server.post_event(self, dbr.DBE_VALUE | dbr.DBE_LOG)
+        if self.on_put is not None:
+            return self.on_put(self, self.value)
+        return None
+
+    def snapshot(self, ftype, count):
+        """data for a get or monitor event of type ftype, as
+        (buffer, count), or (None, count) if the data cannot be converted"""
+        ntype = dbr.native_type(ftype)
+        with self.lock:
+            if count <= 0:
+                count = max(1, self.nord)
+            count = min(count, self.count)
+            offset = 0
+            if ftype != ntype:
+                offset = self.server.dbr_value_offset[ftype]
+            esize = ctypes.sizeof(dbr.Map[ntype])
+            size = max(ctypes.sizeof(dbr.Map[ftype]), offset + count*esize)
+            buff = ctypes.create_string_buffer(size)
+            if ftype != ntype:
+                self._fill_header(dbr.Map[ftype].from_buffer(buff), ftype)
+            nord = min(count, self.nord)
+            if ntype == self.ftype:
+                ctypes.memmove(ctypes.addressof(buff) + offset, self._data,
+                               nord*esize)
+            else:
+                try:
+                    values = _convert(_elements(self._data, self.ftype, nord),
+                                      ntype, self.enum_strs, self.precision)
+                except ValueError:
+                    return None, count
+                dest = (count*dbr.Map[ntype]).from_buffer(buff, offset)
+                _fill(dest, ntype, values, nord)
+        return buff, count
+
+    def _fill_header(self, hdr, ftype):
+        "fill in alarm, timestamp, and control fields of a TIME or CTRL type"
+        hdr.status = self.status
+        hdr.severity = self.severity
+        if hasattr(hdr, 'stamp'):
+            secs = self.timestamp - dbr.EPICS2UNIX_EPOCH
+            hdr.stamp.secs = int(secs)
+            hdr.stamp.nsec = int(1.e9*(secs - int(secs)))
+        if hasattr(hdr, 'no_str'):
+            hdr.no_str = len(self.enum_strs)
+            for i, name in enumerate(self.enum_strs[:dbr.MAX_ENUMS]):
+                hdr.strs[i].value = str2bytes(name)[:dbr.MAX_ENUM_STRING_SIZE-1]
+        if hasattr(hdr, 'units'):
+            hdr.units = str2bytes(self.units)[:dbr.MAX_UNITS_SIZE-1]
+            for key in dbr.ctrl_limits:
+                setattr(hdr, key, self.limits.get(key, 0))
+        if hasattr(hdr, 'precision') and self.precision is not None:
+            hdr.precision = self.precision
+
+
+class _Context(object):
+    "a client context, holding the queue of callbacks to run"
+    def __init__(self, ident, preemptive, server):
+        self.ident = ident
+        self.preemptive = preemptive
+        self.events = deque()
+        self.cond = threading.Condition()
+        self.running = True
+        self.busy = False
+        self.thread = None
+        if preemptive:
+            self.thread = threading.Thread(target=self._run, args=(server,),
+                                           name='fakeca-context-%d' % ident)
+            self.thread.daemon = True
+            self.thread.start()
+
+    def post(self, fcn, *args):
+        "queue a callback"
+        with self.cond:
+            self.events.append((fcn, args))
+            self.cond.notify_all()
+
+    def _next(self, timeout=None):
+        "next queued callback, waiting up to timeout, or None"
+        with self.cond:
+            if not self.events and timeout != 0:
+                self.cond.wait(timeout)
+            if not self.events or not self.running:
+                return None
+            self.busy = True
+            return self.events.popleft()
+
+    def _done(self):
+        with self.cond:
+            self.busy = False
+            self.cond.notify_all()
+
+    def _run_one(self, event):
+        fcn, args = event
+        try:
+            fcn(*args)
+        except Exception:
+            sys.excepthook(*sys.exc_info())
+        finally:
+            self._done()
+
+    def _run(self, server):
+        "event loop for preemptive callbacks"
+        server._local.context = self
+        while self.running:
+            event = self._next(timeout=1.0)
+            if event is not None:
+                self._run_one(event)
+
+    def process(self, timeout=0):
+        "run queued callbacks, waiting for more for up to timeout seconds"
+        expire_time = time.time() + timeout
+        while self.running:
+            event = self._next(timeout=max(0, expire_time - time.time()))
+            if event is None:
+                if time.time() >= expire_time:
+                    return
+            else:
+                self._run_one(event)
+
+    def wait_idle(self, timeout):
+        "wait until the queue is empty, returning whether it is"
+        expire_time = time.time() + timeout
+        with self.cond:
+            while self.events or self.busy:
+                remaining = expire_time - time.time()
+                if remaining <= 0:
+                    return False
+                self.cond.wait(remaining)
+        return True
+
+    def stop(self):
+        with self.cond:
+            self.running = False
+            self.events.clear()
+            self.cond.notify_all()
+
+
+class _Handle(object):
+    "client side of a channel: a chid"
+    def __init__(self, ident, name, context, conn_callback, puser=None):
+        self.ident = ident
+        self.name = name
+        self.context = context
+        self.conn_callback = conn_callback
+        self.puser = puser
+        self.access_callback = None
+        self.channel = None
+        self.state = CS_NEVER_CONN
+        self.subscriptions = []
+
+    @property
+    def connected(self):
+        return self.state == CS_CONN
+
+
+class _Subscription(object):
+    "a monitor on a channel"
+    def __init__(self, ident, handle, ftype, count, mask, callback, usr):
+        self.ident = ident
+        self.handle = handle
+        self.ftype = ftype
+        self.count = count
+        self.mask = mask
+        self.callback = callback
+        self.usr = usr
+        self.active = True
+
+
+class _Scheduler(object):
+    "a thread running functions at given times"
+    def __init__(self):
+        self._heap = []
+        self._seq = itertools.count()
+        self._cond = threading.Condition()
+        self._thread = None
+
+    def schedule(self, delay, fcn, *args):
+        "run fcn(*args) after delay seconds"
+        with self._cond:
+            heapq.heappush(self._heap, (time.time() + delay, next(self._seq),
+                                        fcn, args))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run,
+                                                name='fakeca-scheduler')
+                self._thread.daemon = True
+                self._thread.start()
+            self._cond.notify()
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._heap:
+                    self._cond.wait()
+                due, _, fcn, args = self._heap[0]
+                wait = due - time.time()
+                if wait > 0:
+                    self._cond.wait(wait)
+                    continue
+                heapq.heappop(self._heap)
+            try:
+                fcn(*args)
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+
+
+class FakeCA(object):
+    """In-process replacement for libca, serving scripted channels.
+
+    Parameters
+    ----------
+    channels : list, optional
+        :class:`FakeChannel` objects to serve.
+    latency : float
+        delay (in seconds) for connections, get replies, and completion of
+        puts with callback.
+
+    Notes
+    -----
+    The ``ca_*`` methods follow the libca C API, taking and returning the
+    ctypes objects used by :mod:`epics.ca`, and are not meant to be called
+    directly.  Counts of the requests served are kept in :attr:`stats`.
+    """
+    def __init__(self, channels=None, latency=0.0):
+        self.latency = latency
+        self.channels = {}
+        self.dbr_value_offset = _value_offsets()
+        self.stats = {'channels': 0, 'gets': 0, 'puts': 0,
+                      'subscriptions': 0, 'events': 0}
+        self._lock = threading.RLock()
+        self._local = threading.local()
+        self._ids = itertools.count(1)
+        self._contexts = {}
+        self._handles = {}
+        self._subscriptions = {}
+        self._groups = {}
+        self._scheduler = _Scheduler()
+        for channel in (channels or []):
+            self.add_channel(channel)
+
+    # scripting
+    def add_channel(self, name, **kws):
+        """add a channel, given a :class:`FakeChannel` or a name and the
+        keyword arguments for :class:`FakeChannel`.  Returns the channel."""
+        channel = name
+        if not isinstance(channel, FakeChannel):
+            channel = FakeChannel(name, **kws)
+        channel.server = self
+        with self._lock:
+            self.channels[channel.name] = channel
+            waiting = [h for h in self._handles.values()
+                       if h.channel is None and
+                       self.find_channel(h.name) is channel]
+            for handle in waiting:
+                handle.channel = channel
+                channel.handles.append(handle)
+        if waiting and channel.connected:
+            self.post_connection(channel)
+        if channel.rate:
+            self.set_rate(channel, channel.rate)
+        return channel
+
+    def add_record(self, prefix, fields, rtype=None):
+        """add channels for the fields of a record, named `prefix.FIELD`.
+
+        `fields` maps field names to values, or to dictionaries of keyword
+        arguments for :class:`FakeChannel`.  The record name alone is an
+        alias for its VAL field.  Returns a dictionary of channels by field.
+        """
+        out = {}
+        if rtype is not None:
+            fields = dict(fields)
+            fields['RTYP'] = rtype
+        for field, kws in fields.items():
+            if not isinstance(kws, dict):
+                kws = {'value': kws}
+            out[field] = self.add_channel('%s.%s' % (prefix, field), **kws)
+        return out
+
+    def add_motor(self, prefix, position=0.0, velocity=1.0, units='mm',
+                  precision=4, low_limit=-100.0, high_limit=100.0,
+                  update_rate=20.0):
+        """add the fields of a motor record used by :class:`epics.Motor`.
+
+        A put to VAL moves the readback (RBV) to the new position at
+        `velocity`, updating it `update_rate` times per second, with DMOV
+        and MOVN following the motion.  A put with callback completes when
+        the move is done.  Positions outside the soft limits (LLM, HLM) set
+        LVIO without moving.  Returns a dictionary of channels by field.
+        """
+        from .motor import Motor
+        fields = dict((f, 0.0) for f in Motor._alias.values())
+        fields.update({'VAL': position, 'RBV': position, 'DVAL': position,
+                       'DRBV': position, 'VELO': velocity,
+                       'LLM': low_limit, 'HLM': high_limit,
+                       'DLLM': low_limit, 'DHLM': high_limit,
+                       'PREC': {'value': precision, 'ftype': dbr.SHORT},
+                       'EGU': units, 'DESC': prefix, 'DTYP': 'Soft Channel',
+                       'OUT': '', 'VERS': 7.0, 'MRES': 1.e-4,
+                       'DMOV': {'value': 1, 'ftype': dbr.SHORT},
+                       'MOVN': {'value': 0, 'ftype': dbr.SHORT},
+                       'LVIO': {'value': 0, 'ftype': dbr.SHORT},
+                       'SPMG': {'value': 3, 'enum_strs': ['Stop', 'Pause',
+                                                          'Move', 'Go']},
+                       'disabled': {'value': 0, 'ftype': dbr.SHORT}})
+        for key in ('VAL', 'RBV', 'DVAL', 'DRBV', 'LLM', 'HLM'):
+            fields[key] = {'value': fields[key], 'units': units,
+                           'precision': precision}
+        chans = self.add_record(prefix, fields, rtype='motor')
+        chans['_able'] = self.add_channel(prefix + '_able.VAL', value=0,
+                                          ftype=dbr.SHORT)
+        motion = {'generation': 0}
+
+        def move_step(generation, start, target, frac):
+            if generation != motion['generation']:
+                return
+            pos = start + frac*(target - start)
+            chans['RBV'].set_value(pos)
+            chans['DRBV'].set_value(pos)
+            if frac >= 1:
+                chans['MOVN'].set_value(0)
+                chans['DMOV'].set_value(1)
+
+        def on_put_val(channel, target):
+            if not low_limit <= target <= high_limit:
+                # restore the drive value, as the motor record does
+                chans['LVIO'].set_value(1)
+                channel.set_value(chans['DVAL'].value)
+                return None
+            chans['LVIO'].set_value(0)
+            motion['generation'] += 1
+            start = chans['RBV'].value
+            velo = chans['VELO'].value
+            duration = abs(target - start)/velo if velo > 0 else 0.0
+            nsteps = max(1, int(duration*update_rate))
+            chans['DVAL'].set_value(target)
+            chans['DMOV'].set_value(0)
+            chans['MOVN'].set_value(1)
+            for i in range(1, nsteps+1):
+                self._scheduler.schedule(duration*i/nsteps, move_step,
+                                         motion['generation'], start,
+                                         target, i/nsteps)
+            return duration
+
+        def on_put_stop(channel, value):
+            if value:
+                motion['generation'] += 1
+                pos = chans['RBV'].value
+                chans['VAL'].set_value(pos)
+                chans['DVAL'].set_value(pos)
+                chans['MOVN'].set_value(0)
+                chans['DMOV'].set_value(1)
+                channel.set_value(0)
+
+        chans['VAL'].on_put = on_put_val
+        chans['STOP'].on_put = on_put_stop
+        return chans
+
+    def find_channel(self, name):
+        "channel for a name, with 'rec' and 'rec.VAL' as the same channel"
+        channel = self.channels.get(name, None)
+        if channel is None:
+            if name.endswith('.VAL'):
+                channel = self.channels.get(name[:-4], None)
+            elif '.' not in name:
+                channel = self.channels.get(name + '.VAL', None)
+        return channel
+
+    def remove_channel(self, name):
+        "remove a channel, disconnecting its clients"
+        with self._lock:
+            channel = self.channels.pop(name)
+        channel.disconnect()
+        channel.rate = None
+        channel.server = None
+        with self._lock:
+            for handle in channel.handles:
+                handle.channel = None
+            channel.handles = []
+
+    def set_rate(self, channel, rate):
+        """update a channel `rate` times per second from the scheduler
+        thread, or stop updating it with rate=None"""
+        channel.rate = rate
+        channel._rate_generation = getattr(channel, '_rate_generation', 0) + 1
+        if rate:
+            self._scheduler.schedule(1.0/rate, self._tick, channel,
+                                     channel._rate_generation,
+                                     time.time() + 1.0/rate)
+
+    def _tick(self, channel, generation, due):
+        "update a channel at its rate"
+        if not channel.rate or generation != channel._rate_generation:
+            return
+        channel.step()
+        period = 1.0/channel.rate
+        now = time.time()
+        due = max(due + period, now)
+        self._scheduler.schedule(due - now, self._tick, channel, generation,
+                                 due)
+
+    def wait_for_events(self, timeout=5.0):
+        """wait until all queued callbacks have run (in preemptive
+        contexts), returning whether they have"""
+        with self._lock:
+            contexts = [c for c in self._contexts.values() if c.preemptive]
+        expire_time = time.time() + timeout
+        for ctx in contexts:
+            if not ctx.wait_idle(max(0, expire_time - time.time())):
+                return False
+        return True
+
+    # delivery of events
+    def _post(self, context, delay, fcn, *args):
+        if delay > 0:
+            self._scheduler.schedule(delay, context.post, fcn, *args)
+        else:
+            context.post(fcn, *args)
+
+    def post_event(self, channel, mask):
+        "send monitor events for a channel to subscribers"
+        for handle in list(channel.handles):
+            if not (handle.connected and channel.read_access):
+                continue
+            for sub in list(handle.subscriptions):
+                if sub.mask & mask:
+                    self._post_subscription(sub)
+
+    def _post_subscription(self, sub):
+        buff, count = sub.handle.channel.snapshot(sub.ftype, sub.count)
+        self.stats['events'] += 1
+        sub.handle.context.post(self._run_subscription, sub, buff, count)
+
+    def _run_subscription(self, sub, buff, count):
+        if sub.active:
+            self._run_event(sub.callback, sub.usr, sub.handle, sub.ftype,
+                            count, buff)
+
+    def _run_event(self, callback, usr, handle, ftype, count, buff):
+        status = dbr.ECA_NORMAL if buff is not None else ECA_BADTYPE
+        args = dbr.event_handler_args(usr=usr, chid=handle.ident, type=ftype,
+                                      count=count, status=status,
+                                      raw_dbr=None if buff is None else
+                                      ctypes.addressof(buff))
+        _call(callback, args)
+
+    def post_connection(self, channel):
+        "send connection events for a channel to clients"
+        for handle in list(channel.handles):
+            if channel.connected and not handle.connected:
+                handle.state = CS_CONN
+                self._post(handle.context, self.latency, self._run_connect,
+                           handle)
+            elif handle.connected and not channel.connected:
+                handle.state = CS_PREV_CONN
+                handle.context.post(self._run_connection, handle,
+                                    dbr.OP_CONN_DOWN)
+
+    def _run_connect(self, handle):
+        if not handle.connected:
+            return
+        self._run_access(handle)
+        self._run_connection(handle, dbr.OP_CONN_UP)
+        if handle.channel.read_access:
+            for sub in list(handle.subscriptions):
+                self._post_subscription(sub)
+
+    def _run_connection(self, handle, op):
+        if handle.conn_callback is not None:
+            _call(handle.conn_callback,
+                  dbr.connection_args(chid=handle.ident, op=op))
+
+    def post_access(self, channel):
+        "send access rights events for a channel to clients"
+        for handle in list(channel.handles):
+            if handle.connected:
+                handle.context.post(self._run_access, handle)
+
+    def _run_access(self, handle):
+        if handle.access_callback is not None and handle.channel is not None:
+            access = (int(handle.channel.read_access) |
+                      (int(handle.channel.write_access) << 1))
+            _call(handle.access_callback,
+                  dbr.access_rights_handler_args(chid=handle.ident,
+                                                 access=access))
+
+    def _context(self):
+        return getattr(self._local, 'context', None)
+
+    def _handle(self, chid):
+        return self._handles.get(_int(chid), None)
+
+    # contexts
+    def ca_context_create(self, preemptive):
+        if self._context() is None:
+            with self._lock:
+                ident = next(self._ids)
+                ctx = _Context(ident, bool(_int(preemptive)), self)
+                self._contexts[ident] = ctx
+            self._local.context = ctx
+        return dbr.ECA_NORMAL
+
+    def ca_context_destroy(self):
+        ctx = self._context()
+        if ctx is not None:
+            with self._lock:
+                self._contexts.pop(ctx.ident, None)
+                for hid, handle in list(self._handles.items()):
+                    if handle.context is ctx:
+                        self.ca_clear_channel(hid)
+            ctx.stop()
+            self._local.context = None
+        return dbr.ECA_NORMAL
+
+    def ca_current_context(self):
+        ctx = self._context()
+        return None if ctx is None else ctx.ident
+
+    def ca_attach_context(self, context):
+        current = self._context()
+        if hasattr(context, 'value'):
+            context = context.value
+        ctx = self._contexts.get(context, None)
+        if current is not None:
+            return dbr.ECA_NORMAL if current is ctx else dbr.ECA_ISATTACHED
+        if ctx is None or not ctx.preemptive:
+            return ECA_NOTTHREADED
+        self._local.context = ctx
+        return dbr.ECA_NORMAL
+
+    def ca_detach_context(self):
+        self._local.context = None
+
+    def ca_client_status(self, context, level):
+        if hasattr(context, 'value'):
+            context = context.value
+        ctx = self._contexts.get(context, self._context())
+        handles = [h for h in self._handles.values() if h.context is ctx]
+        print("pyepics fake CA client context %s: %d channels" %
+              (None if ctx is None else ctx.ident, len(handles)))
+        if _int(level) > 0:
+            for handle in handles:
+                print("  %s: state=%d, subscriptions=%d" % (
+                    handle.name, handle.state, len(handle.subscriptions)))
+        return dbr.ECA_NORMAL
+
+    def ca_replace_printf_handler(self, handler):
+        return dbr.ECA_NORMAL
+
+    def ca_message(self, status):
+        return str2bytes(_MESSAGES.get(_int(status), 'status %s' % status))
+
+    def ca_version(self):
+        return str2bytes(VERSION)
+
+    # polling
+    def ca_pend_event(self, timeout):
+        ctx = self._context()
+        timeout = float(timeout)
+        if ctx is None or ctx.preemptive:
+            time.sleep(timeout)
+        else:
+            ctx.process(timeout)
+        return dbr.ECA_TIMEOUT
+
+    def ca_pend_io(self, timeout):
+        ctx = self._context()
+        if ctx is not None and not ctx.preemptive:
+            ctx.process(0)
+        return dbr.ECA_NORMAL
+
+    def ca_test_io(self):
+        return dbr.ECA_IODONE
+
+    def ca_flush_io(self):
+        return dbr.ECA_NORMAL
+
+    # channels
+    def ca_create_channel(self, name, conn_callback, puser, priority, pchid):
+        ctx = self._context()
+        if ctx is None:
+            return ECA_NOTTHREADED
+        name = bytes2str(name.value if hasattr(name, 'value') else name)
+        with self._lock:
+            handle = _Handle(next(self._ids), name, ctx, conn_callback,
+                             puser=_int(puser) or None)
+            handle.channel = self.find_channel(name)
+            if handle.channel is not None:
+                handle.channel.handles.append(handle)
+            self._handles[handle.ident] = handle
+            self.stats['channels'] += 1
+        _deref(pchid).value = handle.ident
+        if handle.channel is not None and handle.channel.connected:
+            self.post_connection(handle.channel)
+        return dbr.ECA_NORMAL
+
+    def ca_replace_access_rights_event(self, chid, callback):
+        handle = self._handle(chid)
+        if handle is None:
+            return dbr.ECA_BADCHID
+        handle.access_callback = callback
+        if handle.connected:
+            handle.context.post(self._run_access, handle)
+        return dbr.ECA_NORMAL
+
+    def ca_clear_channel(self, chid):
+        with self._lock:
+            handle = self._handles.pop(_int(chid), None)
+        if handle is None:
+            return dbr.ECA_BADCHID
+        if handle.channel is not None and handle in handle.channel.handles:
+            handle.channel.handles.remove(handle)
+        for sub in handle.subscriptions:
+            sub.active = False
+            self._subscriptions.pop(sub.ident, None)
+        handle.subscriptions = []
+        handle.state = CS_CLOSED
+        handle.conn_callback = handle.access_callback = None
+        return dbr.ECA_NORMAL
+
+    def ca_state(self, chid):
+        handle = self._handle(chid)
+        return CS_CLOSED if handle is None else handle.state
+
+    def ca_name(self, chid):
+        handle = self._handle(chid)
+        return None if handle is None else str2bytes(handle.name)
+
+    def ca_puser(self, chid):
+        handle = self._handle(chid)
+        return None if handle is None else handle.puser
+
+    def ca_host_name(self, chid):
+        handle = self._handle(chid)
+        if handle is None or not handle.connected:
+            return b'<disconnected>'
+        return str2bytes(handle.channel.host)
+
+    def ca_field_type(self, chid):
+        handle = self._handle(chid)
+        if handle is None or not handle.connected:
+            return TYPENOTCONN
+        return handle.channel.ftype
+
+    def ca_element_count(self, chid):
+        handle = self._handle(chid)
+        if handle is None or not handle.connected:
+            return 0
+        return handle.channel.count
+
+    def ca_read_access(self, chid):
+        handle = self._handle(chid)
+        return int(handle is not None and handle.connected and
+                   handle.channel.read_access)
+
+    def ca_write_access(self, chid):
+        handle = self._handle(chid)
+        return int(handle is not None and handle.connected and
+                   handle.channel.write_access)
+
+    def _check(self, handle, write=False):
+        "status for an operation on a channel"
+        if handle is None:
+            return dbr.ECA_BADCHID
+        if not handle.connected:
+            return ECA_DISCONN
+        if write and not handle.channel.write_access:
+            return ECA_NOWTACCESS
+        if not write and not handle.channel.read_access:
+            return ECA_NORDACCESS
+        return dbr.ECA_NORMAL
+
+    # get and put
+    def ca_array_get_callback(self, ftype, count, chid, callback, usr):
+        handle = self._handle(chid)
+        ret = self._check(handle)
+        if ret != dbr.ECA_NORMAL:
+            return ret
+        ftype = _int(ftype)
+        buff, count = handle.channel.snapshot(ftype, _int(count))
+        self.stats['gets'] += 1
+        self._post(handle.context, self.latency, self._run_event, callback,
+                   usr.value, handle, ftype, count, buff)
+        return dbr.ECA_NORMAL
+
+    def ca_array_put(self, ftype, count, chid, data):
+        handle = self._handle(chid)
+        ret = self._check(handle, write=True)
+        if ret == dbr.ECA_NORMAL:
+            self.stats['puts'] += 1
+            handle.channel.put(_int(ftype), _int(count), data)
+        return ret
+
+    def ca_array_put_callback(self, ftype, count, chid, data, callback, usr):
+        handle = self._handle(chid)
+        ret = self._check(handle, write=True)
+        if ret != dbr.ECA_NORMAL:
+            return ret
+        ftype, count = _int(ftype), _int(count)
+        self.stats['puts'] += 1
+        delay = handle.channel.put(ftype, count, data)
+        if delay is None:
+            delay = handle.channel.put_delay
+        self._post(handle.context, self.latency + delay, self._run_event,
+                   callback, usr.value, handle, ftype, count, None)
+        return dbr.ECA_NORMAL
+
+    # subscriptions
+    def ca_create_subscription(self, ftype, count, chid, mask, callback,
+                               usr, pevid):
+        handle = self._handle(chid)
+        if handle is None:
+            return dbr.ECA_BADCHID
+        with self._lock:
+            sub = _Subscription(next(self._ids), handle, _int(ftype),
+                                _int(count), _int(mask), callback, usr.value)
+            self._subscriptions[sub.ident] = sub
+            handle.subscriptions.append(sub)
+            self.stats['subscriptions'] += 1
+        _deref(pevid).value = sub.ident
+        if handle.connected and handle.channel.read_access:
+            self._post_subscription(sub)
+        return dbr.ECA_NORMAL
+
+    def ca_clear_subscription(self, evid):
+        with self._lock:
+            sub = self._subscriptions.pop(_int(evid), None)
+            if sub is None:
+                return dbr.ECA_BADCHID
+            sub.active = False
+            if sub in sub.handle.subscriptions:
+                sub.handle.subscriptions.remove(sub)
+        return dbr.ECA_NORMAL
+
+    # synchronous groups
+    def ca_sg_create(self, pgid):
+        with self._lock:
+            gid = next(self._ids)
+            self._groups[gid] = []
+        _deref(pgid).value = gid
+        return dbr.ECA_NORMAL
+
+    def ca_sg_delete(self, gid):
+        with self._lock:
+            if self._groups.pop(_int(gid), None) is None:
+                return dbr.ECA_BADCHID
+        return dbr.ECA_NORMAL
+
+    def ca_sg_reset(self, gid):
+        self._groups.get(_int(gid), []).clear()
+        return dbr.ECA_NORMAL
+
+    def ca_sg_test(self, gid):
+        if self._groups.get(_int(gid)):
+            return ECA_IOINPROGRESS
+        return dbr.ECA_IODONE
+
+    def ca_sg_array_get(self, gid, ftype, count, chid, data):
+        handle = self._handle(chid)
+        ret = self._check(handle)
+        if ret == dbr.ECA_NORMAL:
+            # data is kept referenced here until it is filled in
+            self._groups[_int(gid)].append(('get', handle, _int(ftype),
+                                            _int(count), data))
+        return ret
+
+    def ca_sg_array_put(self, gid, ftype, count, chid, data):
+        handle = self._handle(chid)
+        ret = self._check(handle, write=True)
+        if ret == dbr.ECA_NORMAL:
+            data = type(data).from_buffer_copy(data)
+            self._groups[_int(gid)].append(('put', handle, _int(ftype),
+                                            _int(count), data))
+        return ret
+
+    def ca_sg_block(self, gid, timeout):
+        ops = self._groups.get(_int(gid), None)
+        if ops is None:
+            return dbr.ECA_BADCHID
+        ret = dbr.ECA_NORMAL
+        for op, handle, ftype, count, data in ops:
+            if not handle.connected:
+                ret = dbr.ECA_TIMEOUT
+            elif op == 'put':
+                self.stats['puts'] += 1
+                handle.channel.put(ftype, count, data)
+            else:
+                self.stats['gets'] += 1
+                buff, count = handle.channel.snapshot(ftype, count)
+                if buff is None:
+                    ret = ECA_BADTYPE
+                else:
+                    ctypes.memmove(data, buff, min(ctypes.sizeof(data),
+                                                   ctypes.sizeof(buff)))
+        del ops[:]
+        return ret
+
+
+def install(server=None):
+    """use a :class:`FakeCA` in place of libca for Channel Access.
+
+    This must be called before Channel Access is initialized.  Returns the
+    server, creating a new one if `server` is None.
+    """
+    from . import ca
+    if ca.libca is not None:
+        raise ca.ChannelAccessException('Channel Access is already initialized')
+    if server is None:
+        server = FakeCA()
+    ca.LIBCA_BACKEND = server
+    return server
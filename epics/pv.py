@@ -6,17 +6,38 @@
 """
   Epics Process Variable
 """
+import sys
 import time
 import copy
+import heapq
 import functools
+import itertools
+import threading
 import warnings
 from math import log10
+from collections.abc import Mapping
 from types import SimpleNamespace
 from . import ca
 from . import dbr
 
 _PVcache_ = {}
 
+## limits for _PVcache_, the cache of PVs used by get_pv(), caget(), and
+# so on: the maximum number of PVs, and the time (in seconds) after which
+# a PV that has not been asked for is removed.  None means no limit.
+PVCACHE_MAXSIZE = None
+PVCACHE_IDLE_TIME = None
+
+# time.monotonic() of the last use of each cached PV, least recent first
+_pvcache_used = {}
+_pvcache_stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+_pvcache_lock = threading.RLock()
+_pvcache_reaped = [0.0]
+
+# set while get_pvs() creates PVs, whose monitors are then subscribed
+# together once the PVs have connected
+_defer_monitors = threading.local()
+
 
 def _ensure_context(func):
     '''
@@ -29,7 +50,8 @@ def _ensure_context(func):
     RuntimeError
         If the expected context (self.context) is unset (None), or the current
         thread cannot get a valid context.  Both conditions would normally
-        result in a segmentation fault if left unchecked.
+        result in a segmentation fault if left unchecked.  Also raised if
+        the thread is pinned to another context with `ca.pin_context()`.
     '''
     @functools.wraps(func)
     def wrapped(self, *args, **kwargs):
@@ -39,6 +61,9 @@ def _ensure_context(func):
             raise RuntimeError('Expected CA context is unset')
         if expected_context == initial_context:
             return func(self, *args, **kwargs)
+        if ca.pinned_context() is not None:
+            raise RuntimeError('Thread is pinned to CA context %s, not %s' %
+                               (ca.pinned_context(), expected_context))
 
         # If not using the expected context, switch to it here:
         if initial_context is not None:
@@ -116,11 +141,16 @@ def get_pv(pvname, form='time', connect=False, context=None, timeout=5.0,
     if isinstance(pvname, default_pv_class):
         pvid = (pvname.pvname, form, context)
 
-    thispv = _PVcache_.get(pvid, None)
+    with _pvcache_lock:
+        thispv = _PVcache_.get(pvid, None)
+        _pvcache_used.pop(pvid, None)
+        _pvcache_used[pvid] = time.monotonic()
+        _pvcache_stats['misses' if thispv is None else 'hits'] += 1
 
     if thispv is None:
         if context != ca.current_context():
             raise RuntimeError('PV is not in cache for user-requested context')
+        new_channel = pvid[0] not in ca._cache[context]
         thispv = default_pv_class(pvname, form=form, callback=callback,
                                   connection_callback=connection_callback,
                                   access_callback=access_callback,
@@ -130,6 +160,13 @@ def get_pv(pvname, form='time', connect=False, context=None, timeout=5.0,
 
         # Update the cache with this new instance:
         _PVcache_[pvid] = thispv
+        if new_channel:
+            entry = ca._cache[context].get(pvid[0], None)
+            if isinstance(entry, ca._CacheItem):
+                entry.pvcache_owned = True
+        if ((PVCACHE_MAXSIZE is not None or PVCACHE_IDLE_TIME is not None)
+                and not getattr(_defer_monitors, 'active', False)):
+            reap_pvcache(keep=(pvid,))
     else:
         if connection_callback is not None:
             if thispv.connected:
@@ -157,6 +194,236 @@ def get_pv(pvname, form='time', connect=False, context=None, timeout=5.0,
     return thispv
 
 
+def _refcount(container, key):
+    "reference count of container[key], as seen from this function"
+    return sys.getrefcount(container[key])
+
+# _refcount() of an object held only by its container
+_REFCOUNT_BASE = _refcount({None: object()}, None)
+
+
+def _pv_in_use(pvid):
+    """whether a cached PV has user callbacks or a put in progress, or is
+    held by anything other than _PVcache_ and its own CA callbacks"""
+    thispv = _PVcache_[pvid]
+    if (len(thispv.callbacks) > 0 or len(thispv.connection_callbacks) > 0
+            or len(thispv.access_callbacks) > 0
+            or len(thispv._event_callbacks) > 0
+            or thispv._put_complete is False):
+        return True
+    # each method of the PV registered with the ca module holds a reference
+    methods = []
+    entry = ca._cache[pvid[2]].get(thispv.pvname, None)
+    if isinstance(entry, ca._CacheItem):
+        methods.extend(entry.callbacks)
+        methods.extend(entry._access_event_callback or ())
+    if thispv._monref is not None:
+        callback = thispv._monref[1].value
+        methods.extend(callback if isinstance(callback, tuple) else (callback,))
+    nmethods = len({id(meth) for meth in methods
+                    if getattr(meth, '__self__', None) is thispv})
+    # less the reference held by `thispv` here
+    return _refcount(_PVcache_, pvid) - _REFCOUNT_BASE - 1 > nmethods
+
+
+def _evict_pv(pvid):
+    """remove a PV that is not in use from _PVcache_, releasing its CA
+    callbacks, and clear its channel if the channel was created for the
+    cache and no other cached PV or channel callback uses it"""
+    pvname, _, context = pvid
+    thispv = _PVcache_.pop(pvid)
+    _pvcache_used.pop(pvid, None)
+    _pvcache_stats['evictions'] += 1
+    thispv._disconnect()
+    if any((pvname, form, context) in _PVcache_
+           for form in ('native', 'time', 'ctrl')):
+        return
+    entry = ca._cache[context].get(pvname, None)
+    if (entry is not None and entry.chid is not None
+            and entry.pvcache_owned and len(entry.callbacks) == 0
+            and not entry._access_event_callback
+            and entry.value_cache is None):
+        ca.clear_channel(entry.chid)
+
+
+def reap_pvcache(keep=()):
+    """
+    Remove PVs from `_PVcache_` to keep within the limits set by
+    `PVCACHE_MAXSIZE` and `PVCACHE_IDLE_TIME`: PVs that have not been
+    asked for in `PVCACHE_IDLE_TIME` seconds are removed, and then the
+    least recently used PVs until there are no more than `PVCACHE_MAXSIZE`.
+
+    This is called by `get_pv()` when it creates a PV, and can also be
+    called directly.  Only PVs that nothing outside the cache holds are
+    removed.  Their channels are cleared if they were created for the
+    cache and are not used by other PVs or asked for with
+    `ca.create_channel()`.
+
+    Parameters
+    ---------
+    keep : collection, optional
+        keys of PVs in _PVcache_ not to remove
+
+    Returns
+    -------
+    nremoved : int
+        number of PVs removed
+
+    Notes
+    -----
+    PVs with user callbacks or a put in progress, PVs held by other objects
+    (such as a `Device`), and PVs of other CA contexts than the current
+    one, are never removed.
+    """
+    if not _pvcache_lock.acquire(blocking=False):
+        return 0
+    try:
+        now = time.monotonic()
+        context = ca.current_context()
+        maxsize, idle_time = PVCACHE_MAXSIZE, PVCACHE_IDLE_TIME
+        nremoved = 0
+        for pvid in list(_pvcache_used):
+            if pvid not in _PVcache_:
+                _pvcache_used.pop(pvid, None)
+        if idle_time is not None and now > _pvcache_reaped[0] + idle_time/4.0:
+            _pvcache_reaped[0] = now
+            for pvid, last_used in list(_pvcache_used.items()):
+                if now - last_used < idle_time:
+                    break
+                if (pvid not in keep and pvid in _PVcache_
+                        and pvid[2] == context and not _pv_in_use(pvid)):
+                    _evict_pv(pvid)
+                    nremoved += 1
+        if maxsize is not None and len(_PVcache_) > maxsize:
+            for pvid in list(_pvcache_used):
+                if len(_PVcache_) <= maxsize:
+                    break
+                if (pvid not in keep and pvid in _PVcache_
+                        and pvid[2] == context and not _pv_in_use(pvid)):
+                    _evict_pv(pvid)
+                    nremoved += 1
+        for pvid in list(_pvcache_used):
+            if pvid not in _PVcache_:
+                _pvcache_used.pop(pvid, None)
+        return nremoved
+    finally:
+        _pvcache_lock.release()
+
+
+def pvcache_stats():
+    """
+    Statistics of `_PVcache_`: a dictionary with the number of cached PVs
+    (`size`), the `hits` and `misses` of `get_pv()`, the number of PVs
+    removed by `reap_pvcache()` (`evictions`), and the limits `maxsize` and
+    `idle_time`.
+    """
+    out = dict(_pvcache_stats)
+    out.update({'size': len(_PVcache_), 'maxsize': PVCACHE_MAXSIZE,
+                'idle_time': PVCACHE_IDLE_TIME})
+    return out
+
+
+def get_pvs(pvnames, form='time', timeout=None, connection_callback=None,
+            access_callback=None, callback=None, count=None,
+            auto_monitor=None):
+    """
+    Get PVs for a list of names from the PV cache, creating the PVs that
+    are not cached, and wait for them to connect.
+
+    This is much faster than calling `get_pv()` for each name when
+    connecting to thousands of PVs: the channels are all created before
+    waiting, and the auto-monitor subscriptions of the new PVs are created
+    together once they have connected, and sent with a single poll.
+
+    Parameters
+    ---------
+    pvnames : list of str
+        names of the PVs
+    form : str, optional
+        PV form: one of 'native', 'time' (default), 'ctrl'
+    timeout : float, optional
+        maximum time to wait for *all* PVs to connect, in seconds.  If
+        None, `ca.DEFAULT_CONNECTION_TIMEOUT` is used.
+    connection_callback, access_callback, callback, count, auto_monitor :
+        as for `get_pv()`, used for all PVs
+
+    Returns
+    -------
+    pvs : dict
+        PVs, keyed by PV name, for all names except those in `report.failed`
+    report : epics.ca.CreateChannelsResult
+        lists of `connected` and `timed_out` PV names, `failed` (dict of
+        error messages), `chids`, and timing information in
+        `connect_times`, `elapsed`, and `stats`.
+
+    Notes
+    -----
+    PVs that connect after the timeout create their monitors as usual
+    when they do connect.
+    """
+    if timeout is None:
+        timeout = ca.DEFAULT_CONNECTION_TIMEOUT
+    if ca.current_context() is None:
+        ca.use_initial_context()
+    pvnames = list(dict.fromkeys(pvnames))
+    report = ca.CreateChannelsResult()
+    countdown = ca._ConnectionCountdown(pvnames)
+    def on_connect(pvname=None, conn=True, **kws):
+        countdown(pvname=pvname, conn=conn)
+
+    pvs, created = {}, []
+    _defer_monitors.active = True
+    try:
+        for pvname in pvnames:
+            try:
+                thispv = get_pv(pvname, form=form, timeout=timeout,
+                                connection_callback=connection_callback,
+                                access_callback=access_callback,
+                                callback=callback, count=count,
+                                auto_monitor=auto_monitor)
+            except (ca.ChannelAccessException, ca.CASeverityException) as exc:
+                report.failed[pvname] = str(exc)
+                countdown(pvname=pvname, conn=True)
+                continue
+            pvs[pvname] = thispv
+            if thispv._defer_monitor:
+                created.append(thispv)
+            thispv.connection_callbacks.append(on_connect)
+            if thispv.connected:
+                countdown(pvname=pvname, conn=True)
+    finally:
+        _defer_monitors.active = False
+
+    if len(pvs) > 0 and timeout > 0:
+        ca._wait_for_event(countdown.done, timeout)
+
+    subscribe = []
+    for thispv in created:
+        with thispv._defer_lock:
+            thispv._defer_monitor = False
+            if thispv.connected:
+                subscribe.append(thispv)
+    for thispv in subscribe:
+        thispv._check_auto_monitor(flush=False)
+    if len(subscribe) > 0:
+        ca.poll()
+
+    for pvname, thispv in pvs.items():
+        if on_connect in thispv.connection_callbacks:
+            thispv.connection_callbacks.remove(on_connect)
+        report.chids[pvname] = thispv.chid
+        if pvname in countdown.connect_times:
+            report.connected.append(pvname)
+            report.connect_times[pvname] = countdown.connect_times[pvname]
+        else:
+            report.timed_out.append(pvname)
+    report.elapsed = time.time() - countdown.start_time
+    if PVCACHE_MAXSIZE is not None or PVCACHE_IDLE_TIME is not None:
+        context = ca.current_context()
+        reap_pvcache(keep={(pvname, form, context) for pvname in pvs})
+    return pvs, report
+
+
 def fmt_time(tstamp=None):
     "simple formatter for time values"
     if tstamp is None:
@@ -178,8 +445,10 @@ def clear_pvcache():
     This function is not thread safe.
     """
     global _PVcache_
-    pv_cache = _PVcache_
-    _PVcache_ = {}
+    with _pvcache_lock:
+        pv_cache = _PVcache_
+        _PVcache_ = {}
+        _pvcache_used.clear()
     for pv in pv_cache.values():
         pv.disconnect()
     pv_cache.clear()
@@ -188,6 +457,108 @@ def clear_pvcache():
 ca.register_clear_cache(clear_pvcache)
 
 
+class _RateLimiter:
+    """
+    Delivers the coalesced monitor events of PVs created with `max_rate`.
+
+    A single daemon thread, started on first use, keeps a heap of
+    (due time, PV) and runs each PV's pending event when it is due.
+    """
+    def __init__(self):
+        self.cond = threading.Condition()
+        self.heap = []
+        self.order = itertools.count()
+        self.thread = None
+
+    def schedule(self, due, pv):
+        "deliver the pending event of a PV at time.monotonic() `due`"
+        with self.cond:
+            heapq.heappush(self.heap, (due, next(self.order), pv))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True,
+                                               name='pyepics-rate-limiter')
+                self.thread.start()
+            self.cond.notify()
+
+    def run(self):
+        while True:
+            with self.cond:
+                while True:
+                    delay = None
+                    if self.heap:
+                        delay = self.heap[0][0] - time.monotonic()
+                        if delay <= 0:
+                            break
+                    self.cond.wait(delay)
+                _, _, pv = heapq.heappop(self.heap)
+            try:
+                pv._deliver_pending_event()
+            except Exception:
+                sys.excepthook(*sys.exc_info())
+
+_rate_limiter = _RateLimiter()
+
+
+# char_value of PV data that is only formatted when it is read
+_CHARVAL_PENDING = object()
+
+
+class PVEvent(Mapping):
+    """
+    Read-only data of a PV change event, passed to callbacks added with
+    `add_callback(..., as_event=True)`.
+
+    The event is built once for each change and shared by all callbacks
+    of the PV.  The data (pvname, value, char_value, timestamp, and so on)
+    can be read as attributes or as items, and the PV is `pv`:
+
+      >>> def onChange(event):
+      ...     print(event.pvname, event.value, event['severity'])
+
+    char_value is only formatted when it is first read.
+    """
+    __slots__ = ('_data', 'pv')
+
+    def __init__(self, data, pv=None):
+        object.__setattr__(self, '_data', data)
+        object.__setattr__(self, 'pv', pv)
+
+    def __getattr__(self, name):
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __setattr__(self, name, value):
+        raise AttributeError('PVEvent is read-only')
+
+    def __getitem__(self, key):
+        value = self._data[key]
+        if value is _CHARVAL_PENDING:
+            value = self._data[key] = _format_pending_charval(self.pv,
+                                                              self._data)
+        return value
+
+    def __iter__(self):
+        return iter(self._data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __repr__(self):
+        return f"<PVEvent '{self._data.get('pvname')}': value={self._data.get('value')!r}>"
+
+
+def _format_pending_charval(pv, data):
+    "format the char_value of PV data that holds _CHARVAL_PENDING"
+    if pv is None:
+        return str(data.get('value'))
+    return pv._format_charval(data.get('value'), call_ca=False)
+
+
+_NO_EVENT_CALLBACKS = frozenset()
+
+
 class PV():
     """Epics Process Variable
 
@@ -218,10 +589,34 @@ class PV():
                'lower_alarm_limit', 'lower_warning_limit',
                'upper_warning_limit', 'upper_ctrl_limit', 'lower_ctrl_limit')
 
+    # slots keep the memory per PV down for clients with very many PVs;
+    # __dict__ still allows other attributes to be added
+    __slots__ = ('pvname', 'form', 'verbose', '_auto_monitor', 'ftype',
+                 'connected', 'connection_timeout', '_user_max_count',
+                 '_args', '_monitor_delta_local', '_monitor_last_value',
+                 'max_rate', 'dispatcher', 'monitor_stats', 'callback_time',
+                 '_pending_event', '_next_delivery', '_charval_stale',
+                 'connection_callbacks', 'access_callbacks', 'callbacks',
+                 '_event_callbacks', '_put_complete', '_monref',
+                 '_monref_mask', '_monitor_buffer', '_conn_started', 'chid',
+                 'context', '_defer_monitor', '__dict__', '__weakref__')
+
+    # shared by all PVs, only used for PVs with a max_rate
+    _pending_lock = threading.Lock()
+    # shared by all PVs, only used for PVs created by get_pvs()
+    _defer_lock = threading.Lock()
+
     def __init__(self, pvname, callback=None, form='time',
                  verbose=False, auto_monitor=None, count= None,
                  connection_callback=None, connection_timeout=None,
-                 access_callback=None, monitor_delta=None):
+                 access_callback=None, monitor_delta=None, buffer=None,
+                 max_rate=None, dispatcher=None, elements=None):
+        if elements is not None:
+            # only ask the IOC for a range of elements of an array
+            if isinstance(elements, slice):
+                elements = (elements.start, elements.stop, elements.step)
+            start, stop, step = (tuple(elements) + (None, None))[:3]
+            pvname = ca.subarray_name(pvname.strip(), start, stop, step)
         self.pvname     = pvname.strip()
         self.form       = form.lower()
         self.verbose    = verbose
@@ -243,6 +638,14 @@ class PV():
         self._args['monitor_delta'] = monitor_delta
         self._monitor_delta_local = False # whether to simulate MDEL here (MDEL could not be set)
         self._monitor_last_value = None
+        self.max_rate = max_rate
+        self.dispatcher = dispatcher
+        self.monitor_stats = {'received': 0, 'skipped': 0,
+                              'coalesced': 0, 'delivered': 0}
+        self.callback_time = ca.DurationHistogram()
+        self._pending_event = None
+        self._charval_stale = True
+        self._next_delivery = 0.0
         self.connection_callbacks = []
 
         if connection_callback is not None:
@@ -253,9 +656,11 @@ class PV():
             self.access_callbacks = [access_callback]
 
         self.callbacks  = {}
+        self._event_callbacks = _NO_EVENT_CALLBACKS
         self._put_complete = None
         self._monref = None  # holder of data returned from create_subscription
         self._monref_mask = None
+        self._monitor_buffer = buffer
         self._conn_started = False
         if isinstance(callback, (tuple, list)):
             for i, thiscb in enumerate(callback):
@@ -265,6 +670,7 @@ class PV():
             self.callbacks[0] = (callback, {})
 
         self.chid = None
+        self._defer_monitor = getattr(_defer_monitors, 'active', False)
         if ca.current_context() is None:
             ca.use_initial_context()
         self.context = ca.current_context()
@@ -324,7 +730,8 @@ class PV():
         if pvname is not None and self.pvname is None:
             self.pvname = pvname
         if conn:
-            ca.poll()
+            if not self._defer_monitor:
+                ca.poll()
             self.chid = self._args['chid'] = dbr.chid_t(chid)
             try:
                 count = ca.element_count(self.chid)
@@ -357,8 +764,10 @@ class PV():
         # waiting until the very end until to set self.connected prevents
         # threads from thinking a connection is complete when it is actually
         # still in progress.
-        self.connected = conn
-        if conn:
+        with self._defer_lock:
+            self.connected = conn
+            deferred = self._defer_monitor
+        if conn and not deferred:
             self._check_auto_monitor()
 
     @_ensure_context
@@ -374,11 +783,12 @@ class PV():
         ca.clear_subscription(evid)
 
     @_ensure_context
-    def _check_auto_monitor(self):
+    def _check_auto_monitor(self, flush=True):
         '''
         Check the auto-monitor status
 
-        Clears or adds monitor, if necessary.
+        Clears or adds monitor, if necessary.  With `flush=False`, a new
+        subscription is sent with the next poll.
         '''
         if not self.connected or self.chid is None:
             # Auto-monitor will be enabled (or toggled based on count) upon the
@@ -426,7 +836,9 @@ class PV():
             use_time=(self.form == 'time'),
             callback=self.__on_changes,
             mask=mask,
-            count=self._user_max_count or 0
+            count=self._user_max_count or 0,
+            buffer=self._monitor_buffer,
+            flush=flush
         )
 
     @property
@@ -518,13 +930,13 @@ class PV():
         If the Channel Access status code sent by the IOC indicates a failure,
         this method will raise the exception ChannelAccessGetFailure.
         """
-        data = self.get_with_metadata(count=count, as_string=as_string,
-                                      as_numpy=as_numpy, timeout=timeout,
-                                      with_ctrlvars=with_ctrlvars,
-                                      use_monitor=use_monitor)
+        data = self._get_with_metadata(count=count, as_string=as_string,
+                                       as_numpy=as_numpy, timeout=timeout,
+                                       with_ctrlvars=with_ctrlvars,
+                                       use_monitor=use_monitor,
+                                       with_char_value=False)
         return (data['value'] if data is not None else None)
 
-    @_ensure_context
     def get_with_metadata(self, count=None, as_string=False, as_numpy=True,
                           timeout=None, with_ctrlvars=False, form=None,
                           use_monitor=True, as_namespace=False):
@@ -558,6 +970,19 @@ class PV():
         >>> ns.status
         0
         """
+        return self._get_with_metadata(count=count, as_string=as_string,
+                                       as_numpy=as_numpy, timeout=timeout,
+                                       with_ctrlvars=with_ctrlvars, form=form,
+                                       use_monitor=use_monitor,
+                                       as_namespace=as_namespace)
+
+    @_ensure_context
+    def _get_with_metadata(self, count=None, as_string=False, as_numpy=True,
+                           timeout=None, with_ctrlvars=False, form=None,
+                           use_monitor=True, as_namespace=False,
+                           with_char_value=True):
+        """get_with_metadata(), formatting a stale char_value of the
+        monitored data only if `with_char_value`, as get() does not use it"""
         if not self.wait_for_connection(timeout=timeout):
             return None
 
@@ -606,6 +1031,7 @@ class PV():
             # form, this could include timestamp, alarm information,
             # ctrlvars, and so on.
             self._args.update(**metad)
+            self._charval_stale = True
 
             if with_ctrlvars and form != 'ctrl':
                 # If the user requested ctrlvars and they were not included in
@@ -614,8 +1040,10 @@ class PV():
 
             val = metad['value']
         else:
+            if self._charval_stale and with_char_value and not as_string:
+                self._set_charval(self._args['value'], call_ca=False)
             metad = self._args.copy()
-            val = self._args['value']
+            val = metad['value'] = self._copy_view(self._args['value'])
 
         if as_string:
             char_value = self._set_charval(val, force_long_string=as_string)
@@ -692,13 +1120,30 @@ class PV():
     def _set_charval(self, val, call_ca=True, force_long_string=False):
         """ sets the character representation of the value.
         intended only for internal use"""
+        cval = self._format_charval(val, call_ca=call_ca,
+                                    force_long_string=force_long_string)
+        self._args['char_value'] = cval
+        # a long string forced by get(as_string=True), or a value formatted
+        # without the needed precision or enum strings, is not kept for
+        # the char_value property
+        stale = force_long_string
+        if not call_ca and val is not None:
+            ntype = dbr.native_type(self._args['ftype'])
+            stale = stale or ((ntype in (dbr.FLOAT, dbr.DOUBLE) and
+                               self._args['precision'] is None) or
+                              (ntype == dbr.ENUM and
+                               self._args['enum_strs'] in ([], None)))
+        self._charval_stale = stale
+        return cval
+
+    def _format_charval(self, val, call_ca=True, force_long_string=False):
+        """return the character representation of a value, without
+        storing it.  intended only for internal use"""
         if val is None:
-            self._args['char_value'] = 'None'
             return 'None'
         ftype = self._args['ftype']
         ntype = dbr.native_type(ftype)
         if ntype == dbr.STRING:
-            self._args['char_value'] = val
             return val
         # char waveform as string
         if ntype == dbr.CHAR and (self.count < ca.AUTOMONITOR_MAXLENGTH or
@@ -728,7 +1173,6 @@ class PV():
                 cval = ''.join([chr(i) for i in val[:firstnull]]).rstrip()
             except ValueError:
                 cval = ''
-            self._args['char_value'] = cval
             return cval
 
         cval  = repr(val)
@@ -757,8 +1201,6 @@ class PV():
                 cval = self._args['enum_strs'][val]
             except (TypeError, KeyError,  IndexError):
                 cval = str(val)
-
-        self._args['char_value'] = cval
         return cval
 
     @_ensure_context
@@ -769,6 +1211,7 @@ class PV():
         kwds = ca.get_ctrlvars(self.chid, timeout=timeout, warn=warn)
         if kwds is not None:
             self._args.update(kwds)
+            self._charval_stale = True
         self.force_read_access_rights()
         return kwds
 
@@ -782,6 +1225,17 @@ class PV():
             self._args.update(kwds)
         return kwds
 
+    def get_stats(self):
+        """return instrumentation counters for the PV: the counts of
+        monitor_stats, a summary of the time spent in user callbacks for
+        each event as `callback_time`, and the counters of the channel
+        (see ca.channel_stats) as `channel`"""
+        out = dict(self.monitor_stats)
+        out['callback_time'] = self.callback_time.as_dict()
+        out['channel'] = None
+        if self.chid is not None:
+            out['channel'] = ca.channel_stats(self.chid)
+        return out
 
     def __on_changes(self, value=None, **kwd):
         """internal callback function: do not overwrite!!
@@ -795,35 +1249,113 @@ class PV():
             except:
                 pass
         if skip:
+            self.monitor_stats['skipped'] += 1
             return
 
         if self._monitor_delta_local:
             self._monitor_last_value = value
 
+        if self.max_rate:
+            # keep only the newest event, for delivery by the rate limiter
+            with self._pending_lock:
+                self.monitor_stats['received'] += 1
+                pending = self._pending_event is not None
+                self._pending_event = (value, kwd)
+                if pending:
+                    self.monitor_stats['coalesced'] += 1
+                    return
+                due = max(time.monotonic(), self._next_delivery)
+            _rate_limiter.schedule(due, self)
+            return
+
+        self.monitor_stats['received'] += 1
+        self.__process_changes(value, kwd)
+
+    def _deliver_pending_event(self):
+        """run the pending (coalesced) monitor event for a PV with a
+        `max_rate`: called from the rate limiter thread"""
+        with self._pending_lock:
+            if self._pending_event is None:
+                return
+            value, kwd = self._pending_event
+            self._pending_event = None
+            if self.max_rate:
+                self._next_delivery = time.monotonic() + 1.0/self.max_rate
+        self.__process_changes(value, kwd)
+
+    @_ensure_context
+    def __process_changes(self, value, kwd):
+        "update PV data from a monitor event and run user callbacks"
+        self.monitor_stats['delivered'] += 1
         self._args.update(kwd)
         self._args['value']  = value
         self._args['timestamp'] = kwd.get('timestamp', time.time())
         self._args['posixseconds'] = kwd.get('posixseconds', 0)
         self._args['nanoseconds'] = kwd.get('nanoseconds', 0)
-        self._set_charval(self._args['value'], call_ca=False)
+        # char_value is formatted for callbacks taking keyword arguments,
+        # which are passed it: otherwise, the char_value property and the
+        # PVEvent of callbacks added with as_event=True format it on demand
+        self._charval_stale = True
+        formatted = (self.verbose or
+                     len(self.callbacks) > len(self._event_callbacks))
+        if formatted:
+            self._set_charval(value, call_ca=False)
         if self.verbose:
             now = fmt_time(self._args['timestamp'])
             ca.write(f"{self.pvname}: {self._args['char_value']} ({now})")
-        self.run_callbacks()
+        if self.dispatcher is not None:
+            # run callbacks from the dispatcher, with a snapshot of the data
+            if self.callbacks:
+                args = copy.copy(self._args)
+                args['value'] = self._copy_view(value)
+                if not formatted:
+                    args['char_value'] = _CHARVAL_PENDING
+                self.dispatcher.submit(self.pvname, self.run_callbacks,
+                                       args=args)
+        else:
+            self.run_callbacks()
 
     @_ensure_context
-    def run_callbacks(self):
+    def run_callbacks(self, args=None):
         """run all user-defined callbacks with the current data
 
         Normally, this is to be run automatically on event, but
         it is provided here as a separate function for testing
-        purposes.
+        purposes.  If given, `args` is used in place of the current
+        PV data (see run_callback).
         """
+        if not (ca.COLLECT_STATS and self.callbacks):
+            self.__run_callbacks(args)
+            return
+        start = time.perf_counter()
+        try:
+            self.__run_callbacks(args)
+        finally:
+            self.callback_time.add(time.perf_counter() - start)
+
+    def __run_callbacks(self, args):
+        "run all callbacks, sharing a single PVEvent between them"
+        event = None
         for index in sorted(list(self.callbacks.keys())):
-            self.run_callback(index)
+            if index in self._event_callbacks:
+                if event is None:
+                    event = self._make_event(args)
+                self.__run_callback(index, event)
+            else:
+                self.__run_callback(index, args)
+
+    def _make_event(self, args=None):
+        "return a PVEvent of the current data, or of `args`"
+        if isinstance(args, PVEvent):
+            return args
+        if args is None:
+            args = self._args.copy()
+            if self._charval_stale:
+                args['char_value'] = _CHARVAL_PENDING
+        return PVEvent(args, pv=self)
 
     @_ensure_context
-    def run_callback(self, index):
+    def run_callback(self, index, args=None):
         """run a specific user-defined callback, specified by index,
         with the current data
         Note that callback functions are called with keyword/val
@@ -834,32 +1366,70 @@ class PV():
         where the 'cb_info' is provided as a hook so that a callback
         function  that fails may de-register itself (for example, if
         a GUI resource is no longer available).
+
+        If given, `args` is a dictionary used in place of self._args,
+        as for callbacks run later by a dispatcher.
+
+        Callbacks added with `as_event=True` are instead called with a
+        PVEvent holding the data, followed by the keyword arguments given
+        to add_callback().
         """
+        self.__run_callback(index, args)
+
+    def __run_callback(self, index, args):
+        "run a callback, without checking the CA context"
         try:
             fcn, kwargs = self.callbacks[index]
         except KeyError:
             return
-        kwds = copy.copy(self._args)
+        if not callable(fcn):
+            return
+        if index in self._event_callbacks:
+            fcn(self._make_event(args), **kwargs)
+            return
+        if args is None:
+            if self._charval_stale:
+                # the last event may only have reached PVEvent callbacks
+                self._set_charval(self._args['value'], call_ca=False)
+            args = self._args
+        elif args.get('char_value') is _CHARVAL_PENDING:
+            # a snapshot taken before this callback was added
+            args = dict(args, char_value=_format_pending_charval(self, args))
+        # unpacking the data builds a new dictionary for the callee: only
+        # callbacks taking a PVEvent are run without copying the data
+        if not kwargs:
+            fcn(**args, cb_info=(index, self))
+            return
+        kwds = dict(args)
         kwds.update(kwargs)
         kwds['cb_info'] = (index, self)
-        if callable(fcn):
-            fcn(**kwds)
+        fcn(**kwds)
 
     def add_callback(self, callback=None, index=None, run_now=False,
-                     with_ctrlvars=True, **kw):
+                     with_ctrlvars=True, as_event=False, **kw):
         """add a callback to a PV.  Optional keyword arguments
         set here will be preserved and passed on to the callback
         at runtime.
 
         Note that a PV may have multiple callbacks, so that each
         has a unique index (small integer) that is returned by
-        add_callback.  This index is needed to remove a callback."""
+        add_callback.  This index is needed to remove a callback.
+
+        With `as_event=True`, the callback is called with a single
+        read-only PVEvent (shared by all such callbacks of an event)
+        instead of keyword arguments for all the PV data."""
         if callable(callback):
             if index is None:
                 index = 1
                 if len(self.callbacks) > 0:
                     index = 1 + max(self.callbacks.keys())
             self.callbacks[index] = (callback, kw)
+            if as_event:
+                if not self._event_callbacks:
+                    self._event_callbacks = set()
+                self._event_callbacks.add(index)
+            elif index in self._event_callbacks:
+                self._event_callbacks.discard(index)
 
         if with_ctrlvars and self.connected:
             self.get_ctrlvars()
@@ -874,11 +1444,14 @@ class PV():
         """remove a callback by index"""
         if index in self.callbacks:
             self.callbacks.pop(index)
+            if index in self._event_callbacks:
+                self._event_callbacks.discard(index)
             ca.poll()
 
     def clear_callbacks(self, with_access_callback=False, with_connect_callback=False):
         "clear all callbacks"
         self.callbacks.clear()
+        self._event_callbacks = _NO_EVENT_CALLBACKS
         if with_access_callback:
             self.access_callbacks = []
         if with_connect_callback:
@@ -978,7 +1551,16 @@ class PV():
 
     def __getval__(self):
         "get value"
-        return self._getarg('value')
+        return self._copy_view(self._getarg('value'))
+
+    def _copy_view(self, value):
+        """return a copy of `value` if it is a view into the monitor ring
+        buffer, whose slot will be overwritten by a later event"""
+        if (self._monitor_buffer is not None and
+                isinstance(value, ca.numpy.ndarray) and
+                not value.flags.owndata):
+            return value.copy()
+        return value
 
     def __setval__(self, val):
         "put-value"
@@ -989,8 +1571,10 @@ class PV():
     @property
     def char_value(self):
         "character string representation of value"
-        self._getarg('char_value')  # forces lookup of CTRL vars
-        return self._set_charval(self._getarg('value'))
+        if self._charval_stale:
+            self._getarg('char_value')  # forces lookup of CTRL vars
+            self._set_charval(self._getarg('value'))
+        return self._args['char_value']
 
     @property
     def status(self):
@@ -1183,12 +1767,19 @@ class PV():
         With deepclean=False, references to callbacks for connection and access-rights
         events will not be removed from the ca _cache for the current context.
         """
+        self._disconnect(deepclean=deepclean)
+        ca.poll(evt=1.e-3, iot=1.0)
+
+    def _disconnect(self, deepclean=True):
+        "the work of disconnect(), without polling CA"
         self.connected = False
 
         ctx = ca.current_context()
         pvid = (self.pvname, self.form, ctx)
-        if pvid in _PVcache_:
-            _PVcache_.pop(pvid)
+        with _pvcache_lock:
+            if _PVcache_.get(pvid, None) is self:
+                _PVcache_.pop(pvid)
+                _pvcache_used.pop(pvid, None)
 
         if deepclean:
             cache_item = ca._cache[ctx].get(self.pvname, None)
@@ -1210,14 +1801,14 @@ class PV():
         self._monref_mask = None
         self.clear_callbacks(True, True)
         self._args = {}.fromkeys(self._fields)
-        ca.poll(evt=1.e-3, iot=1.0)
+        self._charval_stale = True
 
     def __del__(self):
         if getattr(ca, 'libca', None) is None:
             return
 
         try:
-            self.disconnect()
+            self._disconnect()
         except:
             pass
 
@@ -0,0 +1,61 @@
+#!/usr/bin/env python
+"""
+measure latency and CPU use of ca.get() and ca.put(wait=True)
+while waiting for their completion callbacks.
+
+With preemptive callbacks (the default), waiting threads block on the
+completion event.  Run with 'nopreempt' to use a non-preemptive context,
+where waiting threads have to poll CA until the callback arrives:
+
+   python get_put_latency.py
+   python get_put_latency.py nopreempt
+
+Needs the test IOC from tests/Setup.
+"""
+import sys
+import time
+import threading
+import pvnames
+from epics import ca
+
+NGETS = 2000
+NPUTS = 500
+NTHREADS = 8
+
+if 'nopreempt' in sys.argv:
+    ca.PREEMPTIVE_CALLBACK = False
+
+def timed(label, func, count):
+    t0, c0 = time.perf_counter(), time.process_time()
+    for i in range(count):
+        func(i)
+    dt, dcpu = time.perf_counter() - t0, time.process_time() - c0
+    print("%-28s  %8.1f usec/call   %8.1f usec CPU/call" % (label,
+          1.e6*dt/count, 1.e6*dcpu/count))
+
+chid = ca.create_channel(pvnames.double_pv2, connect=True)
+ca.get(chid)
+
+timed('ca.get()', lambda i: ca.get(chid), NGETS)
+timed('ca.get(DBR_TIME)', lambda i: ca.get(chid, ftype=ca.dbr.TIME_DOUBLE),
+      NGETS)
+timed('ca.put(wait=True)', lambda i: ca.put(chid, 0.1*i, wait=True), NPUTS)
+
+# several threads waiting at once:
+# CPU time is where busy-polling shows up
+def worker():
+    ca.use_initial_context()
+    for i in range(NGETS//NTHREADS):
+        ca.get(chid)
+
+def threaded(i):
+    threads = [ca.CAThread(target=worker) for i in range(NTHREADS)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+if ca.PREEMPTIVE_CALLBACK:
+    timed('ca.get() in %d threads' % NTHREADS, threaded, 1)
+print("mode: %s callbacks" % ('preemptive' if ca.PREEMPTIVE_CALLBACK
+                              else 'non-preemptive'))
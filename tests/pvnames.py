@@ -58,6 +58,9 @@ updating_pvlist = ['PyTest:ao1', 'PyTest:ai1', 'PyTest:long1', 'PyTest:ao2']
 
 non_updating_pv = 'PyTest:ao4'
 
+#### a long PV that only the tests write to
+put_long_pv = 'PyTest:long4'
+
 alarm_pv = 'PyTest:long1'
 alarm_comp='ge'
 alarm_trippoint = 7
@@ -1,4 +1,5 @@
 coverage erase
+pytest test_aio.py
 pytest test_aodevice.py
 pytest test_ca_clearcache.py
 pytest test_ca_subscribe.py
@@ -6,6 +7,8 @@ pytest test_ca_typeconversion.py
 pytest test_ca_unittests.py
 pytest test_camonitor_func.py
 pytest test_cathread.py
+pytest test_dispatcher.py
+pytest test_fakeca.py
 pytest test_multiprocessing.py
 pytest test_pv_callback.py
 pytest test_pv_disconnect.py
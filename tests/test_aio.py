@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+# tests of the asyncio interface
+import asyncio
+import contextlib
+import numpy
+import pytest
+from epics import aio, ca, caget
+
+import pvnames
+
+def test_get():
+    async def main():
+        pv = aio.AsyncPV(pvnames.double_pv)
+        assert await pv.wait_for_connection()
+        value = await pv.get()
+        md = await pv.get_with_metadata(form='ctrl')
+        assert isinstance(value, float)
+        assert md['units'] == pvnames.double_pv_units
+        assert isinstance(await pv.get(as_string=True), str)
+    asyncio.run(main())
+
+def test_get_many():
+    async def main():
+        names = pvnames.double_arrays + pvnames.long_arrays + [pvnames.str_pv]
+        values = await asyncio.gather(*[aio.caget(name) for name in names])
+        for name, value in zip(names, values):
+            if name == pvnames.str_pv:
+                assert isinstance(value, str)
+            else:
+                assert isinstance(value, numpy.ndarray)
+                assert len(value) > 1
+    asyncio.run(main())
+
+def test_get_unconnected():
+    async def main():
+        pv = aio.AsyncPV('PyTest:NotARealPV')
+        return await pv.get(timeout=0.5)
+    assert asyncio.run(main()) is None
+
+def test_put_wait():
+    async def main():
+        pv = aio.AsyncPV(pvnames.put_long_pv)
+        results = []
+        for value in (15, 25):
+            results.append(await pv.put(value, wait=True))
+            assert await pv.get() == value
+        return results
+    assert asyncio.run(main()) == [1, 1]
+    assert caget(pvnames.put_long_pv, use_monitor=False) == 25
+
+def test_monitor():
+    async def main():
+        pv = aio.AsyncPV(pvnames.updating_pv1)
+        events = []
+        async with contextlib.aclosing(pv.monitor()) as stream:
+            async for event in stream:
+                events.append(event)
+                if len(events) == 3:
+                    break
+        return events
+    events = asyncio.run(asyncio.wait_for(main(), 30))
+    assert len(events) == 3
+    for event in events:
+        assert event['pvname'] == pvnames.updating_pv1
+        assert 'timestamp' in event
+
+def test_monitor_unconnected():
+    async def main():
+        pv = aio.AsyncPV('PyTest:NotARealPV')
+        async for event in pv.monitor(timeout=0.5):
+            pass
+    with pytest.raises(ca.ChannelAccessException):
+        asyncio.run(main())
@@ -101,6 +101,35 @@ def test_dbrName():
     assert dbr.Name('CTRL_ENUM', reverse=True) == dbr.CTRL_ENUM
     assert dbr.Name('TIME_LONG', reverse=True) == dbr.TIME_LONG
 
+def test_unpack_metadata():
+    write('Metadata decoding of TIME and CTRL structures')
+    val = dbr.time_double(status=3, severity=2, value=1.5)
+    val.stamp.secs, val.stamp.nsec = 1000, 123456789
+    md = ca._unpack_metadata(dbr.TIME_DOUBLE, val)
+    assert md == {'status': 3, 'severity': 2,
+                  'timestamp': dbr.make_unixtime(val.stamp),
+                  'posixseconds': 1000 + dbr.EPICS2UNIX_EPOCH,
+                  'nanoseconds': 123456789}
+
+    val = dbr.ctrl_double(status=1, severity=1, precision=4, units=b'mm',
+                          upper_ctrl_limit=10.0, lower_ctrl_limit=-10.0)
+    md = ca._unpack_metadata(dbr.CTRL_DOUBLE, val)
+    assert md['units'] == 'mm'
+    assert md['precision'] == 4
+    assert md['upper_ctrl_limit'] == 10.0
+    assert md['lower_ctrl_limit'] == -10.0
+    assert 'timestamp' not in md
+
+    val = dbr.ctrl_enum(status=0, severity=0, no_str=2)
+    val.strs[0].value, val.strs[1].value = b'Off', b'On'
+    md = ca._unpack_metadata(dbr.CTRL_ENUM, val)
+    assert md == {'status': 0, 'severity': 0, 'enum_strs': ('Off', 'On')}
+
+    val = dbr.ctrl_long(status=1, severity=2, units=b'counts')
+    md = ca._unpack_metadata(dbr.CTRL_LONG, val)
+    assert set(md) == set(dbr.ctrl_limits + ('status', 'severity', 'units'))
+    assert ca._unpack_metadata(dbr.DOUBLE, None) == {}
+
 def test_Connect1():
     chid = ca.create_channel(pvnames.double_pv)
     conn,dt,n = _ca_connect(chid, timeout=2)
@@ -140,6 +169,50 @@ def test_UnConnected():
     conn, dt, n = _ca_connect(chid, timeout=2)
     assert not conn
 
+def test_CreateChannels():
+    write('CA create_channels for a list of PVs, one of which fails to connect')
+    names = [pvnames.double_pv, pvnames.int_pv, pvnames.str_pv, pvnames.enum_pv,
+             'impossible_pvname_certain_to_fail']
+    result = ca.create_channels(names + names[:2], timeout=2.0)
+    assert sorted(result.connected) == sorted(names[:4])
+    assert result.timed_out == names[4:]
+    assert result.failed == {}
+    assert set(result.chids) == set(names)
+    for name in result.connected:
+        assert ca.isConnected(result.chids[name])
+        assert ca.name(result.chids[name]) == name
+        assert result.connect_times[name] <= result.elapsed
+    assert result.stats['connected'] == 4
+    # channels are shared with create_channel
+    assert ca.create_channel(names[0]).value == result.chids[names[0]].value
+
+def test_SyncGroupReader():
+    write('CA SyncGroupReader / SyncGroupWriter for a list of PVs')
+    names = [pvnames.double_pv, pvnames.long_pv, pvnames.str_pv,
+             pvnames.double_arr_pv, 'impossible_pvname_certain_to_fail']
+    reader = ca.SyncGroupReader(names, use_time=True, timeout=2.0)
+    values = reader.read()
+    assert list(values) == names
+    assert values[names[-1]] is None
+    for name in names[:4]:
+        assert values[name] is not None
+        assert reader.metadata[name]['timestamp'] > 0
+    assert values[pvnames.str_pv] == ca.get(reader.chids[pvnames.str_pv])
+    assert len(values[pvnames.double_arr_pv]) == 2048
+    record = reader.read_record()
+    assert numpy.isnan(record[names[-1]])
+    assert record[pvnames.str_pv] == values[pvnames.str_pv]
+
+    pvn = 'PyTest:long4'
+    writer = ca.SyncGroupWriter([pvn])
+    assert writer.write([5]) == {pvn: 1}
+    reader = ca.SyncGroupReader([pvn])
+    assert reader.read() == {pvn: 5}
+    assert writer.write({pvn: -5}) == {pvn: 1}
+    assert reader.read() == {pvn: -5}
+    writer.close()
+    reader.close()
+
 def test_putwait():
     'test put with wait'
     pvn = pvnames.non_updating_pv
@@ -151,6 +224,43 @@ def test_putwait():
     ca.put(chid, 2, wait=True)
     assert ca.get(chid) == 2
 
+def test_put_many():
+    write('CA put_many to a list of channels, waiting for completion')
+    names = ['PyTest:long3', pvnames.enum_pv,
+             'impossible_pvname_certain_to_fail']
+    chids = ca.create_channels(names, timeout=2.0).chids
+    chids = [chids[name] for name in names]
+    result = ca.put_many(chids, [3, 'Start', 1], timeout=5.0)
+    assert result.status == [1, 1, -1]
+    assert result.latency[0] > 0 and result.latency[1] > 0
+    assert result.latency[2] is None
+    assert ca.get(chids[0]) == 3
+    assert ca.get(chids[1]) == pvnames.enum_pv_strs.index('Start')
+    result = ca.put_many(chids, [4, 0, 1], wait=False)
+    assert result.status == [1, 1, -1]
+    time.sleep(0.1)
+    assert ca.get(chids[1]) == 0
+    assert ca._put_completes == []
+
+def test_value_cache():
+    write('CA get with the value cache')
+    chid = ca.create_channel('PyTest:long3', connect=True)
+    ca.put(chid, 11, wait=True)
+    ca.enable_value_cache(chid)
+    time.sleep(0.1)
+    entry = ca._chid_cache[chid.value]
+    assert entry.value_cache.latest[0][1][0] == 11
+    assert ca.get(chid) == 11
+    ca.put(chid, 12, wait=True)
+    time.sleep(0.1)
+    assert ca.get(chid) == 12
+    info = ca.get_with_metadata(chid, ftype=ca.promote_type(chid, use_time=True))
+    assert info['value'] == 12
+    assert info['timestamp'] > 0
+    ca.disable_value_cache(chid)
+    assert entry.value_cache is None
+    assert ca.get(chid) == 12
+
 def test_promote_type():
     pvn = pvnames.double_pv
     chid = ca.create_channel(pvn,connect=True)
@@ -207,6 +317,89 @@ def test_subscription_custom():
     time.sleep(0.2)
     assert change_count > 2
 
+def test_cache_item_compact():
+    write('Cache items create containers and counters when used')
+    collect = ca.COLLECT_STATS
+    ca.COLLECT_STATS = False
+    try:
+        chid = ca.create_channel(pvnames.subarr4, connect=True)
+        entry = ca._get_cache_by_chid(ca._chid_to_int(chid))
+        assert entry.stats is None
+        assert ca.channel_stats(chid)['gets'] == 0
+        assert entry.stats is None
+    finally:
+        ca.COLLECT_STATS = collect
+    assert not hasattr(entry, '__dict__')
+    assert entry.lock is not ca.get_cache(pvnames.double_pv).lock
+    assert entry._access_event_callback is None
+    ca.get(chid)
+    assert entry._get_results is not None
+    hist = ca.DurationHistogram()
+    assert hist.count == 0 and hist.percentile(50) is None
+    hist.add(0.002)
+    assert hist.count == 1 and hist.percentile(50) == 3.e-3
+
+def test_connection_event_before_chid_cache():
+    write('Connection events are found by handle before the chid is cached')
+    conns = []
+    def onConn(pvname=None, chid=None, conn=None, **kws):
+        conns.append((pvname, chid, conn))
+
+    chid = ca.create_channel(pvnames.double_pv2, connect=True, callback=onConn)
+    chid_int = ca._chid_to_int(chid)
+    entry = ca._chid_cache.pop(chid_int)
+    try:
+        assert ca._handle_cache[entry.handle] is entry
+        ca._onConnectionEvent(dbr.connection_args(chid=chid_int,
+                                                  op=dbr.OP_CONN_UP))
+    finally:
+        ca._chid_cache[chid_int] = entry
+    assert conns[-1] == (pvnames.double_pv2, chid_int, True)
+    assert entry.chid_int == chid_int
+
+def test_channel_stats():
+    pvn = pvnames.updating_pv1
+    chid = ca.create_channel(pvn, connect=True)
+    before = ca.channel_stats(chid)
+    nevents = [0]
+    def my_callback(**kws):
+        nevents[0] += 1
+
+    cb, uarg, eventID = ca.create_subscription(chid, callback=my_callback)
+    time.sleep(2.0)
+    ca.clear_subscription(eventID)
+    ca.get(chid)
+    after = ca.channel_stats(chid)
+    assert after['events'] - before['events'] >= nevents[0] > 2
+    assert after['bytes'] > before['bytes']
+    assert after['last_event_age'] < 2.0
+    assert after['gets'] == before['gets'] + 1
+    assert after['callback_time']['count'] >= nevents[0]
+    assert after['get_latency']['mean'] > 0
+
+    pchid = ca.create_channel(pvnames.non_updating_pv, connect=True)
+    ca.put(pchid, 1.0, wait=True)
+    assert ca.channel_stats(pchid)['put_latency']['count'] >= 1
+
+    snap = ca.stats()
+    assert snap['pvs'][pvn]['events'] == after['events']
+    assert snap['events'] >= after['events']
+    assert snap['connected'] <= snap['channels']
+    assert pvn in ca.show_stats(print_out=False)
+    assert ca.channel_stats(ca.dbr.chid_t(0)) is None
+
+def test_stats_dump():
+    chid = ca.create_channel(pvnames.double_pv, connect=True)
+    dumps = []
+    ca.start_stats_dump(interval=0.2, writer=dumps.append)
+    time.sleep(0.7)
+    ca.stop_stats_dump()
+    time.sleep(0.3)
+    ndumps = len(dumps)
+    time.sleep(0.3)
+    assert len(dumps) == ndumps >= 2
+    assert pvnames.double_pv in dumps[0]
+
 def test_subscription_str():
     pvn = pvnames.updating_str1
     write(" Subscription on string: %s " % pvn)
@@ -396,6 +589,27 @@ def test_xArray2():
     assert isinstance(out2, numpy.ndarray)
     assert len(out2) == npts
 
+def test_put_numpy_buffer():
+    write('Array Test: put numpy arrays and memoryviews to array channels')
+    chid = ca.create_channel(pvnames.double_arrays[0], connect=True)
+    maxpts = ca.element_count(chid)
+    dat = numpy.random.normal(size=maxpts)
+    data = ca._as_put_array(dat, dbr.DOUBLE, maxpts)
+    assert ctypes.addressof(data) == dat.ctypes.data
+    ca.put(chid, dat, wait=True)
+    assert (ca.get(chid) == dat).all()
+    # cast to the channel type, only using the first maxpts values
+    dat = numpy.arange(2*maxpts, dtype=numpy.float32)
+    ca.put(chid, dat, wait=True)
+    assert (ca.get(chid) == dat[:maxpts]).all()
+    ca.put(chid, memoryview(numpy.ones(maxpts)), wait=True)
+    assert (ca.get(chid) == 1.0).all()
+
+    chid = ca.create_channel(pvnames.long_arrays[0], connect=True)
+    dat = numpy.arange(ca.element_count(chid), dtype=numpy.int16)
+    ca.put(chid, dat, wait=True)
+    assert (ca.get(chid) == dat).all()
+
 def test_xArray3():
     write('Array Test: get char array as string')
     chid = ca.create_channel(pvnames.char_arrays[0])
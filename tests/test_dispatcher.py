@@ -0,0 +1,83 @@
+#!/usr/bin/env python
+# tests of the callback dispatcher
+import time
+import threading
+import pytest
+from epics import PV
+from epics.dispatcher import CallbackDispatcher
+
+import pvnames
+
+def test_order_per_key():
+    dispatcher = CallbackDispatcher(workers=4, maxsize=1000)
+    results = {'a': [], 'b': [], 'c': []}
+    def work(key, i):
+        time.sleep(0.0005)
+        results[key].append(i)
+
+    for i in range(200):
+        for key in results:
+            dispatcher.submit(key, work, key, i)
+    dispatcher.stop()
+    for key, values in results.items():
+        assert values == list(range(200))
+    stats = dispatcher.stats()
+    assert stats['submitted'] == stats['delivered'] == 600
+    assert stats['queued'] == 0
+
+@pytest.mark.parametrize('policy', ['drop-oldest', 'coalesce', 'block'])
+def test_policies(policy):
+    dispatcher = CallbackDispatcher(workers=1, maxsize=5, policy=policy)
+    gate = threading.Event()
+    values = []
+    def work(i):
+        gate.wait()
+        values.append(i)
+
+    dispatcher.submit('pv', work, -1)
+    time.sleep(0.05)
+    if policy == 'block':
+        threading.Timer(0.2, gate.set).start()
+    for i in range(20):
+        dispatcher.submit('pv', work, i)
+    if policy != 'block':
+        assert dispatcher.depths() == {'pv': 5}
+    gate.set()
+    dispatcher.stop()
+
+    stats = dispatcher.stats()
+    if policy == 'drop-oldest':
+        assert values == [-1, 15, 16, 17, 18, 19]
+        assert stats['dropped'] == 15
+    elif policy == 'coalesce':
+        assert values == [-1, 0, 1, 2, 3, 19]
+        assert stats['coalesced'] == 15
+    else:
+        assert values == [-1] + list(range(20))
+        assert stats['blocked'] > 0
+    assert stats['max_depth'] == 5
+
+def test_bad_policy():
+    with pytest.raises(ValueError):
+        CallbackDispatcher(policy='drop-newest')
+
+def test_pv_dispatcher():
+    dispatcher = CallbackDispatcher(workers=2, maxsize=50)
+    ca_thread = threading.current_thread()
+    events = []
+    def onChanges(pvname=None, value=None, **kws):
+        events.append((threading.current_thread().name, value))
+        time.sleep(0.01)
+
+    mypv = PV(pvnames.updating_pv1, callback=onChanges, dispatcher=dispatcher)
+    assert mypv.wait_for_connection()
+    t0 = time.time()
+    while len(events) < 5 and time.time() - t0 < 10:
+        time.sleep(0.05)
+    mypv.disconnect()
+    dispatcher.stop()
+    assert len(events) >= 5
+    for name, value in events:
+        assert name != ca_thread.name
+        assert name.startswith('pyepics-dispatcher')
+        assert isinstance(value, float)
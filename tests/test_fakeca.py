@@ -0,0 +1,636 @@
+#!/usr/bin/env python
+# tests of PV, Device and Motor with the fake CA backend (no IOC needed)
+import time
+import ctypes
+import asyncio
+import numpy
+import pytest
+from epics import ca, fakeca, aio, PV, Device, Motor, caget, caput, get_pv, get_pvs
+from epics import pv as pvmod
+from epics.devices.ad_image import AD_ImageReader
+
+server = fakeca.FakeCA()
+
+@pytest.fixture(scope='module', autouse=True)
+def fake_backend():
+    if ca.libca is not None and ca.libca is not server:
+        pytest.skip('Channel Access already initialized with libca')
+    if ca.libca is None:
+        fakeca.install(server)
+    yield server
+
+def test_get_types():
+    server.add_channel('Fake:ao1', value=1.5)
+    server.add_channel('Fake:long1', value=3)
+    server.add_channel('Fake:str1', value='hello')
+    server.add_channel('Fake:bo1', value=1, enum_strs=['Off', 'On'])
+    server.add_channel('Fake:wave1', value=numpy.arange(10.0))
+    server.add_channel('Fake:char1', value='abc', ftype='char', count=64)
+    assert caget('Fake:ao1') == 1.5
+    assert caget('Fake:long1') == 3
+    assert caget('Fake:str1') == 'hello'
+    assert caget('Fake:bo1') == 1
+    assert caget('Fake:bo1', as_string=True) == 'On'
+    assert (caget('Fake:wave1') == numpy.arange(10.0)).all()
+    assert caget('Fake:char1', as_string=True) == 'abc'
+
+def test_ctrl_metadata():
+    server.add_channel('Fake:ao2', value=2.0, units='mm', precision=3,
+                       limits={'upper_ctrl_limit': 10, 'lower_ctrl_limit': -10})
+    pv = PV('Fake:ao2', form='ctrl')
+    assert pv.wait_for_connection()
+    assert pv.get() == 2.0
+    assert pv.units == 'mm'
+    assert pv.precision == 3
+    assert pv.upper_ctrl_limit == 10
+    assert pv.lower_ctrl_limit == -10
+    assert pv.char_value == '2.000'
+    assert pv.host == 'fakeioc:5064'
+
+def test_put():
+    chan = server.add_channel('Fake:ao3', value=0.0)
+    assert caput('Fake:ao3', 2.5, wait=True) == 1
+    assert chan.value == 2.5
+    assert chan.nputs == 1
+    caput('Fake:ao3', '7.5', wait=True)
+    assert caget('Fake:ao3') == 7.5
+    enum = server.add_channel('Fake:bo3', value=0, enum_strs=['Off', 'On'])
+    caput('Fake:bo3', 'On', wait=True)
+    assert enum.value == 1
+
+def test_put_callback_delay():
+    chan = server.add_channel('Fake:ao4', value=0.0)
+    chan.put_delay = 0.5
+    pv = PV('Fake:ao4')
+    pv.wait_for_connection()
+    t0 = time.time()
+    pv.put(1.0, wait=True)
+    assert time.time() - t0 > 0.45
+    assert chan.value == 1.0
+
+def test_monitor_events():
+    chan = server.add_channel('Fake:ao5', value=0.0)
+    values = []
+    def onChanges(value=None, **kws):
+        values.append(value)
+
+    pv = PV('Fake:ao5', auto_monitor=True, callback=onChanges)
+    assert pv.wait_for_connection()
+    assert server.wait_for_events()
+    values.clear()
+    for i in range(1000):
+        chan.set_value(i)
+    assert server.wait_for_events()
+    assert values == list(range(1000))
+    assert pv.get() == 999
+
+def test_alarms():
+    chan = server.add_channel('Fake:ao6', value=0.0)
+    events = []
+    def onChanges(severity=None, **kws):
+        events.append(severity)
+
+    pv = PV('Fake:ao6', form='time', callback=onChanges)
+    pv.wait_for_connection()
+    assert server.wait_for_events()
+    chan.set_alarm(severity=2, status=3)
+    assert server.wait_for_events()
+    assert events[-1] == 2
+    assert pv.severity == 2
+    assert pv.status == 3
+
+def test_rate():
+    chan = server.add_channel('Fake:ramp', value=0.0, rate=200)
+    nevents = [0]
+    def onChanges(**kws):
+        nevents[0] += 1
+
+    pv = PV('Fake:ramp', callback=onChanges)
+    pv.wait_for_connection()
+    time.sleep(1.0)
+    server.set_rate(chan, None)
+    assert server.wait_for_events()
+    assert 100 < nevents[0] < 300
+    assert pv.get() == chan.value
+
+def test_step_update():
+    chan = server.add_channel('Fake:wave2', value=numpy.zeros(100),
+                              update=lambda n: numpy.arange(100.0)*n)
+    pv = PV('Fake:wave2')
+    pv.wait_for_connection()
+    chan.step(3)
+    assert server.wait_for_events()
+    assert (pv.get() == numpy.arange(100.0)*3).all()
+    assert chan.nupdates == 3
+
+def test_connection_callbacks():
+    chan = server.add_channel('Fake:ao7', value=1.0)
+    conns = []
+    def onConnect(conn=None, **kws):
+        conns.append(conn)
+
+    pv = PV('Fake:ao7', connection_callback=onConnect)
+    assert pv.wait_for_connection()
+    chan.disconnect()
+    assert server.wait_for_events()
+    assert not pv.connected
+    chan.set_value(5.0)
+    chan.connect()
+    assert server.wait_for_events()
+    assert pv.connected
+    assert pv.get() == 5.0
+    assert conns == [True, False, True]
+
+def test_late_channel():
+    pv = PV('Fake:late')
+    assert not pv.wait_for_connection(timeout=0.2)
+    server.add_channel('Fake:late', value=4.0)
+    assert pv.wait_for_connection(timeout=1.0)
+    assert pv.get() == 4.0
+
+def test_get_pvs():
+    server.add_channel('Fake:bulk1', value=1.0)
+    chan = server.add_channel('Fake:bulk2', value=2)
+    names = ['Fake:bulk1', 'Fake:bulk2', 'Fake:bulklate']
+    pvs, report = get_pvs(names, timeout=0.5)
+    assert sorted(report.connected) == names[:2]
+    assert report.timed_out == ['Fake:bulklate']
+    assert pvs['Fake:bulk1']._monref is not None
+    assert pvs['Fake:bulk2']._monref is not None
+    assert pvs['Fake:bulk1'].get() == 1.0
+    chan.set_value(5)
+    assert server.wait_for_events()
+    assert pvs['Fake:bulk2'].value == 5
+
+    # a PV connecting after the timeout creates its monitor as usual
+    late = pvs['Fake:bulklate']
+    server.add_channel('Fake:bulklate', value=4.0)
+    assert late.wait_for_connection(timeout=1.0)
+    assert server.wait_for_events()
+    assert late._monref is not None
+    assert late.get() == 4.0
+
+def test_pvcache_limits():
+    names = ['Fake:lru%d' % i for i in range(6)]
+    for name in names:
+        server.add_channel(name, value=1.0)
+    pvmod.clear_pvcache()
+    stats0 = pvmod.pvcache_stats()
+    try:
+        pvmod.PVCACHE_MAXSIZE = 3
+        # a PV with a user callback is never removed
+        withcb = get_pv(names[0], callback=lambda **kws: None)
+        # a channel also created outside the cache is not cleared
+        chid = ca.create_channel(names[2], connect=True)
+        for name in names[1:]:
+            assert caget(name) == 1.0
+        stats = pvmod.pvcache_stats()
+        assert stats['size'] == 3
+        assert stats['misses'] - stats0['misses'] == 6
+        assert stats['evictions'] - stats0['evictions'] == 3
+        assert {pvid[0] for pvid in pvmod._PVcache_} == {names[0], names[4],
+                                                          names[5]}
+        context = ca.current_context()
+        assert names[1] not in ca._cache[context]
+        assert names[5] in ca._cache[context]
+        assert ca.get(chid) == 1.0
+        assert ca._cache[context][names[5]].pvcache_owned
+        chid = ca.create_channel(names[5])
+        assert not ca._cache[context][names[5]].pvcache_owned
+
+        assert caget(names[4]) == 1.0
+        assert pvmod.pvcache_stats()['hits'] - stats0['hits'] == 1
+
+        pvmod.PVCACHE_MAXSIZE = None
+        pvmod.PVCACHE_IDLE_TIME = 0.05
+        time.sleep(0.1)
+        assert pvmod.reap_pvcache() == 2
+        assert {pvid[0] for pvid in pvmod._PVcache_} == {names[0]}
+        assert withcb.connected
+        assert names[4] not in ca._cache[context]
+        assert ca.get(chid) == 1.0
+        assert caget(names[5]) == 1.0
+    finally:
+        pvmod.PVCACHE_MAXSIZE = None
+        pvmod.PVCACHE_IDLE_TIME = None
+
+def test_pvcache_keeps_held_pvs():
+    names = ['Fake:held%d' % i for i in range(5)]
+    for name in names:
+        server.add_channel(name, value=2.0)
+    server.add_channel('Fake:dev3.VAL', value=4.0)
+    pvmod.clear_pvcache()
+    try:
+        pvmod.PVCACHE_MAXSIZE = 3
+        dev = Device('Fake:dev3', delim='.', attrs=('VAL',))
+        held = get_pv(names[0], connect=True)
+        for name in names[1:]:
+            assert caget(name) == 2.0
+        assert pvmod.pvcache_stats()['size'] == 3
+        assert dev.get('VAL') == 4.0
+        assert ca._chid_to_int(dev.PV('VAL').chid) in ca._chid_cache
+        assert held.get() == 2.0
+        assert held.connected
+    finally:
+        pvmod.PVCACHE_MAXSIZE = None
+
+def test_run_callbacks_char_value():
+    chan = server.add_channel('Fake:cvrun', value=1.0, precision=2)
+    pv = PV('Fake:cvrun', form='ctrl', auto_monitor=True)
+    events = []
+    pv.add_callback(lambda event: events.append(event.value), as_event=True)
+    assert pv.wait_for_connection()
+    chan.set_value(2.5)
+    assert server.wait_for_events()
+    time.sleep(0.05)
+    assert events[-1] == 2.5
+    seen = []
+    pv.add_callback(lambda char_value=None, **kws: seen.append(char_value))
+    pv.run_callbacks()
+    assert seen == ['2.50']
+
+def test_access_rights():
+    chan = server.add_channel('Fake:ao8', value=1.0)
+    pv = PV('Fake:ao8')
+    pv.wait_for_connection()
+    assert pv.write_access
+    chan.set_access(read_access=True, write_access=False)
+    assert server.wait_for_events()
+    assert not pv.write_access
+    with pytest.raises(ca.CASeverityException):
+        ca.put(pv.chid, 2.0)
+
+def test_sync_group():
+    server.add_channel('Fake:long2', value=1)
+    server.add_channel('Fake:long3', value=2)
+    chids = [ca.create_channel(name, connect=True)
+             for name in ('Fake:long2', 'Fake:long3')]
+    gid = ca.sg_create()
+    for chid, val in zip(chids, (10, 20)):
+        ca.sg_put(gid, chid, val)
+    ca.sg_block(gid)
+    assert [ca.get(chid) for chid in chids] == [10, 20]
+    ca.sg_delete(gid)
+
+def test_sync_group_reader():
+    server.add_channel('Fake:sgao', value=1.5)
+    server.add_channel('Fake:sgwave', value=numpy.arange(4.0))
+    names = ['Fake:sgao', 'Fake:sgwave', 'Fake:sglong']
+    reader = ca.SyncGroupReader(names, timeout=0.2)
+    values = reader.read()
+    assert values['Fake:sgao'] == 1.5
+    assert (values['Fake:sgwave'] == numpy.arange(4.0)).all()
+    assert values['Fake:sglong'] is None
+    # a channel connecting later is read in the next cycle
+    server.add_channel('Fake:sglong', value=3)
+    assert server.wait_for_events()
+    assert reader.read()['Fake:sglong'] == 3
+    writer = ca.SyncGroupWriter(names)
+    assert writer.write([2.5, [4, 3, 2, 1], 9]) == dict.fromkeys(names, 1)
+    values = reader.read()
+    assert values['Fake:sgao'] == 2.5
+    assert values['Fake:sglong'] == 9
+    assert (values['Fake:sgwave'] == numpy.arange(4.0)[::-1] + 1).all()
+    nputs = server.stats['puts']
+    writer.write({'Fake:sgao': 3.5})
+    assert server.stats['puts'] == nputs + 1
+    writer.close()
+    reader.close()
+
+def test_sync_group_writer_bad_value():
+    server.add_channel('Fake:sgbad1', value=1.0)
+    server.add_channel('Fake:sgbad2', value=2.0)
+    names = ['Fake:sgbad1', 'Fake:sgbad2']
+    writer = ca.SyncGroupWriter(names)
+    with pytest.raises(ValueError):
+        writer.write([5.0, 'not a number'])
+    nputs = server.stats['puts']
+    assert writer.write([3.0, 4.0]) == dict.fromkeys(names, 1)
+    assert server.stats['puts'] == nputs + 2
+    assert [caget(name) for name in names] == [3.0, 4.0]
+    writer.close()
+
+def test_sync_group_reader_short_array():
+    server.add_channel('Fake:sgw2', value=numpy.arange(2.0))
+    server.add_channel('Fake:sgs2', value=['a', 'bc'], ftype='string')
+    reader = ca.SyncGroupReader(['Fake:sgw2', 'Fake:sgs2'])
+    values = reader.read()
+    assert (values['Fake:sgw2'] == numpy.arange(2.0)).all()
+    assert values['Fake:sgs2'] == ['a', 'bc']
+    reader.close()
+    reader = ca.SyncGroupReader(['Fake:sgw2'], as_numpy=False)
+    assert reader.read()['Fake:sgw2'] == [0.0, 1.0]
+    reader.close()
+
+def test_put_numpy_buffer():
+    chan = server.add_channel('Fake:npwave', value=numpy.zeros(1000))
+    chid = ca.create_channel('Fake:npwave', connect=True)
+    ca.put(chid, numpy.arange(1000.0), wait=True)
+    assert (chan.value == numpy.arange(1000.0)).all()
+    ca.put(chid, numpy.arange(1000, dtype=numpy.int32)[::-1], wait=True)
+    assert (chan.value == numpy.arange(1000.0)[::-1]).all()
+    image = numpy.arange(1.0, 13.0).reshape(3, 4)
+    assert ca.put(chid, image, wait=True) == 1
+    assert (chan.value[:12] == numpy.arange(1.0, 13.0)).all()
+    ca.put(chid, memoryview(image.T.copy()), wait=True)
+    assert (chan.value[:12] == image.T.reshape(-1)).all()
+    chan = server.add_channel('Fake:npwavel', value=numpy.zeros(8, dtype='i4'))
+    chid = ca.create_channel('Fake:npwavel', connect=True)
+    ca.put(chid, numpy.linspace(0, 3.5, 8), wait=True)
+    assert list(chan.value) == [0, 0, 1, 1, 2, 2, 3, 3]
+    ca.put(chid, [7.5, 6.0, 5.2], wait=True)
+    assert list(chan.value[:3]) == [7, 6, 5]
+    gid = ca.sg_create()
+    ca.sg_put(gid, chid, numpy.arange(8, dtype=numpy.int32))
+    ca.sg_block(gid)
+    assert (chan.value == numpy.arange(8)).all()
+    ca.sg_delete(gid)
+
+def test_monitor_ring_buffer_values():
+    chan = server.add_channel('Fake:ringscalar', value=5.0)
+    scalar = PV('Fake:ringscalar', auto_monitor=True, buffer=3)
+    assert scalar.wait_for_connection()
+    assert server.wait_for_events()
+    assert scalar.get() == 5.0
+    assert not isinstance(scalar.get(), numpy.ndarray)
+    scalar.disconnect()
+
+    chan = server.add_channel('Fake:ringwave2', value=numpy.arange(4.0))
+    ring = ca.MonitorRingBuffer(nslots=3)
+    seqs = []
+    def onChanges(value=None, slot_seq=None, **kws):
+        seqs.append(slot_seq)
+
+    pv = PV('Fake:ringwave2', auto_monitor=True, buffer=ring,
+            callback=onChanges)
+    assert pv.wait_for_connection()
+    assert server.wait_for_events()
+    value = pv.get()
+    assert value.flags.writeable
+    assert not numpy.shares_memory(value, ring.get(seqs[-1]))
+    for i in range(3):
+        chan.set_value(numpy.arange(4.0)*(i+2))
+        assert server.wait_for_events()
+    numpy.testing.assert_array_equal(value, numpy.arange(4.0))
+    numpy.testing.assert_array_equal(pv.value, numpy.arange(4.0)*4)
+    pv.disconnect()
+
+    # enlarging the slots invalidates the earlier ones
+    ring = ca.MonitorRingBuffer(nslots=3)
+    _, seq0 = ring.write((4*ctypes.c_double)(*range(4)), 4, ca.dbr.DOUBLE)
+    view, seq1 = ring.write((8*ctypes.c_double)(*range(8)), 8, ca.dbr.DOUBLE)
+    assert not ring.is_valid(seq0)
+    assert ring.get(seq0) is None
+    assert ring.get(seq1) is view
+
+def test_monitor_into_array():
+    chan = server.add_channel('Fake:ringwave', value=numpy.arange(16.0))
+    out = numpy.zeros(8, dtype='int32')
+    values = []
+    def onChanges(value=None, **kws):
+        values.append(value)
+
+    pv = PV('Fake:ringwave', auto_monitor=True, buffer=out, callback=onChanges)
+    assert pv.wait_for_connection()
+    assert server.wait_for_events()
+    chan.set_value(numpy.arange(16.0)*2)
+    assert server.wait_for_events()
+    assert len(values) >= 2
+    assert numpy.shares_memory(values[-1], out)
+    numpy.testing.assert_array_equal(out, numpy.arange(8)*2)
+    with pytest.raises(ValueError):
+        ca.MonitorRingBuffer(out=numpy.zeros((2, 2, 2)))
+    with pytest.raises(ValueError):
+        ca.subarray_name('Fake:ringwave', 4, 2)
+    pv.disconnect()
+
+def test_put_descriptor():
+    chan = server.add_channel('Fake:retype', value=0.0)
+    chid = ca.create_channel('Fake:retype', connect=True)
+    assert server.wait_for_events()
+    ca.put(chid, 1.5, wait=True)
+    desc = ca._chid_cache[ca._chid_to_int(chid)].put_desc
+    assert desc.ftype == ca.dbr.DOUBLE
+    ca.put(chid, 2.5, wait=True)
+    ca.put(chid, '3.5', wait=True)
+    assert chan.value == 3.5
+    assert ca._chid_cache[ca._chid_to_int(chid)].put_desc is desc
+    assert not desc.lock.locked()
+    # restarting the IOC with another record type drops the descriptor
+    server.remove_channel('Fake:retype')
+    assert server.wait_for_events()
+    chan = server.add_channel('Fake:retype', value=0, ftype='long')
+    assert server.wait_for_events()
+    assert ca.isConnected(chid)
+    ca.put(chid, 7, wait=True)
+    desc = ca._chid_cache[ca._chid_to_int(chid)].put_desc
+    assert desc.ftype == ca.dbr.LONG
+    assert chan.value == 7
+
+def test_channel_info_cache():
+    chan = server.add_channel('Fake:info', value=numpy.zeros(5))
+    chid = ca.create_channel('Fake:info', connect=True)
+    ca.replace_access_rights_event(chid)
+    assert server.wait_for_events()
+    entry = ca._chid_cache[chid.value]
+    assert (entry.ftype, entry.count, entry.access) == (ca.dbr.DOUBLE, 5, 3)
+    assert ca.field_type(chid) == ca.dbr.DOUBLE
+    assert ca.element_count(chid) == 5
+    assert ca.host_name(chid) == 'fakeioc:5064'
+    assert entry.host == 'fakeioc:5064'
+    chan.set_access(read_access=True, write_access=False)
+    assert server.wait_for_events()
+    assert (ca.read_access(chid), ca.write_access(chid)) == (1, 0)
+    chan.disconnect()
+    assert server.wait_for_events()
+    assert (entry.ftype, entry.count, entry.access) == (None, None, None)
+    assert ca.element_count(chid) == 0
+    assert ca.write_access(chid) == 0
+    chan.set_access(read_access=True, write_access=True)
+    chan.connect()
+    assert server.wait_for_events()
+    assert ca.element_count(chid) == 5
+    assert ca.write_access(chid) == 1
+
+def test_create_channels_failure(monkeypatch):
+    server.add_channel('Fake:created', value=1.0)
+    create = server.ca_create_channel
+    def failing_create(name, *args):
+        if b'Fake:refused' in bytes(name.value):
+            return ca.dbr.ECA_BADCHID
+        return create(name, *args)
+
+    monkeypatch.setattr(server, 'ca_create_channel', failing_create)
+    nhandles = len(ca._handle_cache)
+    result = ca.create_channels(['Fake:created', 'Fake:refused'], timeout=1)
+    assert list(result.failed) == ['Fake:refused']
+    assert result.connected == ['Fake:created']
+    assert len(ca._handle_cache) == nhandles + 1
+    assert 'Fake:refused' not in ca._cache[ca.current_context()]
+
+def test_value_cache():
+    chan = server.add_channel('Fake:cached', value=1.5)
+    chid = ca.create_channel('Fake:cached', connect=True)
+    ca.enable_value_cache(chid)
+    assert server.wait_for_events()
+    ngets = server.stats['gets']
+    assert ca.get(chid) == 1.5
+    chan.set_value(2.5)
+    assert server.wait_for_events()
+    assert ca.get(chid) == 2.5
+    tftype = ca.promote_type(chid, use_time=True)
+    assert ca.get_with_metadata(chid, ftype=tftype)['value'] == 2.5
+    assert server.stats['gets'] == ngets
+    # a stale value is read from the server
+    ca.enable_value_cache(chid, max_age=0.05)
+    time.sleep(0.1)
+    assert ca.get(chid) == 2.5
+    assert server.stats['gets'] == ngets + 1
+    ca.enable_value_cache(chid)
+    # and so is the value of a disconnected channel
+    chan.disconnect()
+    assert server.wait_for_events()
+    assert ca._chid_cache[chid.value].value_cache.latest is None
+    chan.connect()
+    assert server.wait_for_events()
+    assert ca.get(chid) == 2.5
+    assert server.stats['gets'] == ngets + 1
+    ca.disable_value_cache(chid)
+    assert ca.get(chid) == 2.5
+    assert server.stats['gets'] == ngets + 2
+
+def test_aio_get_counts():
+    server.add_channel('Fake:aiowave', value=numpy.arange(20.0))
+    async def main():
+        pv = aio.AsyncPV('Fake:aiowave')
+        assert await pv.wait_for_connection()
+        return await asyncio.gather(pv.get(count=2), pv.get(), pv.get(count=5))
+
+    # with a latency, the gets are all issued while the first is pending
+    server.latency = 0.05
+    try:
+        short, full, five = asyncio.run(main())
+    finally:
+        server.latency = 0.0
+    assert len(short) == 2
+    assert len(full) == 20
+    assert len(five) == 5
+
+def test_device():
+    server.add_record('Fake:dev1', {'VAL': 1.0, 'DESC': 'fake device',
+                                    'EGU': 'mm'}, rtype='ao')
+    dev = Device('Fake:dev1', delim='.', attrs=('VAL', 'DESC', 'EGU', 'RTYP'))
+    assert dev.get('DESC') == 'fake device'
+    assert dev.get('RTYP') == 'ao'
+    dev.put('VAL', 3.0, wait=True)
+    assert dev.get('VAL') == 3.0
+    assert caget('Fake:dev1') == 3.0
+
+def test_ad_image_reader():
+    prefix = 'Fake:image1:'
+    width, height = 6, 4
+    data = server.add_channel(prefix + 'ArrayData', ftype='char',
+                              value=numpy.zeros(64, dtype='uint8'))
+    uid = server.add_channel(prefix + 'UniqueId_RBV', value=1)
+    # the plugin posts both with the timestamp of the NDArray
+    data.timestamp = uid.timestamp = 1.7e9 + 1
+    for attr, value in (('NDimensions_RBV', 2), ('ArraySize0_RBV', width),
+                        ('ArraySize1_RBV', height), ('ArraySize2_RBV', 0),
+                        ('ColorMode_RBV', 0)):
+        server.add_channel(prefix + attr, value=value)
+
+    def send(unique_id, with_data=True, with_id=True):
+        timestamp = 1.7e9 + unique_id
+        if with_data:
+            data.set_value(numpy.arange(width*height, dtype='uint8')
+                           + unique_id, timestamp=timestamp)
+        if with_id:
+            uid.set_value(unique_id, timestamp=timestamp)
+
+    reader = AD_ImageReader(prefix, nframes=3)
+    assert reader.wait_for_connection()
+    assert server.wait_for_events()
+    frame = reader.read(timeout=1.0)
+    assert frame.unique_id == 1
+    assert frame.data.shape == (64,)
+
+    send(2)
+    send(5)
+    assert server.wait_for_events()
+    frame = reader.read(timeout=1.0)
+    assert frame.unique_id == 2
+    assert frame.data.shape == (height, width)
+    assert not frame.data.flags.writeable
+    assert numpy.shares_memory(frame.data, reader.ring._slots)
+    numpy.testing.assert_array_equal(frame.data.ravel(),
+                                     numpy.arange(width*height) + 2)
+    frame = reader.read(timeout=1.0)
+    assert (frame.unique_id, frame.dropped) == (5, 2)
+    assert reader.read(timeout=0.05) is None
+
+    # a slow reader loses the oldest frames of the pool
+    for unique_id in range(6, 10):
+        send(unique_id)
+    assert server.wait_for_events()
+    assert [f.unique_id for f in reader.frames(timeout=0.05)] == [8, 9]
+    assert reader.stats['overwritten'] == 2
+    assert reader.stats['dropped'] == 2
+    assert reader.stats['unmatched'] == 0
+
+    # events without a partner of the same timestamp are dropped
+    send(10, with_id=False)
+    send(11)
+    send(12, with_data=False)
+    send(13)
+    assert server.wait_for_events()
+    frames = list(reader.frames(timeout=0.05))
+    assert [(f.unique_id, f.dropped) for f in frames] == [(11, 1), (13, 1)]
+    numpy.testing.assert_array_equal(frames[1].data.ravel(),
+                                     numpy.arange(width*height) + 13)
+    assert reader.stats['unmatched'] == 2
+
+    async def read_async():
+        frames = []
+        async for frame in reader.aframes():
+            frames.append(frame.unique_id)
+            if len(frames) == 2:
+                break
+        return frames
+
+    async def main():
+        task = asyncio.ensure_future(read_async())
+        await asyncio.sleep(0.05)
+        send(14)
+        send(15)
+        return await asyncio.wait_for(task, 2.0)
+    assert asyncio.run(main()) == [14, 15]
+    reader.close()
+    assert reader.read(timeout=0.05) is None
+
+    # without timestamps from the NDArrays, events are paired as they arrive
+    reader = AD_ImageReader(prefix, nframes=3, match_timestamps=False)
+    assert reader.wait_for_connection()
+    assert server.wait_for_events()
+    list(reader.frames(timeout=0.05))
+    data.set_value(numpy.arange(width*height, dtype='uint8'),
+                   timestamp=1.7e9 + 100)
+    uid.set_value(20, timestamp=1.7e9 + 200)
+    assert server.wait_for_events()
+    frame = reader.read(timeout=1.0)
+    assert (frame.unique_id, frame.timestamp) == (20, 1.7e9 + 100)
+    reader.close()
+
+def test_motor():
+    chans = server.add_motor('Fake:m1', velocity=10.0, low_limit=-5,
+                             high_limit=5)
+    motor = Motor('Fake:m1')
+    t0 = time.time()
+    assert motor.move(2.0, wait=True) == 0
+    assert time.time() - t0 > 0.15
+    assert motor.get_position() == 2.0
+    assert motor.DMOV == 1
+    assert chans['RBV'].value == 2.0
+    assert motor.move(20.0) == -12
+    assert motor.move(20.0, wait=True, ignore_limits=True) == -4
+    assert motor.LVIO == 1
+    assert motor.get_position() == 2.0
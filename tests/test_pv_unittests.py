@@ -8,7 +8,8 @@ import threading
 import pytest
 from random import random
 from contextlib import contextmanager
-from epics import PV, get_pv, caput, caget, caget_many, caput_many, ca
+from epics import PV, get_pv, get_pvs, caput, caget, caget_many, caput_many, ca
+from epics.pv import PVEvent
 
 import pvnames
 
@@ -54,6 +55,26 @@ def test_CreatedWithConn():
     conn = CONN_DAT.get(pvnames.int_pv, None)
     assert conn
 
+def test_get_pvs():
+    write('Simple Test: get_pvs\n')
+    cached = get_pv(pvnames.double_pv)
+    names = [pvnames.double_pv, pvnames.long_pv, pvnames.str_pv,
+             pvnames.enum_pv, 'PyTest:NotAPV']
+    pvs, report = get_pvs(names, timeout=1.0)
+    assert pvs[pvnames.double_pv] is cached
+    assert get_pv(pvnames.enum_pv) is pvs[pvnames.enum_pv]
+    assert sorted(report.connected) == sorted(names[:4])
+    assert report.timed_out == ['PyTest:NotAPV']
+    assert not pvs['PyTest:NotAPV'].connected
+    assert report.stats['requested'] == len(names)
+    for name in names[:4]:
+        pv = pvs[name]
+        assert pv.connected
+        assert pv.auto_monitor
+        assert pv._monref is not None
+        assert pv.get() is not None
+    assert pvs[pvnames.str_pv].get() == 'ao'
+
 def test_caget():
     write('Simple Test of caget() function\n')
     pvs = (pvnames.double_pv, pvnames.enum_pv, pvnames.str_pv)
@@ -406,6 +427,168 @@ def test_waveform_callback_with_count_arg():
 
     wf.clear_callbacks()
 
+def test_waveform_monitor_ring_buffer():
+    events = []
+    ring = ca.MonitorRingBuffer(nslots=3)
+    def onChanges(pvname=None, value=None, slot_seq=None, **kw):
+        events.append((slot_seq, value, value.copy()))
+
+    with no_simulator_updates():
+        wf = PV(pvnames.double_arrays[1], auto_monitor=True, buffer=ring,
+                callback=onChanges)
+        assert wf.wait_for_connection()
+        time.sleep(0.2)
+        for i in range(5):
+            wf.put(numpy.arange(wf.nelm)*(i+1.0), wait=True)
+            time.sleep(0.1)
+
+    assert len(events) >= 5
+    seqs = [seq for seq, _, _ in events]
+    assert seqs == list(range(seqs[0], seqs[0] + len(seqs)))
+    for seq, view, data in events[-3:]:
+        assert not view.flags.writeable
+        assert ring.is_valid(seq)
+        numpy.testing.assert_array_equal(ring.get(seq), data)
+    assert not ring.is_valid(events[-4][0])
+    numpy.testing.assert_array_equal(events[-1][2],
+                                     numpy.arange(wf.nelm)*5.0)
+    wf.disconnect()
+
+def test_waveform_elements():
+    events = []
+    out = numpy.zeros((2, 8), dtype='float32')
+    def onChanges(pvname=None, value=None, slot_seq=None, **kw):
+        events.append((slot_seq, value.copy()))
+
+    assert (ca.subarray_name(pvnames.double_arrays[0], 10, 18) ==
+            pvnames.double_arrays[0] + '.[10:17]')
+    with no_simulator_updates():
+        wf = PV(pvnames.double_arrays[0], elements=slice(10, 26, 2),
+                auto_monitor=True, buffer=out, callback=onChanges)
+        assert wf.wait_for_connection()
+        assert wf.pvname == pvnames.double_arrays[0] + '.[10:2:25]'
+        assert wf.nelm == 8
+        time.sleep(0.2)
+        for i in range(3):
+            caput(pvnames.double_arrays[0], numpy.arange(128)*(i+1.0),
+                  wait=True)
+            time.sleep(0.1)
+
+    assert len(events) >= 3
+    expected = numpy.arange(10, 26, 2)*3.0
+    numpy.testing.assert_array_equal(events[-1][1], expected)
+    numpy.testing.assert_array_equal(out[events[-1][0] % 2], expected)
+    numpy.testing.assert_array_equal(out[events[-2][0] % 2], expected*2/3)
+    wf.disconnect()
+
+def test_max_rate_coalescing():
+    values = []
+    def onChanges(pvname=None, value=None, **kw):
+        values.append(value)
+
+    with no_simulator_updates():
+        mypv = PV(pvnames.non_updating_pv, max_rate=4, callback=onChanges)
+        assert mypv.wait_for_connection()
+        time.sleep(0.5)
+        stats = mypv.monitor_stats.copy()
+        t0 = time.time()
+        for i in range(50):
+            mypv.put(i + 0.5)
+            time.sleep(0.002)
+        time.sleep(1.0)
+        elapsed = time.time() - t0
+
+    received = mypv.monitor_stats['received'] - stats['received']
+    delivered = mypv.monitor_stats['delivered'] - stats['delivered']
+    coalesced = mypv.monitor_stats['coalesced'] - stats['coalesced']
+    assert received > 10
+    assert coalesced > 0
+    assert delivered + coalesced == received
+    assert delivered <= 1 + 4*elapsed
+    assert values[-1] == 49.5
+    assert mypv.get() == 49.5
+    mypv.disconnect()
+
+
+def test_get_stats():
+    def onChanges(pvname=None, value=None, **kw):
+        time.sleep(0.001)
+
+    mypv = PV(pvnames.updating_pv1, callback=onChanges)
+    assert mypv.wait_for_connection()
+    time.sleep(2.0)
+    stats = mypv.get_stats()
+    assert stats['delivered'] > 2
+    assert stats['callback_time']['count'] == stats['delivered']
+    assert stats['callback_time']['mean'] >= 0.001
+    assert stats['channel']['events'] >= stats['received']
+    assert stats['channel']['reconnects'] == 0
+    mypv.disconnect()
+
+def test_lazy_char_value():
+    mypv = PV(pvnames.updating_pv1, form='ctrl', auto_monitor=True)
+    assert mypv.wait_for_connection()
+    time.sleep(1.0)
+    assert mypv.monitor_stats['delivered'] > 1
+    # not formatted without callbacks, until asked for
+    assert mypv._charval_stale
+    fmt = '%%.%df' % mypv.precision
+    assert mypv.char_value == fmt % mypv.value
+    assert not mypv._charval_stale
+
+    char_values = []
+    def onChanges(pvname=None, value=None, char_value=None, **kw):
+        char_values.append((value, char_value))
+
+    # nor with callbacks taking a PVEvent, until the event is asked for it
+    events = []
+    index = mypv.add_callback(events.append, as_event=True)
+    time.sleep(1.0)
+    assert len(events) > 1
+    assert mypv._charval_stale
+    mypv.get()
+    assert mypv._charval_stale
+    for event in events:
+        assert event.char_value == fmt % event.value
+    mypv.remove_callback(index)
+
+    mypv.add_callback(onChanges)
+    time.sleep(1.0)
+    assert len(char_values) > 1
+    for value, char_value in char_values:
+        assert char_value == fmt % value
+    mypv.disconnect()
+
+def test_event_callbacks():
+    events, others, kwcalls = [], [], []
+    def onEvent(event, tag=None):
+        events.append((event, tag))
+    def onEvent2(event):
+        others.append(event)
+    def onChanges(pvname=None, value=None, cb_info=None, **kw):
+        kwcalls.append((value, cb_info))
+
+    mypv = PV(pvnames.updating_pv1)
+    assert mypv.wait_for_connection()
+    mypv.add_callback(onEvent, as_event=True, tag='a')
+    mypv.add_callback(onEvent2, as_event=True)
+    idx = mypv.add_callback(onChanges)
+    time.sleep(1.0)
+    assert len(events) > 1
+    event, tag = events[-1]
+    assert tag == 'a'
+    assert isinstance(event, PVEvent)
+    # shared between callbacks of an event
+    assert any(ev is event for ev in others)
+    assert event.pv is mypv
+    assert event.pvname == pvnames.updating_pv1
+    assert event['value'] == event.value
+    assert dict(event)['timestamp'] == event.timestamp
+    with pytest.raises(AttributeError):
+        event.value = 1
+    assert abs(len(kwcalls) - len(events)) <= 1
+    assert kwcalls[-1][1] == (idx, mypv)
+    mypv.disconnect()
 
 def test_emptyish_char_waveform_no_monitor():
     '''a test of a char waveform of length 1 (NORD=1): value "\0"
@@ -69,3 +69,66 @@ def test_pv_from_main():
     t.join()
 
     assert len(result) and result[0] is not None
+
+
+def test_implicit_context():
+    result = []
+    def thread():
+        assert epics.ca.current_context() is None
+        # libca creates a context for the thread with its first channel
+        chid = epics.ca.create_channel(pvnames.double_pv)
+        ctx = epics.ca.current_context()
+        result.append(ctx)
+        result.append(epics.ca.libca.ca_current_context())
+        epics.ca.clear_channel(chid)
+        epics.ca.destroy_context()
+
+    epics.ca.use_initial_context()
+    t = threading.Thread(target=thread)
+    t.start()
+    t.join()
+
+    assert len(result) == 2 and result[0] is not None
+    assert result[0] == result[1]
+    assert result[0] != epics.ca.current_context()
+
+
+def test_pin_context():
+    result = []
+    def thread():
+        assert epics.ca.current_context() is None
+        assert epics.ca.pin_context() == ctx
+        assert epics.ca.pinned_context() == ctx
+        assert epics.ca.current_context() == ctx
+        result.append(pv.get())
+
+        epics.ca.unpin_context()
+        assert epics.ca.pinned_context() is None
+        epics.ca.detach_context()
+        assert epics.ca.current_context() is None
+
+        epics.ca.create_context()
+        other = epics.ca.current_context()
+        assert other not in (None, ctx)
+        epics.ca.pin_context(other)
+        try:
+            pv.get()
+        except RuntimeError:
+            result.append('pinned')
+        assert epics.ca.current_context() == other
+        epics.ca.destroy_context()
+        assert epics.ca.pinned_context() is None
+        assert epics.ca.current_context() is None
+
+    epics.ca.use_initial_context()
+    ctx = epics.ca.current_context()
+    pv = epics.get_pv(pvnames.double_pv)
+    assert pv.wait_for_connection()
+    t = threading.Thread(target=thread)
+    t.start()
+    t.join()
+
+    assert len(result) == 2 and result[0] is not None
+    assert result[1] == 'pinned'
+    assert epics.ca.pinned_context() is None
+    assert epics.ca.current_context() == ctx